@@ -4,6 +4,9 @@ import argparse
 import logging
 from pathlib import Path
 
+from pmkt.ratelimit import CLOB, GAMMA, RateBudget, configure_budget
+from pmkt.transport import close_shared
+
 from .client import ApiClient
 from .config import ApiConfig, api_config_from_env, storage_config_from_env
 from .logic import FeeModel
@@ -16,6 +19,14 @@ from .utils import parse_quantities
 DEFAULT_QUANTITIES = [1, 5, 10, 25, 50]
 
 
+def _configure_rate_limits(config: ApiConfig) -> None:
+    # PM_MIN_INTERVAL_S keeps its meaning: at most one request per interval per API.
+    if config.min_interval_s > 0:
+        budget = RateBudget(rate_per_s=1.0 / config.min_interval_s, burst=1.0)
+        configure_budget(GAMMA, budget)
+        configure_budget(CLOB, budget)
+
+
 def _setup_logging(level: str) -> None:
     logging.basicConfig(
         level=getattr(logging, level, logging.INFO),
@@ -118,6 +129,7 @@ def main(argv: list[str] | None = None) -> None:
                 start_date_min=args.start_date_min or api_cfg.start_date_min,
                 end_date_min=args.end_date_min or api_cfg.end_date_min,
             )
+            _configure_rate_limits(api_cfg)
             api_client = ApiClient(api_cfg)
         try:
             scan_markets(
@@ -138,6 +150,7 @@ def main(argv: list[str] | None = None) -> None:
         finally:
             if api_client:
                 api_client.close()
+                close_shared()
             storage.close()
         return
 
@@ -178,11 +191,13 @@ def main(argv: list[str] | None = None) -> None:
             start_date_min=args.start_date_min or api_cfg.start_date_min,
             end_date_min=args.end_date_min or api_cfg.end_date_min,
         )
+        _configure_rate_limits(api_cfg)
         api_client = ApiClient(api_cfg)
         try:
             markets_data = api_client.fetch_markets()
         finally:
             api_client.close()
+            close_shared()
         markets = [MarketMetadata.from_api(m) for m in markets_data]
         rows = markets[: args.limit]
         header = (
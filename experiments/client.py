@@ -6,8 +6,11 @@ from typing import Any
 
 import httpx
 
+from pmkt.ratelimit import CLOB, GAMMA, TokenBucket, get_limiter
+from pmkt.transport import shared_client
+
 from .config import ApiConfig
-from .utils import RateLimiter, backoff_sleep
+from .utils import backoff_sleep
 
 logger = logging.getLogger(__name__)
 
@@ -15,17 +18,21 @@ logger = logging.getLogger(__name__)
 class ApiClient:
     def __init__(self, config: ApiConfig) -> None:
         self.config = config
-        self._limiter = RateLimiter(config.min_interval_s)
-        timeout = httpx.Timeout(
+        self._limiters = {
+            config.markets_url: get_limiter(GAMMA),
+            config.orderbook_url: get_limiter(CLOB),
+        }
+        self._timeout = httpx.Timeout(
             timeout=config.timeout_s,
             connect=config.timeout_s,
             read=config.timeout_s,
             write=config.timeout_s,
         )
-        self._client = httpx.Client(timeout=timeout)
+        self._client = shared_client()
 
     def close(self) -> None:
-        self._client.close()
+        # The HTTP pool is process-wide; see pmkt.transport.close_shared().
+        pass
 
     def fetch_markets(self) -> list[dict[str, Any]]:
         params: dict[str, Any] = {}
@@ -43,13 +50,16 @@ class ApiClient:
         params = {"token_id": token_id}
         return self._get_json(self.config.orderbook_url, params=params)
 
+    def _limiter_for(self, url: str) -> TokenBucket:
+        return self._limiters.get(url) or get_limiter(CLOB)
+
     def _get_json(self, url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
         last_error: Exception | None = None
         for attempt in range(1, self.config.max_retries + 1):
-            self._limiter.wait()
+            self._limiter_for(url).acquire()
             start = time.monotonic()
             try:
-                resp = self._client.get(url, params=params)
+                resp = self._client.get(url, params=params, timeout=self._timeout)
                 latency_ms = int((time.monotonic() - start) * 1000)
                 if resp.status_code >= 400:
                     snippet = resp.text[:200].replace("\n", " ").replace("\r", " ")
@@ -4,6 +4,10 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Iterable
 
+import numpy as np
+
+from pmkt.clob.columns import vwap
+
 from .models import MarketClassification, MarketMetadata, OrderBookTop
 from .utils import parse_iso_datetime
 
@@ -145,22 +149,17 @@ def vwap_for_asks(levels: Any, target_qty: float) -> float | None:
         return None
     if not isinstance(levels, list) or not levels:
         return None
-    remaining = target_qty
-    total_cost = 0.0
-    filled = 0.0
-    for level in levels:
-        price, size = _level_price_size(level)
-        if price is None or size is None or size <= 0:
-            continue
-        take = min(remaining, size)
-        total_cost += take * price
-        filled += take
-        remaining -= take
-        if remaining <= 0:
-            break
-    if filled < target_qty:
+    parsed = [_level_price_size(level) for level in levels]
+    usable = [
+        (price, size)
+        for price, size in parsed
+        if price is not None and size is not None and size > 0
+    ]
+    if not usable:
         return None
-    return total_cost / filled
+    prices, sizes = np.array(usable, dtype=np.float64).T
+    result = vwap(prices, sizes, [target_qty])[0]
+    return None if np.isnan(result) else float(result)
 
 
 def parse_orderbook_top(data: dict[str, Any]) -> OrderBookTop:
@@ -5,6 +5,8 @@ import sqlite3
 import time
 from typing import Iterable
 
+from pmkt.adapters.sqlite import connect_wal, ensure_columns, execute_with_retry
+
 from .models import MarketMetadata, OrderBookTop
 from .utils import dumps_compact
 
@@ -14,11 +16,7 @@ logger = logging.getLogger(__name__)
 class Storage:
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
-        self._conn = sqlite3.connect(self.db_path)
-        self._conn.row_factory = sqlite3.Row
-        self._conn.execute("PRAGMA journal_mode=WAL;")
-        self._conn.execute("PRAGMA synchronous=NORMAL;")
-        self._conn.execute("PRAGMA busy_timeout=5000;")
+        self._conn = connect_wal(self.db_path)
         self._init_schema()
 
     def close(self) -> None:
@@ -66,32 +64,10 @@ class Storage:
         self._conn.commit()
 
     def _execute_with_retry(self, action: str, func) -> bool:
-        delays = [0.05, 0.1, 0.2, 0.4, 0.8]
-        for attempt, delay in enumerate(delays, start=1):
-            try:
-                func()
-                return True
-            except sqlite3.OperationalError as exc:
-                message = str(exc).lower()
-                if "database is locked" not in message:
-                    raise
-                if attempt >= len(delays):
-                    logger.error(
-                        "database locked; giving up",
-                        extra={"action": action, "attempt": attempt},
-                    )
-                    return False
-                time.sleep(delay)
-        return False
+        return execute_with_retry(action, func, conn=self._conn)
 
     def _ensure_columns(self, table: str, columns: dict[str, str]) -> None:
-        cur = self._conn.cursor()
-        cur.execute(f"PRAGMA table_info({table})")
-        existing = {row[1] for row in cur.fetchall()}
-        for name, col_type in columns.items():
-            if name in existing:
-                continue
-            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+        ensure_columns(self._conn, table, columns)
 
     def upsert_markets(self, markets: Iterable[MarketMetadata]) -> None:
         rows = [
@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 import random
 import time
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Iterable
 
@@ -16,21 +15,6 @@ def dumps_compact(data: Any) -> str:
     return json.dumps(data, separators=(",", ":"), ensure_ascii=True)
 
 
-@dataclass
-class RateLimiter:
-    min_interval_s: float
-    _last_ts: float = 0.0
-
-    def wait(self) -> None:
-        if self.min_interval_s <= 0:
-            return
-        now = time.monotonic()
-        elapsed = now - self._last_ts
-        if elapsed < self.min_interval_s:
-            time.sleep(self.min_interval_s - elapsed)
-        self._last_ts = time.monotonic()
-
-
 def backoff_sleep(attempt: int, base_s: float = 0.5, cap_s: float = 8.0) -> None:
     delay = min(cap_s, base_s * (2 ** (attempt - 1)))
     jitter = random.uniform(0, delay * 0.25)
@@ -0,0 +1,149 @@
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from pmkt.clob import decode
+from pmkt.clob.client import DEFAULT_BOOK_URL, _order_book_from_payload
+from pmkt.clob.paired import make_paired_snapshot
+from pmkt.transport import shared_client
+
+
+def record_payloads(path: Path, token_ids: list[str], rounds: int) -> None:
+    client = shared_client()
+    with path.open("ab") as handle:
+        for _ in range(rounds):
+            for token_id in token_ids:
+                response = client.get(DEFAULT_BOOK_URL, params={"token_id": token_id})
+                response.raise_for_status()
+                handle.write(response.content.replace(b"\n", b"") + b"\n")
+    print(f"Recorded {rounds * len(token_ids)} payloads to {path}")
+
+
+def synthetic_payloads(count: int, depth: int, seed: int = 7) -> list[bytes]:
+    rng = random.Random(seed)
+    payloads = []
+    for idx in range(count):
+        bids = [
+            {"price": f"{(49 - level * 0.1) / 100:.3f}", "size": f"{rng.uniform(5, 5000):.2f}"}
+            for level in range(depth)
+        ]
+        asks = [
+            {"price": f"{(51 + level * 0.1) / 100:.3f}", "size": f"{rng.uniform(5, 5000):.2f}"}
+            for level in range(depth)
+        ]
+        payload = {
+            "market": f"0xcond{idx}",
+            "asset_id": f"token-{idx}",
+            "timestamp": str(1_700_000_000_000 + idx),
+            "hash": f"hash-{idx}",
+            "bids": bids,
+            "asks": asks,
+            "tick_size": "0.001",
+            "min_order_size": "5",
+        }
+        payloads.append(json.dumps(payload).encode())
+    return payloads
+
+
+def load_payloads(path: Path) -> list[bytes]:
+    return [line for line in path.read_bytes().splitlines() if line.strip()]
+
+
+def reference(raw: bytes) -> object:
+    return _order_book_from_payload("token", json.loads(raw))
+
+
+def fast(raw: bytes) -> object:
+    return decode.decode_book("token", raw)
+
+
+def tick(raw: bytes) -> object:
+    return decode.tick_book_from_payload("token", decode.loads(raw))
+
+
+def snapshot_pairs(books: list) -> list[tuple]:
+    return [(books[idx], books[idx + 1]) for idx in range(0, len(books) - 1, 2)]
+
+
+def bench_snapshots(label: str, pairs: list[tuple], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for book_a, book_b in pairs:
+            make_paired_snapshot(book_a, book_b, outcome_a="Yes", outcome_b="No")
+    elapsed = time.perf_counter() - started
+    count = repeat * len(pairs)
+    print(
+        f"{label:<10} snapshots={count} elapsed_s={elapsed:.3f} "
+        f"us_per_snapshot={elapsed / count * 1e6:.1f}"
+    )
+    return elapsed
+
+
+def compare_snapshots(payloads: list[bytes], repeat: int) -> None:
+    reference_pairs = snapshot_pairs([reference(raw) for raw in payloads])
+    tick_pairs = snapshot_pairs([tick(raw) for raw in payloads])
+    for (ref_a, ref_b), (tick_a, tick_b) in zip(reference_pairs, tick_pairs, strict=True):
+        expected = make_paired_snapshot(ref_a, ref_b, outcome_a="Yes", outcome_b="No")
+        actual = make_paired_snapshot(tick_a, tick_b, outcome_a="Yes", outcome_b="No")
+        if [str(value) for value in vars_of(expected)] != [str(value) for value in vars_of(actual)]:
+            raise SystemExit("tick books produced a different snapshot")
+    baseline = bench_snapshots("decimal", reference_pairs, repeat)
+    candidate = bench_snapshots("tick", tick_pairs, repeat)
+    print(f"speedup={baseline / candidate:.2f}x")
+
+
+def vars_of(snapshot: object) -> list[object]:
+    return [getattr(snapshot, name) for name in snapshot.__slots__]
+
+
+def bench(label: str, parse, payloads: list[bytes], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for raw in payloads:
+            parse(raw)
+    elapsed = time.perf_counter() - started
+    books = repeat * len(payloads)
+    print(
+        f"{label:<10} books={books} elapsed_s={elapsed:.3f} us_per_book={elapsed / books * 1e6:.1f}"
+    )
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the fast book decoder")
+    parser.add_argument("--payloads", type=Path, default=None, help="JSONL of raw /book bodies")
+    parser.add_argument("--record-token", action="append", default=[], help="Token to record")
+    parser.add_argument("--record-rounds", type=int, default=1)
+    parser.add_argument("--books", type=int, default=200, help="Synthetic books when no payloads")
+    parser.add_argument("--depth", type=int, default=200, help="Synthetic levels per side")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--snapshots", action="store_true", help="Compare paired snapshot construction instead"
+    )
+    args = parser.parse_args()
+
+    if args.record_token:
+        if args.payloads is None:
+            parser.error("--record-token needs --payloads")
+        record_payloads(args.payloads, args.record_token, args.record_rounds)
+        return
+    if args.payloads is not None:
+        payloads = load_payloads(args.payloads)
+    else:
+        payloads = synthetic_payloads(args.books, args.depth)
+    if args.snapshots:
+        compare_snapshots(payloads, args.repeat)
+        return
+    for raw in payloads:
+        if reference(raw) != fast(raw):
+            raise SystemExit("fast decoder produced a different OrderBook")
+    print(f"json_backend={decode.JSON_BACKEND} payloads={len(payloads)}")
+    baseline = bench("reference", reference, payloads, args.repeat)
+    candidate = bench("fast", fast, payloads, args.repeat)
+    print(f"speedup={baseline / candidate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+from pmkt.clob.client import AsyncClobClient
+from pmkt.clob.resilience import HedgePolicy
+from pmkt.ratelimit import TokenBucket
+
+
+def make_handler(rng: random.Random, tail_rate: float, tail_s: float, base_s: float):
+    counter = {"requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counter["requests"] += 1
+        delay = tail_s if rng.random() < tail_rate else rng.uniform(base_s * 0.5, base_s * 1.5)
+        await asyncio.sleep(delay)
+        token_id = request.url.params["token_id"]
+        body = {
+            "asset_id": token_id,
+            "timestamp": "1000",
+            "bids": [{"price": "0.49", "size": "10"}],
+            "asks": [{"price": "0.51", "size": "10"}],
+        }
+        return httpx.Response(200, content=json.dumps(body))
+
+    return handler, counter
+
+
+async def run(args: argparse.Namespace, hedge: bool) -> None:
+    rng = random.Random(args.seed)
+    handler, counter = make_handler(rng, args.tail_rate, args.tail_ms / 1000, args.base_ms / 1000)
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    policy = HedgePolicy() if hedge else None
+    client = AsyncClobClient(
+        book_url="https://clob.test/book",
+        books_url=None,
+        client=http_client,
+        max_concurrency=args.tokens * 2,
+        limiter=TokenBucket(0, 1),
+        hedge=policy,
+    )
+    token_ids = [f"token-{idx}" for idx in range(args.tokens)]
+    sweeps: list[float] = []
+    try:
+        for _ in range(args.sweeps):
+            started = time.perf_counter()
+            await client.get_order_books(token_ids)
+            sweeps.append(time.perf_counter() - started)
+    finally:
+        await client.aclose()
+    sweeps.sort()
+    p99 = sweeps[min(len(sweeps) - 1, int(len(sweeps) * 0.99))]
+    per_token = counter["requests"] / (args.sweeps * args.tokens)
+    print(
+        f"hedge={hedge} sweep_mean_ms={statistics.mean(sweeps) * 1000:.1f} "
+        f"sweep_p99_ms={p99 * 1000:.1f} requests_per_token={per_token:.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sweep latency with and without hedging")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--sweeps", type=int, default=200)
+    parser.add_argument("--base-ms", type=float, default=5.0)
+    parser.add_argument("--tail-ms", type=float, default=200.0)
+    parser.add_argument("--tail-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(run(args, hedge=False))
+    asyncio.run(run(args, hedge=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import random
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+
+from pmkt.clob.models import OrderBook, OrderLevel
+from pmkt.clob.paired import make_paired_snapshot
+from pmkt.clob.paired_recorder import _snapshot_row
+from pmkt.clob.sinks import SINK_FORMATS, make_sink
+
+
+def synthetic_rows(count: int, pairs: int, seed: int = 7) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+
+    def book(token_id: str, condition_id: str, ts_ms: int) -> OrderBook:
+        mid = rng.randint(20, 980)
+        return OrderBook(
+            token_id=token_id,
+            market=condition_id,
+            timestamp_ms=ts_ms,
+            bids=[
+                OrderLevel(Decimal(mid - 1 - level) / 1000, Decimal(rng.randint(5, 500000)) / 100)
+                for level in range(5)
+            ],
+            asks=[
+                OrderLevel(Decimal(mid + 1 + level) / 1000, Decimal(rng.randint(5, 500000)) / 100)
+                for level in range(5)
+            ],
+            tick_size=Decimal("0.001"),
+            min_order_size=Decimal("5"),
+            hash=None,
+        )
+
+    # Ids as long as the real ones: 0x + 64 hex digits, and 77-digit token ids.
+    ids = [
+        (f"0x{rng.getrandbits(256):064x}", str(rng.getrandbits(255)), str(rng.getrandbits(255)))
+        for _ in range(pairs)
+    ]
+    rows = []
+    for idx in range(count):
+        condition_id, token_up, token_down = ids[idx % pairs]
+        ts_ms = 1_700_000_000_000 + idx * 10
+        snapshot = make_paired_snapshot(
+            book(token_up, condition_id, ts_ms),
+            book(token_down, condition_id, ts_ms - rng.randint(0, 50)),
+            outcome_a="Up",
+            outcome_b="Down",
+            fetch_latency_ms=rng.uniform(5, 80),
+        )
+        rows.append(_snapshot_row(snapshot))
+    return rows
+
+
+def run(rows: list[dict[str, object]], out_dir: Path, sink_format: str, repeat: int) -> None:
+    started = time.perf_counter()
+    sink = make_sink(sink_format, out_dir)
+    for row in rows:
+        sink.write_quote(row)
+    sink.close()
+    write_s = time.perf_counter() - started
+    path = next(out_dir.glob(f"paired_quotes.{sink_format}"))
+    reader = pd.read_csv if sink_format == "csv" else pd.read_parquet
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frame = reader(path)
+        best = min(best, time.perf_counter() - started)
+    assert len(frame) == len(rows)
+    print(
+        f"{sink_format:8} size_mb={path.stat().st_size / 1e6:.2f} write_s={write_s:.3f} "
+        f"read_s={best:.3f} rows_per_s={len(rows) / best:,.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare CSV and Parquet quote read-back")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--formats", nargs="+", choices=SINK_FORMATS, default=list(SINK_FORMATS))
+    args = parser.parse_args()
+    rows = synthetic_rows(args.rows, args.pairs)
+    with tempfile.TemporaryDirectory() as tmp:
+        for sink_format in args.formats:
+            out_dir = Path(tmp) / sink_format
+            run(rows, out_dir, sink_format, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from pmkt.clob.fake_stream import FakeMarketServer, price_change_event
+from pmkt.clob.paired_recorder import TradablePair, record_paired_quotes_stream
+from pmkt.clob.stream import MarketStream
+
+
+async def run(pairs_count: int, updates: int) -> None:
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{idx}",
+            token_a_id=f"up-{idx}",
+            token_b_id=f"down-{idx}",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for idx in range(pairs_count)
+    ]
+    token_ids = [token for pair in pairs for token in (pair.token_a_id, pair.token_b_id)]
+    server = FakeMarketServer()
+    await server.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        stream = MarketStream(token_ids, url=server.url)
+        task = asyncio.create_task(
+            record_paired_quotes_stream(
+                pairs, out_dir=Path(tmp), max_messages=updates + 1, stream=stream
+            )
+        )
+        await server.wait_subscribed(1)
+        started = time.perf_counter()
+        for idx in range(updates):
+            pair = pairs[idx % pairs_count]
+            size = str(100 + idx)
+            await server.publish(
+                [price_change_event(pair.token_a_id, "0.49", size, "BUY", timestamp_ms=2000 + idx)]
+            )
+        await task
+        elapsed = time.perf_counter() - started
+        await server.stop()
+    print(f"pairs={pairs_count} updates={updates} elapsed_s={elapsed:.3f}")
+    print(f"updates_per_s={updates / elapsed:,.0f} ms_per_update={elapsed / updates * 1000:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark stream ingest against a fake server")
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.pairs, args.updates))
+
+
+if __name__ == "__main__":
+    main()
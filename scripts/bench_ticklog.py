@@ -0,0 +1,81 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from bench_sink_readback import synthetic_rows
+
+from pmkt.clob.sinks import CsvSink, quote_columns
+from pmkt.clob.ticklog import TickLogReader, TickLogWriter
+
+
+def write_day(path: Path, rows: list[dict[str, object]], day_rows: int) -> float:
+    # Encodes the sample once through the writer, then appends shifted copies
+    # of its records until the log holds day_rows records.
+    started = time.perf_counter()
+    writer = TickLogWriter(path, quote_columns())
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    encode_s = time.perf_counter() - started
+    sample = np.array(TickLogReader(path).records)
+    span_ms = int(sample["ts_ms"].max() - sample["ts_ms"].min()) + 1
+    with path.open("ab") as handle:
+        copies = 1
+        while (copies + 1) * len(sample) <= day_rows:
+            sample["ts_ms"] += span_ms
+            handle.write(sample.tobytes())
+            copies += 1
+    return encode_s
+
+
+def replay(path: Path) -> tuple[int, float, int]:
+    # One pass a backtest would make: mid-sum drift per market over the day.
+    started = time.perf_counter()
+    reader = TickLogReader(path)
+    condition = reader.column("condition_id")
+    mid_sum = reader.values("mid_sum")
+    drift = np.abs(mid_sum - 1.0) >= 0.02
+    per_market = np.bincount(condition, weights=mid_sum) / np.maximum(np.bincount(condition), 1)
+    elapsed = time.perf_counter() - started
+    assert per_market.size and drift.size == len(reader)
+    return len(reader), elapsed, int(drift.sum())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark tick log writes and day replays")
+    parser.add_argument("--sample-rows", type=int, default=100_000)
+    parser.add_argument("--pairs", type=int, default=500)
+    # 500 pairs polled every 2 s for 24 h.
+    parser.add_argument("--day-rows", type=int, default=21_600_000)
+    args = parser.parse_args()
+    rows = synthetic_rows(args.sample_rows, args.pairs)
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        sink = CsvSink(out_dir)
+        for row in rows:
+            sink.write_quote(row)
+        sink.close()
+        csv_path = out_dir / "paired_quotes.csv"
+        started = time.perf_counter()
+        pd.read_csv(csv_path)
+        csv_read_s = time.perf_counter() - started
+        csv_bytes_per_row = csv_path.stat().st_size / len(rows)
+
+        path = out_dir / "paired_quotes.ticks"
+        encode_s = write_day(path, rows, args.day_rows)
+        records, replay_s, drift = replay(path)
+        tick_bytes_per_row = TickLogReader(path).dtype.itemsize
+        print(f"tick bytes/row={tick_bytes_per_row} csv bytes/row={csv_bytes_per_row:.0f}")
+        print(f"encode rows/s={len(rows) / encode_s:,.0f}")
+        print(f"replay records={records:,} elapsed_s={replay_s:.2f} drift_rows={drift:,}")
+        print(
+            f"csv read rows/s={len(rows) / csv_read_s:,.0f} "
+            f"(a day would take ~{records / (len(rows) / csv_read_s):,.0f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LOCK_RETRY_DELAYS_S = (0.05, 0.1, 0.2, 0.4, 0.8)
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+
+
+def connect_wal(
+    db_path: str | Path,
+    *,
+    busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    # WAL lets other processes read while one writes, and synchronous=NORMAL
+    # only syncs at checkpoints, which WAL keeps safe against corruption.
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)};")
+    return conn
+
+
+def execute_with_retry(
+    action: str,
+    func: Callable[[], None],
+    conn: sqlite3.Connection | None = None,
+    delays: Sequence[float] = LOCK_RETRY_DELAYS_S,
+) -> bool:
+    # Runs func, retrying with backoff while another writer holds the lock.
+    # With conn, a transaction func left open is rolled back before the next
+    # try. Returns False when it gives up; other errors are raised.
+    for attempt, delay in enumerate(delays, start=1):
+        try:
+            func()
+            return True
+        except sqlite3.OperationalError as exc:
+            message = str(exc).lower()
+            if "database is locked" not in message:
+                raise
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            if attempt >= len(delays):
+                logger.error(
+                    "database locked; giving up",
+                    extra={"action": action, "attempt": attempt},
+                )
+                return False
+            time.sleep(delay)
+    return False
+
+
+def ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+    # Adds any of columns (name -> type) an older table does not have yet.
+    cur = conn.cursor()
+    cur.execute(f'PRAGMA table_info("{table}")')
+    existing = {row[1] for row in cur.fetchall()}
+    for name, col_type in columns.items():
+        if name in existing:
+            continue
+        cur.execute(f'ALTER TABLE "{table}" ADD COLUMN "{name}" {col_type}')
@@ -1,16 +1,80 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import logging
 from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
+from typing import Any
 
 from pmkt.adapters.storage_csv import CsvUniverseWriter
-from pmkt.clob.paired_recorder import build_market_index, load_tradable_pairs, record_paired_quotes
+from pmkt.clob.book_cache import DEFAULT_MAX_BYTES, BookCache
+from pmkt.clob.client import DEFAULT_BATCH_SIZE, AsyncClobClient, ClobClient
+from pmkt.clob.paired_recorder import (
+    DEFAULT_HEARTBEAT_INTERVAL_S,
+    DEFAULT_STATS_LOG_INTERVAL_S,
+    TradablePair,
+    build_market_index,
+    load_tradable_pairs,
+    record_paired_quotes,
+    record_paired_quotes_async,
+    record_paired_quotes_stream,
+)
+from pmkt.clob.resilience import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_MAX_BACKOFF_S,
+    CircuitBreaker,
+    HedgePolicy,
+)
+from pmkt.clob.rotation import SEGMENT_COMPRESSIONS, RotationPolicy
+from pmkt.clob.scheduler import (
+    DEFAULT_MAX_INTERVAL_S,
+    DEFAULT_MIN_INTERVAL_S,
+    AdaptivePollScheduler,
+)
+from pmkt.clob.session import (
+    DEFAULT_CHECKPOINT_INTERVAL_S,
+    SESSION_FILENAME,
+    SessionCheckpoint,
+    SessionCheckpointer,
+    load_checkpoint,
+)
+from pmkt.clob.sinks import (
+    BACKPRESSURE_MODES,
+    DEFAULT_PARQUET_COMPRESSION,
+    DEFAULT_ROW_GROUP_SIZE,
+    DEFAULT_WRITER_QUEUE,
+    PARQUET_COMPRESSIONS,
+    SINK_FORMATS,
+    FlushPolicy,
+    RecordSink,
+    ThreadedSink,
+    make_sink,
+)
+from pmkt.clob.stream import DEFAULT_MARKET_WS_URL
 from pmkt.domain.ports import UniverseSnapshot
 from pmkt.gamma.client import GammaClient
 from pmkt.gamma.normalize import parse_events, parse_tokens
+from pmkt.ratelimit import (
+    CLOB,
+    DEFAULT_BUDGETS,
+    GAMMA,
+    RateBudget,
+    configure_budget,
+    log_limiter_stats,
+)
+from pmkt.transport import (
+    DEFAULT_KEEPALIVE_EXPIRY_S,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_STATS_INTERVAL_S,
+    DEFAULT_WARMUP_CONNECTIONS,
+    TransportConfig,
+    close_shared,
+    configure,
+)
 
 DEFAULT_EXPORT_LIMIT = 1000
 
@@ -21,6 +85,26 @@ def _setup_logging(level: str) -> None:
     )
 
 
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not an integer") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{value!r} must be greater than 0")
+    return number
+
+
+def positive_decimal(value: str) -> Decimal:
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a number") from None
+    if not number.is_finite() or number <= 0:
+        raise argparse.ArgumentTypeError(f"{value!r} must be a finite number greater than 0")
+    return number
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="pmarb")
     parser.add_argument(
@@ -29,6 +113,48 @@ def _build_parser() -> argparse.ArgumentParser:
         default="INFO",
         help="Logging verbosity",
     )
+    http_group = parser.add_argument_group("HTTP transport")
+    http_group.add_argument(
+        "--http2",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Negotiate HTTP/2 when the h2 package is installed (default: on)",
+    )
+    http_group.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS)
+    http_group.add_argument("--max-keepalive", type=int, default=DEFAULT_MAX_KEEPALIVE_CONNECTIONS)
+    http_group.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=DEFAULT_KEEPALIVE_EXPIRY_S,
+        help="Seconds an idle pooled connection is kept open",
+    )
+    http_group.add_argument(
+        "--warmup-connections",
+        type=int,
+        default=DEFAULT_WARMUP_CONNECTIONS,
+        help="Connections to open per API origin before the run starts (0 disables)",
+    )
+    http_group.add_argument(
+        "--http-stats-interval",
+        type=float,
+        default=DEFAULT_STATS_INTERVAL_S,
+        help="Seconds between connection reuse log lines (0 disables)",
+    )
+    limits_group = parser.add_argument_group("Rate limits (shared by every client in the process)")
+    limits_group.add_argument(
+        "--gamma-rate",
+        type=float,
+        default=DEFAULT_BUDGETS[GAMMA].rate_per_s,
+        help="Gamma requests per second (0 disables limiting)",
+    )
+    limits_group.add_argument("--gamma-burst", type=float, default=DEFAULT_BUDGETS[GAMMA].burst)
+    limits_group.add_argument(
+        "--clob-rate",
+        type=float,
+        default=DEFAULT_BUDGETS[CLOB].rate_per_s,
+        help="CLOB requests per second (0 disables limiting)",
+    )
+    limits_group.add_argument("--clob-burst", type=float, default=DEFAULT_BUDGETS[CLOB].burst)
     sub = parser.add_subparsers(dest="command", required=True)
 
     export_cmd = sub.add_parser("export", help="Export normalized universe snapshot to CSV")
@@ -77,8 +203,219 @@ def _build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Output directory (default: data/marketdata/<UTC_TIMESTAMP>)",
     )
+    paired_cmd.add_argument(
+        "--mode",
+        choices=("poll", "stream"),
+        default="poll",
+        help="Poll /book each interval, or keep books current from the market websocket",
+    )
+    paired_cmd.add_argument(
+        "--ws-url",
+        type=str,
+        default=DEFAULT_MARKET_WS_URL,
+        help="Market channel websocket URL for --mode stream",
+    )
     paired_cmd.add_argument("--interval", type=float, default=2.0)
-    paired_cmd.add_argument("--iters", type=int, default=None)
+    paired_cmd.add_argument(
+        "--iters",
+        type=int,
+        default=None,
+        help="Sweeps to run (poll mode) or market messages to process (stream mode)",
+    )
+    paired_cmd.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Max in-flight /book requests; values above 1 use the async recorder (default: 1)",
+    )
+    paired_cmd.add_argument(
+        "--no-batch",
+        dest="batch_books",
+        action="store_false",
+        default=True,
+        help="Fetch each token with /book instead of the batched /books endpoint",
+    )
+    paired_cmd.add_argument(
+        "--fast-decode",
+        action="store_true",
+        default=False,
+        help="Decode book responses with the fast path (uses orjson when installed)",
+    )
+    paired_cmd.add_argument(
+        "--tick-books",
+        action="store_true",
+        default=False,
+        help="Keep book levels as scaled integers and build snapshots without Decimal math",
+    )
+    paired_cmd.add_argument(
+        "--sorted-books",
+        action="store_true",
+        default=False,
+        help="Sort book levels once on decode so best bid/ask and depth need no rescans",
+    )
+    paired_cmd.add_argument(
+        "--batch-snapshots",
+        action="store_true",
+        default=False,
+        help="Build each sweep's snapshots as columns and check signals for all pairs at once",
+    )
+    paired_cmd.add_argument(
+        "--depth-ladder",
+        type=positive_int,
+        nargs="+",
+        default=[],
+        metavar="LEVELS",
+        help="Also record cumulative depth of each side at these level counts",
+    )
+    paired_cmd.add_argument(
+        "--cost-sizes",
+        type=positive_decimal,
+        nargs="+",
+        default=[],
+        metavar="SHARES",
+        help="Also record the cost to buy, and proceeds to sell, both legs at these sizes",
+    )
+    paired_cmd.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=False,
+        help="Give each pair its own polling interval between --min-interval and --max-interval",
+    )
+    paired_cmd.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL_S)
+    paired_cmd.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL_S)
+    paired_cmd.add_argument(
+        "--poll-budget",
+        type=float,
+        default=None,
+        help="Request/s budget for --adaptive polling (default: --clob-rate)",
+    )
+    paired_cmd.add_argument(
+        "--max-leg-skew-ms",
+        type=int,
+        default=None,
+        help="Suppress signals when the legs' server timestamps differ by more than this",
+    )
+    paired_cmd.add_argument(
+        "--hedge",
+        action="store_true",
+        default=False,
+        help="Send a second request when a reply is slower than the rolling p95 latency",
+    )
+    paired_cmd.add_argument(
+        "--breaker-failures",
+        type=int,
+        default=DEFAULT_FAILURE_THRESHOLD,
+        help="Consecutive failures before a token is backed off",
+    )
+    paired_cmd.add_argument(
+        "--breaker-max-backoff",
+        type=float,
+        default=DEFAULT_MAX_BACKOFF_S,
+        help="Longest back-off in seconds for a failing token",
+    )
+    paired_cmd.add_argument(
+        "--heartbeat-interval",
+        type=float,
+        default=DEFAULT_HEARTBEAT_INTERVAL_S,
+        help="Seconds between heartbeat rows for pairs whose books are unchanged (0 disables)",
+    )
+    paired_cmd.add_argument(
+        "--book-cache-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Memory cap for the latest-book cache; least recently used tokens are evicted",
+    )
+    paired_cmd.add_argument(
+        "--flush-rows",
+        type=int,
+        default=None,
+        help="Flush the output files after this many buffered rows",
+    )
+    paired_cmd.add_argument(
+        "--flush-interval",
+        type=float,
+        default=None,
+        help="Flush the output files when this many seconds have passed since the last flush",
+    )
+    paired_cmd.add_argument(
+        "--flush-every-sweep",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Flush the output files at the end of every sweep (default: on)",
+    )
+    paired_cmd.add_argument(
+        "--format",
+        choices=SINK_FORMATS,
+        default="csv",
+        help="Output format for quotes and signals; parquet needs the 'parquet' extra",
+    )
+    paired_cmd.add_argument(
+        "--row-group-size",
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help="Rows per Parquet row group",
+    )
+    paired_cmd.add_argument(
+        "--compression",
+        choices=PARQUET_COMPRESSIONS,
+        default=DEFAULT_PARQUET_COMPRESSION,
+        help="Parquet compression codec",
+    )
+    paired_cmd.add_argument(
+        "--rotate-interval",
+        type=float,
+        default=None,
+        help="Start new output segments on multiples of this many seconds (e.g. 3600)",
+    )
+    paired_cmd.add_argument(
+        "--rotate-mb",
+        type=float,
+        default=None,
+        help="Start new output segments once the current one reaches this size",
+    )
+    paired_cmd.add_argument(
+        "--segment-compression",
+        choices=SEGMENT_COMPRESSIONS,
+        default="auto",
+        help="Codec for closed CSV segments (auto: zstd when installed, else gzip)",
+    )
+    paired_cmd.add_argument(
+        "--background-writer",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Write output files on a separate thread (default: on)",
+    )
+    paired_cmd.add_argument(
+        "--writer-queue",
+        type=int,
+        default=DEFAULT_WRITER_QUEUE,
+        help="Rows the background writer may have queued before backpressure applies",
+    )
+    paired_cmd.add_argument(
+        "--writer-backpressure",
+        choices=BACKPRESSURE_MODES,
+        default="block",
+        help="What to do when the writer queue is full",
+    )
+    paired_cmd.add_argument(
+        "--stats-interval",
+        type=float,
+        default=DEFAULT_STATS_LOG_INTERVAL_S,
+        help="Seconds between book cache and writer stats log lines (0: only at exit)",
+    )
+    paired_cmd.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=DEFAULT_CHECKPOINT_INTERVAL_S,
+        help="Seconds between session checkpoints in the output directory (0: only at exit)",
+    )
+    paired_cmd.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Continue the checkpointed session in --out (default: the newest run in "
+        "data/marketdata) instead of starting a new one",
+    )
     paired_cmd.add_argument(
         "--log-level",
         choices=("DEBUG", "INFO", "WARNING"),
@@ -92,7 +429,26 @@ def main(argv: list[str] | None = None) -> None:
     parser = _build_parser()
     args = parser.parse_args(argv)
     _setup_logging(args.log_level or "INFO")
+    configure(
+        TransportConfig(
+            max_connections=args.max_connections,
+            max_keepalive_connections=args.max_keepalive,
+            keepalive_expiry_s=args.keepalive_expiry,
+            http2=args.http2,
+            warmup_connections=args.warmup_connections,
+            stats_interval_s=args.http_stats_interval,
+        )
+    )
+    configure_budget(GAMMA, RateBudget(rate_per_s=args.gamma_rate, burst=args.gamma_burst))
+    configure_budget(CLOB, RateBudget(rate_per_s=args.clob_rate, burst=args.clob_burst))
+    try:
+        _run_command(args)
+    finally:
+        close_shared()
+        log_limiter_stats()
+
 
+def _run_command(args: argparse.Namespace) -> None:
     if args.command == "export":
         if args.log_level:
             _setup_logging(args.log_level)
@@ -104,6 +460,7 @@ def main(argv: list[str] | None = None) -> None:
                 raw_events = json.load(handle)
         else:
             gamma_client = GammaClient()
+            gamma_client.warmup(args.warmup_connections)
             try:
                 closed_param = None
                 if args.event_set == "open":
@@ -134,20 +491,216 @@ def main(argv: list[str] | None = None) -> None:
     if args.command == "paired-quotes":
         if args.log_level:
             _setup_logging(args.log_level)
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-        out_dir = Path(args.out) if args.out else Path("data") / "marketdata" / timestamp
-        markets_csv = Path(args.markets_csv)
-        pairs = load_tradable_pairs(markets_csv)
-        market_index = build_market_index(markets_csv)
-        record_paired_quotes(
+        checkpoint: SessionCheckpoint | None = None
+        if args.resume:
+            # The universe comes from the checkpoint, so a restart skips
+            # parsing markets.csv.
+            out_dir, checkpoint = _load_session(args)
+            pairs = [TradablePair(**pair) for pair in checkpoint.pairs]
+            market_index = checkpoint.market_index
+        else:
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            out_dir = Path(args.out) if args.out else Path("data") / "marketdata" / timestamp
+            markets_csv = Path(args.markets_csv)
+            pairs = load_tradable_pairs(markets_csv)
+            market_index = build_market_index(markets_csv)
+        session = SessionCheckpointer(
+            out_dir,
+            args.checkpoint_interval,
+            config=_session_config(args),
+            restored=checkpoint,
+        )
+        if args.mode == "stream":
+            asyncio.run(
+                record_paired_quotes_stream(
+                    pairs,
+                    out_dir=out_dir,
+                    url=args.ws_url,
+                    max_messages=args.iters,
+                    market_index=market_index,
+                    max_leg_skew_ms=args.max_leg_skew_ms,
+                    depth_ladder=args.depth_ladder,
+                    quantities=args.cost_sizes,
+                    book_cache=_build_book_cache(args),
+                    sink=_build_sink(args, out_dir),
+                    session=session,
+                    stats_interval_seconds=args.stats_interval,
+                )
+            )
+        elif args.concurrency > 1:
+            asyncio.run(_record_async(args, pairs, out_dir, market_index, session))
+        else:
+            client = ClobClient(
+                fast_decode=args.fast_decode,
+                hedge=HedgePolicy() if args.hedge else None,
+                tick_books=args.tick_books,
+                sorted_books=args.sorted_books,
+            )
+            try:
+                client.warmup(args.warmup_connections)
+                record_paired_quotes(
+                    pairs,
+                    out_dir=out_dir,
+                    interval_seconds=args.interval,
+                    max_iters=args.iters,
+                    client=client,
+                    market_index=market_index,
+                    batch_books=args.batch_books,
+                    heartbeat_interval_seconds=args.heartbeat_interval,
+                    scheduler=_build_scheduler(args),
+                    max_leg_skew_ms=args.max_leg_skew_ms,
+                    breaker=_build_breaker(args),
+                    batch_snapshots=args.batch_snapshots,
+                    depth_ladder=args.depth_ladder,
+                    quantities=args.cost_sizes,
+                    book_cache=_build_book_cache(args),
+                    sink=_build_sink(args, out_dir),
+                    session=session,
+                    stats_interval_seconds=args.stats_interval,
+                )
+            finally:
+                client.close()
+        print(f"Recorded paired quotes to {out_dir} (pairs={len(pairs)})")
+        return
+
+
+async def _record_async(
+    args: argparse.Namespace,
+    pairs: list[TradablePair],
+    out_dir: Path,
+    market_index: dict[str, dict[str, Any]],
+    session: SessionCheckpointer,
+) -> None:
+    client = AsyncClobClient(
+        max_concurrency=args.concurrency,
+        fast_decode=args.fast_decode,
+        hedge=HedgePolicy() if args.hedge else None,
+        tick_books=args.tick_books,
+        sorted_books=args.sorted_books,
+    )
+    try:
+        await client.warmup(args.warmup_connections)
+        await record_paired_quotes_async(
             pairs,
             out_dir=out_dir,
             interval_seconds=args.interval,
             max_iters=args.iters,
+            client=client,
             market_index=market_index,
+            batch_books=args.batch_books,
+            heartbeat_interval_seconds=args.heartbeat_interval,
+            scheduler=_build_scheduler(args),
+            max_leg_skew_ms=args.max_leg_skew_ms,
+            breaker=_build_breaker(args),
+            batch_snapshots=args.batch_snapshots,
+            depth_ladder=args.depth_ladder,
+            quantities=args.cost_sizes,
+            book_cache=_build_book_cache(args),
+            sink=_build_sink(args, out_dir),
+            session=session,
+            stats_interval_seconds=args.stats_interval,
         )
-        print(f"Recorded paired quotes to {out_dir} (pairs={len(pairs)})")
-        return
+    finally:
+        await client.aclose()
+
+
+# The options that decide which rows are written and to which files and
+# columns; a resumed run takes them from the checkpoint so it keeps appending
+# the same rows to the same files.
+_SESSION_OPTIONS = (
+    "mode",
+    "batch_books",
+    "batch_snapshots",
+    "heartbeat_interval",
+    "depth_ladder",
+    "cost_sizes",
+    "format",
+    "row_group_size",
+    "compression",
+    "rotate_interval",
+    "rotate_mb",
+    "segment_compression",
+)
+
+
+def _session_config(args: argparse.Namespace) -> dict[str, Any]:
+    config = {name: getattr(args, name) for name in _SESSION_OPTIONS}
+    config["depth_ladder"] = list(args.depth_ladder)
+    config["cost_sizes"] = [str(size) for size in args.cost_sizes]
+    return config
+
+
+def _load_session(args: argparse.Namespace) -> tuple[Path, SessionCheckpoint]:
+    if args.out:
+        out_dir = Path(args.out)
+    else:
+        runs = sorted((Path("data") / "marketdata").glob(f"*/{SESSION_FILENAME}"))
+        if not runs:
+            raise SystemExit("No checkpointed session to resume in data/marketdata")
+        out_dir = runs[-1].parent
+    try:
+        checkpoint = load_checkpoint(out_dir)
+    except FileNotFoundError:
+        raise SystemExit(f"No session checkpoint in {out_dir}") from None
+    for name in _SESSION_OPTIONS:
+        if name in checkpoint.config:
+            setattr(args, name, checkpoint.config[name])
+    args.cost_sizes = [Decimal(str(size)) for size in args.cost_sizes]
+    return out_dir, checkpoint
+
+
+def _build_book_cache(args: argparse.Namespace) -> BookCache:
+    return BookCache(max_bytes=int(args.book_cache_mb * 1024 * 1024))
+
+
+def _build_sink(args: argparse.Namespace, out_dir: Path) -> RecordSink:
+    sink = make_sink(
+        args.format,
+        out_dir,
+        FlushPolicy(
+            every_rows=args.flush_rows,
+            every_s=args.flush_interval,
+            on_sweep=args.flush_every_sweep,
+        ),
+        depth_ladder=args.depth_ladder,
+        quantities=args.cost_sizes,
+        row_group_size=args.row_group_size,
+        compression=args.compression,
+        rotation=_build_rotation(args),
+    )
+    if not args.background_writer:
+        return sink
+    return ThreadedSink(sink, max_queue=args.writer_queue, backpressure=args.writer_backpressure)
+
+
+def _build_rotation(args: argparse.Namespace) -> RotationPolicy | None:
+    if args.rotate_interval is None and args.rotate_mb is None:
+        return None
+    return RotationPolicy(
+        every_s=args.rotate_interval,
+        max_bytes=int(args.rotate_mb * 1024 * 1024) if args.rotate_mb is not None else None,
+        compression=args.segment_compression,
+    )
+
+
+def _build_breaker(args: argparse.Namespace) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=args.breaker_failures, max_backoff_s=args.breaker_max_backoff
+    )
+
+
+def _build_scheduler(args: argparse.Namespace) -> AdaptivePollScheduler | None:
+    if not args.adaptive:
+        return None
+    # A batched sweep spends one /books request per DEFAULT_BATCH_SIZE tokens.
+    request_cost = 2.0 / DEFAULT_BATCH_SIZE if args.batch_books else 2.0
+    return AdaptivePollScheduler(
+        initial_interval_s=args.interval,
+        min_interval_s=args.min_interval,
+        max_interval_s=args.max_interval,
+        budget_rps=args.poll_budget if args.poll_budget is not None else args.clob_rate,
+        request_cost=request_cost,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+from .models import OrderBook, OrderLevel, TickBook, TickLevels
+
+logger = logging.getLogger(__name__)
+
+Book = OrderBook | TickBook
+EvictListener = Callable[[str], None]
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Rough per-object sizes for book_nbytes; only the order of magnitude matters
+# for the memory cap.
+_BOOK_BYTES = sys.getsizeof(object()) * 16
+_LEVEL_BYTES = (
+    sys.getsizeof(OrderLevel(price=Decimal("0.5"), size=Decimal("1")))
+    + 2 * sys.getsizeof(Decimal("0.5"))
+    + 8
+)
+
+
+@dataclass(slots=True)
+class CachedBook:
+    book: Book
+    nbytes: int
+    # Clock time of the last put or touch; a touch means the server confirmed
+    # the book is unchanged.
+    updated_at: float
+
+
+class BookCache:
+    # Latest book per token, shared by the recorder (which fills it every sweep)
+    # and anything else in the process that wants a book without refetching it.
+    # Least recently used tokens are evicted past max_bytes / max_entries, and
+    # evict listeners are told so they can drop state tied to the book.
+    def __init__(
+        self,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+        max_entries: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.evict_listeners: list[EvictListener] = []
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedBook] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, token_id: object) -> bool:
+        return token_id in self._entries
+
+    def get(self, token_id: str, max_age_s: float | None = None) -> Book | None:
+        # A book older than max_age_s counts as stale and is not returned.
+        with self._lock:
+            entry = self._entries.get(token_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            if max_age_s is not None and self._clock() - entry.updated_at > max_age_s:
+                self.stale += 1
+                return None
+            self._entries.move_to_end(token_id)
+            self.hits += 1
+            return entry.book
+
+    def peek(self, token_id: str) -> Book | None:
+        # No stats and no change to the eviction order.
+        entry = self._entries.get(token_id)
+        return entry.book if entry is not None else None
+
+    def age_s(self, token_id: str) -> float | None:
+        entry = self._entries.get(token_id)
+        return self._clock() - entry.updated_at if entry is not None else None
+
+    def put(self, token_id: str, book: Book) -> None:
+        nbytes = book_nbytes(book)
+        with self._lock:
+            previous = self._entries.pop(token_id, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[token_id] = CachedBook(book, nbytes, self._clock())
+            self.nbytes += nbytes
+            evicted = self._evict()
+        for evicted_id in evicted:
+            for listener in self.evict_listeners:
+                listener(evicted_id)
+
+    def touch(self, token_id: str, timestamp_ms: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(token_id)
+            if entry is None:
+                return False
+            entry.book.timestamp_ms = timestamp_ms
+            entry.updated_at = self._clock()
+            self._entries.move_to_end(token_id)
+            return True
+
+    def pop(self, token_id: str) -> Book | None:
+        with self._lock:
+            entry = self._entries.pop(token_id, None)
+            if entry is None:
+                return None
+            self.nbytes -= entry.nbytes
+            return entry.book
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def log_stats(self, level: int = logging.INFO) -> None:
+        stats = self.stats()
+        logger.log(
+            level,
+            "book cache entries=%s bytes=%s hits=%s misses=%s stale=%s evictions=%s hit_rate=%.3f",
+            stats["entries"],
+            stats["nbytes"],
+            stats["hits"],
+            stats["misses"],
+            stats["stale"],
+            stats["evictions"],
+            stats["hit_rate"],
+        )
+
+    def _evict(self) -> list[str]:
+        # The newest entry is never evicted, even when it alone is over the cap.
+        evicted: list[str] = []
+        while len(self._entries) > 1 and self._over_limit():
+            token_id, entry = self._entries.popitem(last=False)
+            self.nbytes -= entry.nbytes
+            self.evictions += 1
+            evicted.append(token_id)
+        return evicted
+
+    def _over_limit(self) -> bool:
+        return (self.max_bytes is not None and self.nbytes > self.max_bytes) or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        )
+
+
+def book_nbytes(book: Book) -> int:
+    # Estimated memory held by a book, for the cache's byte cap.
+    if isinstance(book, TickBook):
+        return _BOOK_BYTES + _tick_nbytes(book.bids) + _tick_nbytes(book.asks)
+    return _BOOK_BYTES + (len(book.bids) + len(book.asks)) * _LEVEL_BYTES
+
+
+def _tick_nbytes(levels: TickLevels) -> int:
+    return sum(
+        column.itemsize * len(column)
+        for column in (levels.prices, levels.sizes, levels.price_exp, levels.size_exp)
+    )
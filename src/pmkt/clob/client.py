@@ -1,52 +1,375 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping, Sequence
 from decimal import Decimal
 from typing import Any
 
 import httpx
 
-from .models import OrderBook, OrderLevel
+from pmkt.ratelimit import CLOB, TokenBucket, get_limiter
+from pmkt.transport import shared_async_client, shared_client, warmup, warmup_async
+
+from . import decode
+from .models import BookBatch, OrderBook, OrderLevel, TickBook
+from .resilience import HedgePolicy
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_BOOK_URL = "https://clob.polymarket.com/book"
+DEFAULT_BOOKS_URL = "https://clob.polymarket.com/books"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_CONCURRENCY = 8
+BookParser = Callable[[str, dict[str, Any]], OrderBook | TickBook]
+# Status codes that mean the batch endpoint is not available at all, as opposed
+# to a transient failure of one request.
+_BATCH_UNSUPPORTED_STATUS = frozenset({404, 405, 501})
 
 
 class ClobClient:
-    def __init__(self, book_url: str = DEFAULT_BOOK_URL, timeout_s: float = 10.0) -> None:
+    def __init__(
+        self,
+        book_url: str = DEFAULT_BOOK_URL,
+        timeout_s: float = 10.0,
+        books_url: str | None = DEFAULT_BOOKS_URL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        client: httpx.Client | None = None,
+        limiter: TokenBucket | None = None,
+        fast_decode: bool = False,
+        hedge: HedgePolicy | None = None,
+        tick_books: bool = False,
+        sorted_books: bool = False,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
         self._book_url = book_url
-        self._client = httpx.Client(timeout=timeout_s)
+        self._books_url = books_url
+        self._batch_size = batch_size
+        self._timeout = timeout_s
+        self._client = client or shared_client()
+        self._limiter = limiter or get_limiter(CLOB)
+        self._fast_decode = fast_decode
+        self._parse = _book_parser(fast_decode, tick_books, sorted_books)
+        self.hedge = hedge
 
     def fetch_book(self, token_id: str) -> dict[str, Any]:
-        response = self._client.get(self._book_url, params={"token_id": token_id})
-        response.raise_for_status()
-        data = response.json()
+        response = self._send(
+            lambda: self._client.get(
+                self._book_url, params={"token_id": token_id}, timeout=self._timeout
+            )
+        )
+        data = _response_json(response, self._fast_decode)
         if not isinstance(data, dict):
             raise ValueError("Unexpected order book payload")
         return data
 
-    def get_order_book(self, token_id: str) -> OrderBook:
-        payload = self.fetch_book(token_id)
-        bids = _parse_levels(payload.get("bids", []))
-        asks = _parse_levels(payload.get("asks", []))
-        market = str(payload.get("market") or payload.get("conditionId") or "")
-        timestamp_ms = int(payload.get("timestamp") or payload.get("timestampMs") or 0)
-        tick_size = Decimal(str(payload.get("tick_size") or payload.get("tickSize") or "0"))
-        min_order_size = Decimal(
-            str(payload.get("min_order_size") or payload.get("minOrderSize") or "0")
-        )
-        book_hash = payload.get("hash")
-        return OrderBook(
-            token_id=token_id,
-            market=market,
-            timestamp_ms=timestamp_ms,
-            bids=bids,
-            asks=asks,
-            tick_size=tick_size,
-            min_order_size=min_order_size,
-            hash=str(book_hash) if book_hash else None,
+    def fetch_books(self, token_ids: Sequence[str]) -> list[dict[str, Any]]:
+        if not self._books_url:
+            raise RuntimeError("Batch books endpoint is disabled")
+        books_url = self._books_url
+        response = self._send(
+            lambda: self._client.post(
+                books_url, json=_books_request_body(token_ids), timeout=self._timeout
+            )
         )
+        return _books_payload(_response_json(response, self._fast_decode))
+
+    def get_order_book(self, token_id: str) -> OrderBook | TickBook:
+        return self._parse(token_id, self.fetch_book(token_id))
+
+    def get_order_books(
+        self,
+        token_ids: Sequence[str],
+        known_hashes: Mapping[str, str] | None = None,
+    ) -> BookBatch:
+        batch = BookBatch()
+        for chunk in _chunked(token_ids, self._batch_size):
+            missing = list(chunk)
+            if self._books_url:
+                try:
+                    batch.requests += 1
+                    started = time.perf_counter()
+                    payloads = self.fetch_books(chunk)
+                    latency_ms = _elapsed_ms(started)
+                    missing = _collect_batch(batch, chunk, payloads, known_hashes, self._parse)
+                    _record_latency(batch, chunk, latency_ms)
+                except Exception as exc:  # noqa: BLE001 - fall back to /book
+                    if _batch_error_disables(exc):
+                        self._books_url = None
+            for token_id in missing:
+                try:
+                    batch.requests += 1
+                    started = time.perf_counter()
+                    payload = self.fetch_book(token_id)
+                    latency_ms = _elapsed_ms(started)
+                    _absorb_payload(batch, token_id, payload, known_hashes, self._parse)
+                    _record_latency(batch, [token_id], latency_ms)
+                except Exception as exc:  # noqa: BLE001 - report per token
+                    batch.errors[token_id] = exc
+        return batch
+
+    def warmup(self, connections: int = 1) -> None:
+        warmup(self._client, [self._book_url, self._books_url or ""], connections)
 
     def close(self) -> None:
-        self._client.close()
+        # The HTTP pool is either the process-wide shared one or owned by the caller.
+        if self.hedge is not None:
+            self.hedge.close()
+
+    def _send(self, request: Callable[[], httpx.Response]) -> httpx.Response:
+        def attempt() -> httpx.Response:
+            self._limiter.acquire()
+            response = request()
+            response.raise_for_status()
+            return response
+
+        return attempt() if self.hedge is None else self.hedge.run(attempt)
+
+
+class AsyncClobClient:
+    def __init__(
+        self,
+        book_url: str = DEFAULT_BOOK_URL,
+        timeout_s: float = 10.0,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        client: httpx.AsyncClient | None = None,
+        books_url: str | None = DEFAULT_BOOKS_URL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        limiter: TokenBucket | None = None,
+        fast_decode: bool = False,
+        hedge: HedgePolicy | None = None,
+        tick_books: bool = False,
+        sorted_books: bool = False,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self._book_url = book_url
+        self._books_url = books_url
+        self._batch_size = batch_size
+        self._timeout = timeout_s
+        self._own_client = client is None
+        self._client = client or shared_async_client()
+        self._limiter = limiter or get_limiter(CLOB)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self._fast_decode = fast_decode
+        self._parse = _book_parser(fast_decode, tick_books, sorted_books)
+        self.hedge = hedge
+
+    async def fetch_book(self, token_id: str) -> dict[str, Any]:
+        response = await self._send(
+            lambda: self._client.get(
+                self._book_url, params={"token_id": token_id}, timeout=self._timeout
+            )
+        )
+        data = _response_json(response, self._fast_decode)
+        if not isinstance(data, dict):
+            raise ValueError("Unexpected order book payload")
+        return data
+
+    async def fetch_books(self, token_ids: Sequence[str]) -> list[dict[str, Any]]:
+        if not self._books_url:
+            raise RuntimeError("Batch books endpoint is disabled")
+        books_url = self._books_url
+        response = await self._send(
+            lambda: self._client.post(
+                books_url, json=_books_request_body(token_ids), timeout=self._timeout
+            )
+        )
+        return _books_payload(_response_json(response, self._fast_decode))
+
+    async def get_order_book(self, token_id: str) -> OrderBook | TickBook:
+        return self._parse(token_id, await self.fetch_book(token_id))
+
+    async def get_order_books(
+        self,
+        token_ids: Sequence[str],
+        known_hashes: Mapping[str, str] | None = None,
+    ) -> BookBatch:
+        batch = BookBatch()
+        await asyncio.gather(
+            *(
+                self._fill_chunk(batch, chunk, known_hashes)
+                for chunk in _chunked(token_ids, self._batch_size)
+            )
+        )
+        return batch
+
+    async def warmup(self, connections: int = 1) -> None:
+        await warmup_async(self._client, [self._book_url, self._books_url or ""], connections)
+
+    async def aclose(self) -> None:
+        if self.hedge is not None:
+            self.hedge.close()
+        if self._own_client:
+            await self._client.aclose()
+
+    async def _send(self, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        async def attempt() -> httpx.Response:
+            await self._limiter.acquire_async()
+            async with self._semaphore:
+                response = await request()
+            response.raise_for_status()
+            return response
+
+        return await (attempt() if self.hedge is None else self.hedge.run_async(attempt))
+
+    async def _fill_chunk(
+        self,
+        batch: BookBatch,
+        chunk: list[str],
+        known_hashes: Mapping[str, str] | None,
+    ) -> None:
+        missing = chunk
+        if self._books_url:
+            try:
+                batch.requests += 1
+                started = time.perf_counter()
+                payloads = await self.fetch_books(chunk)
+                latency_ms = _elapsed_ms(started)
+                missing = _collect_batch(batch, chunk, payloads, known_hashes, self._parse)
+                _record_latency(batch, chunk, latency_ms)
+            except Exception as exc:  # noqa: BLE001 - fall back to /book
+                if _batch_error_disables(exc):
+                    self._books_url = None
+        results = await asyncio.gather(
+            *(self._timed_fetch_book(token_id) for token_id in missing),
+            return_exceptions=True,
+        )
+        batch.requests += len(missing)
+        for token_id, result in zip(missing, results, strict=True):
+            if isinstance(result, Exception):
+                batch.errors[token_id] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                payload, latency_ms = result
+                try:
+                    _absorb_payload(batch, token_id, payload, known_hashes, self._parse)
+                    batch.latency_ms[token_id] = latency_ms
+                except Exception as exc:  # noqa: BLE001 - report per token
+                    batch.errors[token_id] = exc
+
+    async def _timed_fetch_book(self, token_id: str) -> tuple[dict[str, Any], float]:
+        started = time.perf_counter()
+        payload = await self.fetch_book(token_id)
+        return payload, _elapsed_ms(started)
+
+
+def _order_book_from_payload(token_id: str, payload: dict[str, Any]) -> OrderBook:
+    bids = _parse_levels(payload.get("bids", []))
+    asks = _parse_levels(payload.get("asks", []))
+    market = str(payload.get("market") or payload.get("conditionId") or "")
+    timestamp_ms = _payload_timestamp_ms(payload)
+    tick_size = Decimal(str(payload.get("tick_size") or payload.get("tickSize") or "0"))
+    min_order_size = Decimal(
+        str(payload.get("min_order_size") or payload.get("minOrderSize") or "0")
+    )
+    book_hash = payload.get("hash")
+    return OrderBook(
+        token_id=token_id,
+        market=market,
+        timestamp_ms=timestamp_ms,
+        bids=bids,
+        asks=asks,
+        tick_size=tick_size,
+        min_order_size=min_order_size,
+        hash=str(book_hash) if book_hash else None,
+    )
+
+
+def _book_parser(
+    fast_decode: bool, tick_books: bool = False, sorted_books: bool = False
+) -> BookParser:
+    if tick_books:
+        return decode.tick_book_from_payload
+    if sorted_books:
+        return decode.sorted_book_from_payload
+    return decode.book_from_payload if fast_decode else _order_book_from_payload
+
+
+def _response_json(response: httpx.Response, fast_decode: bool) -> Any:
+    # The fast path hands the raw body to the decoder instead of letting httpx
+    # decode it to text first.
+    return decode.loads(response.content) if fast_decode else response.json()
+
+
+def _books_request_body(token_ids: Sequence[str]) -> list[dict[str, str]]:
+    return [{"token_id": token_id} for token_id in token_ids]
+
+
+def _books_payload(data: Any) -> list[dict[str, Any]]:
+    if not isinstance(data, list):
+        raise ValueError("Unexpected order books payload")
+    return [item for item in data if isinstance(item, dict)]
+
+
+def _payload_timestamp_ms(payload: dict[str, Any]) -> int:
+    return int(payload.get("timestamp") or payload.get("timestampMs") or 0)
+
+
+def _absorb_payload(
+    batch: BookBatch,
+    token_id: str,
+    payload: dict[str, Any],
+    known_hashes: Mapping[str, str] | None,
+    parse: BookParser = _order_book_from_payload,
+) -> None:
+    # Comparing the server hash first lets unchanged books skip level parsing.
+    book_hash = payload.get("hash")
+    if known_hashes and book_hash and known_hashes.get(token_id) == str(book_hash):
+        batch.unchanged[token_id] = _payload_timestamp_ms(payload)
+        return
+    batch.books[token_id] = parse(token_id, payload)
+
+
+def _collect_batch(
+    batch: BookBatch,
+    chunk: Sequence[str],
+    payloads: list[dict[str, Any]],
+    known_hashes: Mapping[str, str] | None = None,
+    parse: BookParser = _order_book_from_payload,
+) -> list[str]:
+    wanted = set(chunk)
+    for payload in payloads:
+        token_id = str(payload.get("asset_id") or payload.get("token_id") or "")
+        if token_id in wanted:
+            _absorb_payload(batch, token_id, payload, known_hashes, parse)
+    return [
+        token_id
+        for token_id in chunk
+        if token_id not in batch.books and token_id not in batch.unchanged
+    ]
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _record_latency(batch: BookBatch, token_ids: Sequence[str], latency_ms: float) -> None:
+    for token_id in token_ids:
+        if token_id in batch.books or token_id in batch.unchanged:
+            batch.latency_ms[token_id] = latency_ms
+
+
+def _batch_error_disables(exc: Exception) -> bool:
+    if (
+        isinstance(exc, httpx.HTTPStatusError)
+        and exc.response.status_code in _BATCH_UNSUPPORTED_STATUS
+    ):
+        logger.info("Batch books endpoint unavailable (%s); using /book", exc)
+        return True
+    logger.warning("Batch books request failed, retrying per token: %s", exc)
+    return False
+
+
+def _chunked(items: Sequence[str], size: int) -> Iterator[list[str]]:
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
 
 
 def _parse_levels(raw_levels: Any) -> list[OrderLevel]:
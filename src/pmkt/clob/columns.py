@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+import numpy.typing as npt
+
+from .models import OrderBook, OrderLevel, TickBook, TickLevels
+
+Side = Literal["bid", "ask"]
+FloatArray = npt.NDArray[np.float64]
+
+
+@dataclass(slots=True)
+class ColumnarBook:
+    # Each side as contiguous float64 price and size columns, best level first
+    # (bids descending, asks ascending). Meant for ladder features computed on
+    # every tick; the paired CSV keeps using the exact Decimal/TickBook values.
+    token_id: str
+    market: str
+    timestamp_ms: int
+    bid_prices: FloatArray
+    bid_sizes: FloatArray
+    ask_prices: FloatArray
+    ask_sizes: FloatArray
+    tick_size: float
+    hash: str | None
+
+    @classmethod
+    def from_order_book(cls, book: OrderBook) -> ColumnarBook:
+        bid_prices, bid_sizes = _level_columns(book.bids, descending=True)
+        ask_prices, ask_sizes = _level_columns(book.asks, descending=False)
+        return cls(
+            token_id=book.token_id,
+            market=book.market,
+            timestamp_ms=book.timestamp_ms,
+            bid_prices=bid_prices,
+            bid_sizes=bid_sizes,
+            ask_prices=ask_prices,
+            ask_sizes=ask_sizes,
+            tick_size=float(book.tick_size),
+            hash=book.hash,
+        )
+
+    @classmethod
+    def from_tick_book(cls, book: TickBook) -> ColumnarBook:
+        # TickLevels are already sorted best first; their int64 buffers are read
+        # without copying and scaled once.
+        bid_prices, bid_sizes = _tick_columns(book.bids, book.price_dp, book.size_dp)
+        ask_prices, ask_sizes = _tick_columns(book.asks, book.price_dp, book.size_dp)
+        return cls(
+            token_id=book.token_id,
+            market=book.market,
+            timestamp_ms=book.timestamp_ms,
+            bid_prices=bid_prices,
+            bid_sizes=bid_sizes,
+            ask_prices=ask_prices,
+            ask_sizes=ask_sizes,
+            tick_size=float(book.tick_size),
+            hash=book.hash,
+        )
+
+    @classmethod
+    def from_payload(cls, token_id: str, payload: dict[str, Any]) -> ColumnarBook:
+        # numpy parses the price/size strings itself, so no Decimal is built.
+        bid_prices, bid_sizes = _payload_columns(payload.get("bids"), descending=True)
+        ask_prices, ask_sizes = _payload_columns(payload.get("asks"), descending=False)
+        book_hash = payload.get("hash")
+        return cls(
+            token_id=token_id,
+            market=str(payload.get("market") or payload.get("conditionId") or ""),
+            timestamp_ms=int(payload.get("timestamp") or payload.get("timestampMs") or 0),
+            bid_prices=bid_prices,
+            bid_sizes=bid_sizes,
+            ask_prices=ask_prices,
+            ask_sizes=ask_sizes,
+            tick_size=float(payload.get("tick_size") or payload.get("tickSize") or 0),
+            hash=str(book_hash) if book_hash else None,
+        )
+
+    def best_bid(self) -> tuple[float, float] | None:
+        if not self.bid_prices.size:
+            return None
+        return float(self.bid_prices[0]), float(self.bid_sizes[0])
+
+    def best_ask(self) -> tuple[float, float] | None:
+        if not self.ask_prices.size:
+            return None
+        return float(self.ask_prices[0]), float(self.ask_sizes[0])
+
+    def mid(self) -> float | None:
+        if not self.bid_prices.size or not self.ask_prices.size:
+            return None
+        return float(self.bid_prices[0] + self.ask_prices[0]) / 2
+
+    def prices(self, side: Side) -> FloatArray:
+        return self.bid_prices if side == "bid" else self.ask_prices
+
+    def sizes(self, side: Side) -> FloatArray:
+        return self.bid_sizes if side == "bid" else self.ask_sizes
+
+    def cumulative_depth(self, side: Side) -> FloatArray:
+        # Element i is the size available in the best i + 1 levels.
+        return np.cumsum(self.sizes(side))
+
+    def depth(self, side: Side, levels: int) -> float:
+        return float(self.sizes(side)[: max(0, levels)].sum())
+
+    def vwap(self, side: Side, quantities: Sequence[float] | FloatArray) -> FloatArray:
+        # Average fill price for each quantity when walking the side from the best
+        # level; NaN where the side is too thin to fill it.
+        return vwap(self.prices(side), self.sizes(side), quantities)
+
+    def depth_within_ticks(self, ticks: int) -> tuple[float, float]:
+        # Bid and ask size priced within `ticks` ticks of the mid, inclusive.
+        mid = self.mid()
+        if mid is None:
+            return 0.0, 0.0
+        band = ticks * self.tick_size + _EPSILON
+        # Bids are descending, so search the negated column.
+        bid_count = np.searchsorted(-self.bid_prices, -(mid - band), side="right")
+        ask_count = np.searchsorted(self.ask_prices, mid + band, side="right")
+        return float(self.bid_sizes[:bid_count].sum()), float(self.ask_sizes[:ask_count].sum())
+
+
+# Float slack so a level exactly N ticks away still counts after rounding.
+_EPSILON = 1e-9
+
+
+def vwap(
+    prices: FloatArray, sizes: FloatArray, quantities: Sequence[float] | FloatArray
+) -> FloatArray:
+    # Levels are consumed in the order given. One cumsum per column and one
+    # searchsorted for all quantities, however deep the ladder is.
+    targets = np.asarray(quantities, dtype=np.float64)
+    filled = np.cumsum(sizes)
+    cost = np.cumsum(prices * sizes)
+    if not filled.size:
+        return np.full(targets.shape, np.nan)
+    # Index of the level that completes each quantity.
+    index = np.searchsorted(filled, targets, side="left")
+    fillable = (index < filled.size) & (targets > 0)
+    index = np.minimum(index, filled.size - 1)
+    before = index - 1
+    filled_before = np.where(before >= 0, filled[before], 0.0)
+    cost_before = np.where(before >= 0, cost[before], 0.0)
+    total = cost_before + (targets - filled_before) * prices[index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(fillable, total / targets, np.nan)
+
+
+def _level_columns(levels: list[OrderLevel], *, descending: bool) -> tuple[FloatArray, FloatArray]:
+    prices = np.array([level.price for level in levels], dtype=np.float64)
+    sizes = np.array([level.size for level in levels], dtype=np.float64)
+    return _sorted_columns(prices, sizes, descending=descending)
+
+
+def _payload_columns(raw_levels: Any, *, descending: bool) -> tuple[FloatArray, FloatArray]:
+    levels = [
+        item
+        for item in (raw_levels if isinstance(raw_levels, list) else [])
+        if type(item) is dict and item.get("price") is not None and item.get("size") is not None
+    ]
+    prices = np.array([item["price"] for item in levels], dtype=np.float64)
+    sizes = np.array([item["size"] for item in levels], dtype=np.float64)
+    return _sorted_columns(prices, sizes, descending=descending)
+
+
+def _tick_columns(side: TickLevels, price_dp: int, size_dp: int) -> tuple[FloatArray, FloatArray]:
+    prices = np.frombuffer(side.prices, dtype=np.int64) / 10**price_dp
+    sizes = np.frombuffer(side.sizes, dtype=np.int64) / 10**size_dp
+    return prices, sizes
+
+
+def _sorted_columns(
+    prices: FloatArray, sizes: FloatArray, *, descending: bool
+) -> tuple[FloatArray, FloatArray]:
+    # A stable sort keeps server order for equal prices, as OrderBook.top_bids/top_asks do.
+    order = np.argsort(-prices if descending else prices, kind="stable")
+    return prices[order], sizes[order]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+from array import array
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any
+
+from . import fixed
+from .models import OrderBook, OrderLevel, SortedOrderBook, TickBook, TickLevels
+
+try:  # orjson parses bytes without the str round trip and is several times faster
+    import orjson
+except ImportError:  # pragma: no cover - depends on optional extra
+    orjson = None  # type: ignore[assignment]
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+_DECIMAL_CACHE_LIMIT = 1 << 16
+# Prices live on a small tick grid and sizes repeat a lot, so the same strings
+# come back on every poll. Decimal is immutable, which makes sharing safe.
+_decimal_cache: dict[str, Decimal] = {}
+
+
+def loads(raw: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decode_book(token_id: str, raw: bytes | str) -> OrderBook:
+    payload = loads(raw)
+    if not isinstance(payload, dict):
+        raise ValueError("Unexpected order book payload")
+    return book_from_payload(token_id, payload)
+
+
+def book_from_payload(
+    token_id: str, payload: dict[str, Any], book_type: type[OrderBook] = OrderBook
+) -> OrderBook:
+    book_hash = payload.get("hash")
+    return book_type(
+        token_id=token_id,
+        market=str(payload.get("market") or payload.get("conditionId") or ""),
+        timestamp_ms=int(payload.get("timestamp") or payload.get("timestampMs") or 0),
+        bids=parse_levels(payload.get("bids")),
+        asks=parse_levels(payload.get("asks")),
+        tick_size=to_decimal(payload.get("tick_size") or payload.get("tickSize") or "0"),
+        min_order_size=to_decimal(
+            payload.get("min_order_size") or payload.get("minOrderSize") or "0"
+        ),
+        hash=str(book_hash) if book_hash else None,
+    )
+
+
+def sorted_book_from_payload(token_id: str, payload: dict[str, Any]) -> OrderBook:
+    return book_from_payload(token_id, payload, SortedOrderBook)
+
+
+def parse_levels(raw_levels: Any) -> list[OrderLevel]:
+    if not isinstance(raw_levels, list):
+        return []
+    if len(_decimal_cache) >= _DECIMAL_CACHE_LIMIT:
+        _decimal_cache.clear()
+    cached = _decimal_cache.get
+    levels: list[OrderLevel] = []
+    append = levels.append
+    for item in raw_levels:
+        if type(item) is not dict:
+            continue
+        price = item.get("price")
+        size = item.get("size")
+        if price is None or size is None:
+            continue
+        # Inlined to_decimal: this loop is the whole point of the module.
+        price_value = cached(price) if type(price) is str else None
+        if price_value is None:
+            price_value = to_decimal(price)
+        size_value = cached(size) if type(size) is str else None
+        if size_value is None:
+            size_value = to_decimal(size)
+        append(OrderLevel(price_value, size_value))
+    return levels
+
+
+def to_decimal(value: Any) -> Decimal:
+    if type(value) is not str:
+        # Matches the reference parser: floats and ints go through their repr.
+        return Decimal(str(value))
+    cached = _decimal_cache.get(value)
+    if cached is None:
+        if len(_decimal_cache) >= _DECIMAL_CACHE_LIMIT:
+            _decimal_cache.clear()
+        cached = _decimal_cache[value] = Decimal(value)
+    return cached
+
+
+def tick_book_from_payload(token_id: str, payload: dict[str, Any]) -> TickBook:
+    bids = _fixed_columns(payload.get("bids"))
+    asks = _fixed_columns(payload.get("asks"))
+    # One scale per book: enough decimal places for its most precise value.
+    price_dp = -min([0, *bids[1], *asks[1]])
+    size_dp = -min([0, *bids[3], *asks[3]])
+    book_hash = payload.get("hash")
+    return TickBook(
+        token_id=token_id,
+        market=str(payload.get("market") or payload.get("conditionId") or ""),
+        timestamp_ms=int(payload.get("timestamp") or payload.get("timestampMs") or 0),
+        bids=_tick_levels(bids, price_dp, size_dp, best_is_highest=True),
+        asks=_tick_levels(asks, price_dp, size_dp, best_is_highest=False),
+        price_dp=price_dp,
+        size_dp=size_dp,
+        tick_size=to_decimal(payload.get("tick_size") or payload.get("tickSize") or "0"),
+        min_order_size=to_decimal(
+            payload.get("min_order_size") or payload.get("minOrderSize") or "0"
+        ),
+        hash=str(book_hash) if book_hash else None,
+    )
+
+
+# Price coefficients, price exponents, size coefficients, size exponents.
+_Columns = tuple[list[int], list[int], list[int], list[int]]
+
+
+def _fixed_columns(raw_levels: Any) -> _Columns:
+    price_coef: list[int] = []
+    price_exp: list[int] = []
+    size_coef: list[int] = []
+    size_exp: list[int] = []
+    if not isinstance(raw_levels, list):
+        return price_coef, price_exp, size_coef, size_exp
+    cached = fixed.cached
+    parse = fixed.parse
+    for item in raw_levels:
+        if type(item) is not dict:
+            continue
+        price = item.get("price")
+        size = item.get("size")
+        if price is None or size is None:
+            continue
+        # Inlined cache hit of fixed.parse, as parse_levels does for Decimal.
+        price_value = cached(price) if type(price) is str else None
+        if price_value is None:
+            price_value = parse(price)
+        size_value = cached(size) if type(size) is str else None
+        if size_value is None:
+            size_value = parse(size)
+        price_coef.append(price_value[0])
+        price_exp.append(price_value[1])
+        size_coef.append(size_value[0])
+        size_exp.append(size_value[1])
+    return price_coef, price_exp, size_coef, size_exp
+
+
+def _tick_levels(
+    columns: _Columns, price_dp: int, size_dp: int, *, best_is_highest: bool
+) -> TickLevels:
+    price_coef, price_exp, size_coef, size_exp = columns
+    prices = _scaled(price_coef, price_exp, price_dp)
+    sizes = _scaled(size_coef, size_exp, size_dp)
+    # sorted() is stable in both directions, so equal prices keep server order,
+    # matching what max()/min() and top_bids/top_asks pick on an OrderBook.
+    order = sorted(range(len(prices)), key=prices.__getitem__, reverse=best_is_highest)
+    if len(order) > 1:
+        pick = itemgetter(*order)
+        prices = pick(prices)
+        sizes = pick(sizes)
+        price_exp = pick(price_exp)
+        size_exp = pick(size_exp)
+    return TickLevels(
+        prices=array("q", prices),
+        sizes=array("q", sizes),
+        price_exp=array("b", price_exp),
+        size_exp=array("b", size_exp),
+    )
+
+
+def _scaled(coefficients: list[int], exponents: list[int], dp: int) -> list[int]:
+    if exponents and min(exponents) == max(exponents) == -dp:
+        return coefficients  # the usual case: every value already has dp places
+    return [
+        coefficient * 10 ** (dp + exponent)
+        for coefficient, exponent in zip(coefficients, exponents, strict=True)
+    ]
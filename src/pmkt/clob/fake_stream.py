@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Iterable
+from typing import Any
+
+
+def book_event(
+    token_id: str,
+    *,
+    market: str = "cond-1",
+    bids: Iterable[tuple[str, str]] = (("0.01", "1000"), ("0.49", "687")),
+    asks: Iterable[tuple[str, str]] = (("0.99", "1000"), ("0.51", "687")),
+    timestamp_ms: int = 1000,
+    book_hash: str | None = None,
+) -> dict[str, Any]:
+    return {
+        "event_type": "book",
+        "asset_id": token_id,
+        "market": market,
+        "bids": [{"price": price, "size": size} for price, size in bids],
+        "asks": [{"price": price, "size": size} for price, size in asks],
+        "timestamp": str(timestamp_ms),
+        "hash": book_hash or f"hash-{token_id}-{timestamp_ms}",
+    }
+
+
+def price_change_event(
+    token_id: str,
+    price: str,
+    size: str,
+    side: str,
+    *,
+    market: str = "cond-1",
+    timestamp_ms: int = 2000,
+    book_hash: str | None = None,
+) -> dict[str, Any]:
+    return {
+        "event_type": "price_change",
+        "market": market,
+        "timestamp": str(timestamp_ms),
+        "price_changes": [
+            {
+                "asset_id": token_id,
+                "price": price,
+                "size": size,
+                "side": side,
+                "hash": book_hash or f"hash-{token_id}-{timestamp_ms}",
+            }
+        ],
+    }
+
+
+class FakeMarketServer:
+    def __init__(
+        self,
+        books: dict[str, dict[str, Any]] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.books = books or {}
+        self.host = host
+        self.port = port
+        self.subscriptions: list[list[str]] = []
+        self.pings = 0
+        self._server: Any = None
+        self._clients: set[Any] = set()
+        self._subscribed = asyncio.Condition()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        from websockets.asyncio.server import serve
+
+        self._server = await serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def wait_subscribed(self, count: int, timeout_s: float = 5.0) -> None:
+        async with self._subscribed:
+            await asyncio.wait_for(
+                self._subscribed.wait_for(lambda: len(self.subscriptions) >= count),
+                timeout=timeout_s,
+            )
+
+    async def publish(self, events: list[dict[str, Any]]) -> None:
+        message = json.dumps(events)
+        for client in list(self._clients):
+            await client.send(message)
+
+    async def drop_connections(self) -> None:
+        for client in list(self._clients):
+            await client.close(code=1011, reason="fake server drop")
+
+    async def _handle(self, websocket: Any) -> None:
+        self._clients.add(websocket)
+        try:
+            async for raw in websocket:
+                if raw == "PING":
+                    self.pings += 1
+                    await websocket.send("PONG")
+                    continue
+                request = json.loads(raw)
+                token_ids = [str(token_id) for token_id in request.get("assets_ids") or []]
+                snapshots = [
+                    self.books.get(token_id) or book_event(token_id) for token_id in token_ids
+                ]
+                await websocket.send(json.dumps(snapshots))
+                async with self._subscribed:
+                    self.subscriptions.append(token_ids)
+                    self._subscribed.notify_all()
+        except Exception:  # noqa: BLE001 - client went away
+            pass
+        finally:
+            self._clients.discard(websocket)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+# A fixed-point value is (coefficient, exponent), i.e. coefficient * 10**exponent.
+# The exponent is kept exactly as Decimal would, so converting back gives the same
+# str() as doing the arithmetic in Decimal: "0.490" stays "0.490", sums take the
+# smaller exponent, and halving an odd coefficient adds one digit.
+Fixed = tuple[int, int]
+
+ZERO: Fixed = (0, 0)
+_FIXED_CACHE_LIMIT = 1 << 16
+_fixed_cache: dict[str, Fixed] = {}
+# Output values sit on the same tick grid poll after poll, so most conversions
+# back to Decimal are repeats.
+_decimal_cache: dict[Fixed, Decimal] = {}
+_text_cache: dict[Fixed, str] = {}
+_shared_cache: dict[Fixed, Fixed] = {}
+# Bound lookups for hot loops that inline the cache hit of parse() / to_text().
+cached = _fixed_cache.get
+cached_text = _text_cache.get
+
+
+def parse(value: Any) -> Fixed:
+    text = value if type(value) is str else str(value)
+    cached = _fixed_cache.get(text)
+    if cached is not None:
+        return cached
+    whole, _, frac = text.partition(".")
+    digits = whole + frac
+    if digits.isdigit() and digits.isascii():
+        fixed = (int(digits), -len(frac))
+    else:
+        sign, digit_tuple, exponent = Decimal(text).as_tuple()
+        if not isinstance(exponent, int):
+            raise ValueError(f"Not a finite number: {text!r}")
+        coefficient = int("".join(map(str, digit_tuple)) or "0")
+        fixed = (-coefficient if sign else coefficient, exponent)
+    if len(_fixed_cache) >= _FIXED_CACHE_LIMIT:
+        _fixed_cache.clear()
+    _fixed_cache[text] = fixed
+    return fixed
+
+
+def scale(value: Fixed, dp: int) -> int:
+    # Integer units of 10**-dp; dp must be at least -exponent.
+    coefficient, exponent = value
+    return coefficient * 10 ** (dp + exponent)
+
+
+def unscale(units: int, dp: int, exponent: int) -> Fixed:
+    return units // 10 ** (dp + exponent), exponent
+
+
+def add(left: Fixed, right: Fixed) -> Fixed:
+    if left[1] == right[1]:
+        return left[0] + right[0], left[1]
+    exponent = min(left[1], right[1])
+    return (
+        left[0] * 10 ** (left[1] - exponent) + right[0] * 10 ** (right[1] - exponent),
+        exponent,
+    )
+
+
+def sub(left: Fixed, right: Fixed) -> Fixed:
+    return add(left, (-right[0], right[1]))
+
+
+def half(value: Fixed) -> Fixed:
+    coefficient, exponent = value
+    if coefficient % 2 == 0:
+        return coefficient // 2, exponent
+    return coefficient * 5, exponent - 1
+
+
+def to_decimal(value: Fixed) -> Decimal:
+    cached = _decimal_cache.get(value)
+    if cached is None:
+        if len(_decimal_cache) >= _FIXED_CACHE_LIMIT:
+            _decimal_cache.clear()
+        cached = _decimal_cache[value] = Decimal(value[0]).scaleb(value[1])
+    return cached
+
+
+def shared(value: Fixed) -> Fixed:
+    # One canonical tuple per value, so records that keep many of them only
+    # hold references.
+    cached = _shared_cache.get(value)
+    if cached is None:
+        if len(_shared_cache) >= _FIXED_CACHE_LIMIT:
+            _shared_cache.clear()
+        cached = _shared_cache[value] = value
+    return cached
+
+
+def to_text(value: Fixed) -> str:
+    # str(to_decimal(value)), cached the same way.
+    cached = _text_cache.get(value)
+    if cached is None:
+        if len(_text_cache) >= _FIXED_CACHE_LIMIT:
+            _text_cache.clear()
+        cached = _text_cache[value] = _format(value)
+    return cached
+
+
+def _format(value: Fixed) -> str:
+    coefficient, exponent = value
+    digits = str(abs(coefficient))
+    # Decimal switches to exponent notation for a positive exponent or an
+    # adjusted exponent below -6; everything else is plain digits.
+    if exponent > 0 or exponent + len(digits) - 1 < -6:
+        return str(Decimal(coefficient).scaleb(exponent))
+    sign = "-" if coefficient < 0 else ""
+    if exponent == 0:
+        return sign + digits
+    digits = digits.rjust(1 - exponent, "0")
+    return f"{sign}{digits[:exponent]}.{digits[exponent:]}"
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, cast
+
+from . import decode
+from .models import OrderLevel, SortedOrderBook
+
+logger = logging.getLogger(__name__)
+
+SnapshotFetcher = Callable[[str], dict[str, Any]]
+BookHasher = Callable[["L2Book"], str]
+
+
+@dataclass(slots=True)
+class LevelChange:
+    token_id: str
+    side: str
+    price: Decimal
+    size: Decimal
+    timestamp_ms: int
+    hash: str | None = None
+    # Only some feeds number their deltas; without one, gaps are found from the
+    # hash (when a hasher is configured) or a crossed book.
+    seq: int | None = None
+
+
+@dataclass(slots=True)
+class L2Book(SortedOrderBook):
+    # A SortedOrderBook whose levels are edited in place, keeping bids highest
+    # first and asks lowest first, so it can go straight to make_paired_snapshot.
+    seq: int | None = None
+
+    def set_level(self, side: str, price: Decimal, size: Decimal) -> None:
+        if side.upper() in {"BUY", "BID"}:
+            levels = self.bids
+            index = bisect_left(levels, -price, key=_bid_order)
+        else:
+            levels = self.asks
+            index = bisect_left(levels, price, key=_ask_order)
+        present = index < len(levels) and levels[index].price == price
+        if size == 0:
+            if present:
+                del levels[index]
+        elif present:
+            levels[index] = OrderLevel(price=price, size=size)
+        else:
+            levels.insert(index, OrderLevel(price=price, size=size))
+
+    def is_crossed(self) -> bool:
+        return bool(self.bids and self.asks and self.bids[0].price >= self.asks[0].price)
+
+
+class L2BookEngine:
+    # Keeps one L2Book per token from a /book snapshot plus incremental changes.
+    # A sequence gap, a hash mismatch or a crossed book drops the local copy and
+    # re-snapshots it through fetch_snapshot (e.g. ClobClient.fetch_book). Without
+    # fetch_snapshot (a feed that sends its own snapshots, like the market
+    # websocket) the book stays dropped and its changes are ignored until the
+    # next apply_snapshot.
+    def __init__(
+        self,
+        fetch_snapshot: SnapshotFetcher | None,
+        hasher: BookHasher | None = None,
+    ) -> None:
+        self.fetch_snapshot = fetch_snapshot
+        self.hasher = hasher
+        self.books: dict[str, L2Book] = {}
+        self.applied = 0
+        self.stale = 0
+        self.gaps = 0
+        self.resyncs = 0
+
+    def apply_snapshot(self, token_id: str, payload: dict[str, Any]) -> L2Book:
+        if "bids" not in payload and "buys" in payload:
+            # Older market-channel "book" events call the sides buys and sells.
+            payload = {**payload, "bids": payload["buys"], "asks": payload.get("sells")}
+        book = cast(L2Book, decode.book_from_payload(token_id, payload, L2Book))
+        book.seq = _payload_seq(payload)
+        self.books[token_id] = book
+        return book
+
+    def resync(self, token_id: str) -> L2Book | None:
+        if self.fetch_snapshot is None:
+            self.books.pop(token_id, None)
+            return None
+        self.resyncs += 1
+        return self.apply_snapshot(token_id, self.fetch_snapshot(token_id))
+
+    def apply(self, change: LevelChange) -> L2Book | None:
+        book = self.books.get(change.token_id)
+        if book is None:
+            book = self.resync(change.token_id)
+            if book is None:
+                return None
+        if 0 < change.timestamp_ms < book.timestamp_ms or (
+            change.seq is not None and book.seq is not None and change.seq <= book.seq
+        ):
+            # Already covered by the snapshot (or a replay of an old delta).
+            self.stale += 1
+            return book
+        if change.seq is not None and book.seq is not None and change.seq != book.seq + 1:
+            return self._gap(change, f"seq {book.seq} -> {change.seq}")
+        book.set_level(change.side, change.price, change.size)
+        book.timestamp_ms = max(book.timestamp_ms, change.timestamp_ms)
+        book.hash = change.hash
+        if change.seq is not None:
+            book.seq = change.seq
+        self.applied += 1
+        if book.is_crossed():
+            return self._gap(change, "crossed book")
+        if self.hasher is not None and change.hash and self.hasher(book) != change.hash:
+            return self._gap(change, "hash mismatch")
+        return book
+
+    def _gap(self, change: LevelChange, reason: str) -> L2Book | None:
+        self.gaps += 1
+        logger.info("Local book %s out of sync after %s", change.token_id, reason)
+        return self.resync(change.token_id)
+
+
+def changes_from_event(event: dict[str, Any]) -> list[LevelChange]:
+    # Parses a market-channel price_change event, in either the current
+    # "price_changes" shape or the older single-asset "changes" shape.
+    if event.get("event_type") != "price_change":
+        return []
+    timestamp_ms = int(event.get("timestamp") or event.get("timestampMs") or 0)
+    changes = event.get("price_changes")
+    if not isinstance(changes, list):
+        changes = [
+            {**change, "asset_id": event.get("asset_id"), "hash": event.get("hash")}
+            for change in event.get("changes") or []
+            if isinstance(change, dict)
+        ]
+    parsed: list[LevelChange] = []
+    for change in changes:
+        if not isinstance(change, dict):
+            continue
+        price = change.get("price")
+        size = change.get("size")
+        if price is None or size is None:
+            continue
+        seq = change.get("seq", event.get("seq"))
+        parsed.append(
+            LevelChange(
+                token_id=str(change.get("asset_id") or ""),
+                side=str(change.get("side") or ""),
+                price=decode.to_decimal(price),
+                size=decode.to_decimal(size),
+                timestamp_ms=timestamp_ms,
+                hash=str(change["hash"]) if change.get("hash") else None,
+                seq=int(seq) if seq is not None else None,
+            )
+        )
+    return parsed
+
+
+def replay(engine: L2BookEngine, events: Iterable[dict[str, Any]]) -> Iterator[L2Book]:
+    # Feeds recorded market-channel events through the engine and yields each
+    # book after every event that touched it.
+    for event in events:
+        if event.get("event_type") == "book":
+            token_id = str(event.get("asset_id") or "")
+            yield engine.apply_snapshot(token_id, event)
+            continue
+        for change in changes_from_event(event):
+            book = engine.apply(change)
+            if book is not None:
+                yield book
+
+
+def _payload_seq(payload: dict[str, Any]) -> int | None:
+    seq = payload.get("seq")
+    return int(seq) if seq is not None else None
+
+
+def _bid_order(level: OrderLevel) -> Decimal:
+    return -level.price
+
+
+def _ask_order(level: OrderLevel) -> Decimal:
+    return level.price
@@ -1,8 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Iterable
+from itertools import islice
+from operator import attrgetter
+from typing import Iterable, overload
+
+from . import fixed
+
+_level_price = attrgetter("price")
 
 
 @dataclass(slots=True)
@@ -48,20 +56,177 @@ class OrderBook:
             return None
         return best_ask[0] - best_bid[0]
 
+    def top_bids(self, n: int) -> Sequence[OrderLevel]:
+        return sorted(self.bids, key=_level_price, reverse=True)[:n]
+
+    def top_asks(self, n: int) -> Sequence[OrderLevel]:
+        return sorted(self.asks, key=_level_price)[:n]
+
     def top_n(self, n: int) -> "OrderBook":
-        bids_sorted = sorted(self.bids, key=lambda level: level.price, reverse=True)
-        asks_sorted = sorted(self.asks, key=lambda level: level.price)
+        # A trimmed copy of the book. Depth and cost code reads top_bids and
+        # top_asks instead, which a SortedOrderBook serves without copying.
+        return OrderBook(
+            token_id=self.token_id,
+            market=self.market,
+            timestamp_ms=self.timestamp_ms,
+            bids=list(self.top_bids(n)),
+            asks=list(self.top_asks(n)),
+            tick_size=self.tick_size,
+            min_order_size=self.min_order_size,
+            hash=self.hash,
+        )
+
+
+@dataclass(slots=True)
+class SortedOrderBook(OrderBook):
+    # Bids highest first and asks lowest first, fixed once at construction, so the
+    # best level is index 0 and top-N depth is a prefix. Callers that edit levels
+    # afterwards must keep that order.
+
+    def __post_init__(self) -> None:
+        # sorted() is linear on input that is already in order or strictly in
+        # reverse order (the server lists best last), and stable, so ties keep
+        # the level max()/min() would pick on a plain OrderBook.
+        self.bids = sorted(self.bids, key=_level_price, reverse=True)
+        self.asks = sorted(self.asks, key=_level_price)
+
+    def best_bid(self) -> tuple[Decimal, Decimal] | None:
+        if not self.bids:
+            return None
+        level = self.bids[0]
+        return level.price, level.size
+
+    def best_ask(self) -> tuple[Decimal, Decimal] | None:
+        if not self.asks:
+            return None
+        level = self.asks[0]
+        return level.price, level.size
+
+    def top_bids(self, n: int) -> Sequence[OrderLevel]:
+        return LevelsView(self.bids, n)
+
+    def top_asks(self, n: int) -> Sequence[OrderLevel]:
+        return LevelsView(self.asks, n)
+
+
+class LevelsView(Sequence[OrderLevel]):
+    # The first n levels of a list, read in place.
+    __slots__ = ("_levels", "_n")
+
+    def __init__(self, levels: list[OrderLevel], n: int) -> None:
+        self._levels = levels
+        self._n = max(0, n)
+
+    def __len__(self) -> int:
+        return min(self._n, len(self._levels))
+
+    def __iter__(self) -> Iterator[OrderLevel]:
+        return islice(self._levels, self._n)
+
+    @overload
+    def __getitem__(self, index: int) -> OrderLevel: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[OrderLevel]: ...
+
+    def __getitem__(self, index: int | slice) -> OrderLevel | list[OrderLevel]:
+        if isinstance(index, slice):
+            return self._levels[: len(self)][index]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("level index out of range")
+        return self._levels[index]
+
+
+@dataclass(slots=True)
+class TickLevels:
+    # One side of a TickBook, best level first. prices/sizes hold integer units of
+    # 10**-price_dp / 10**-size_dp; the *_exp arrays keep each value's original
+    # decimal exponent so it converts back to exactly the Decimal it came from.
+    prices: array[int] = field(default_factory=lambda: array("q"))
+    sizes: array[int] = field(default_factory=lambda: array("q"))
+    price_exp: array[int] = field(default_factory=lambda: array("b"))
+    size_exp: array[int] = field(default_factory=lambda: array("b"))
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def price(self, index: int, dp: int) -> fixed.Fixed:
+        return fixed.unscale(self.prices[index], dp, self.price_exp[index])
+
+    def size(self, index: int, dp: int) -> fixed.Fixed:
+        return fixed.unscale(self.sizes[index], dp, self.size_exp[index])
+
+    def depth(self, levels: int, dp: int) -> fixed.Fixed:
+        # Same exponent as Decimal("0") + size + size + ... in sum_sizes.
+        exponent = min(0, min(self.size_exp[:levels], default=0))
+        return fixed.unscale(sum(self.sizes[:levels]), dp, exponent)
+
+    def to_levels(self, price_dp: int, size_dp: int) -> list[OrderLevel]:
+        return [
+            OrderLevel(
+                price=fixed.to_decimal(self.price(index, price_dp)),
+                size=fixed.to_decimal(self.size(index, size_dp)),
+            )
+            for index in range(len(self.prices))
+        ]
+
+
+@dataclass(slots=True)
+class TickBook:
+    # Compact alternative to OrderBook: about 18 bytes per level instead of two
+    # Decimal objects and an OrderLevel. When tick_size is a power of ten and
+    # price_dp matches it, prices are plain tick counts.
+    token_id: str
+    market: str
+    timestamp_ms: int
+    bids: TickLevels
+    asks: TickLevels
+    price_dp: int
+    size_dp: int
+    tick_size: Decimal
+    min_order_size: Decimal
+    hash: str | None
+
+    def best_bid(self) -> tuple[Decimal, Decimal] | None:
+        return self._best(self.bids)
+
+    def best_ask(self) -> tuple[Decimal, Decimal] | None:
+        return self._best(self.asks)
+
+    def to_order_book(self) -> OrderBook:
         return OrderBook(
             token_id=self.token_id,
             market=self.market,
             timestamp_ms=self.timestamp_ms,
-            bids=bids_sorted[:n],
-            asks=asks_sorted[:n],
+            bids=self.bids.to_levels(self.price_dp, self.size_dp),
+            asks=self.asks.to_levels(self.price_dp, self.size_dp),
             tick_size=self.tick_size,
             min_order_size=self.min_order_size,
             hash=self.hash,
         )
 
+    def _best(self, side: TickLevels) -> tuple[Decimal, Decimal] | None:
+        if not side:
+            return None
+        return (
+            fixed.to_decimal(side.price(0, self.price_dp)),
+            fixed.to_decimal(side.size(0, self.size_dp)),
+        )
+
+
+@dataclass(slots=True)
+class BookBatch:
+    books: dict[str, OrderBook | TickBook] = field(default_factory=dict)
+    # token_id -> server timestamp for books whose hash matched the caller's last one
+    unchanged: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    # token_id -> wall time of the request that returned it
+    latency_ms: dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+
 
 def sum_sizes(levels: Iterable[OrderLevel]) -> Decimal:
     total = Decimal("0")
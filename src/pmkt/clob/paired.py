@@ -1,9 +1,34 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
 from decimal import Decimal
+from itertools import accumulate
+from operator import mul
 
-from .models import OrderBook, sum_sizes
+from . import fixed
+from .models import OrderBook, OrderLevel, TickBook, TickLevels, sum_sizes
+
+
+@dataclass(slots=True)
+class DepthRung:
+    # Cumulative size in the best `levels` levels of each side of both legs.
+    levels: int
+    bid_up: Decimal
+    ask_up: Decimal
+    bid_down: Decimal
+    ask_down: Decimal
+
+
+@dataclass(slots=True)
+class SizeCost:
+    # Dollars to buy (or sold for) `quantity` shares of each leg, walking the
+    # asks (or bids) from the best level; None when a leg is too thin. Buying
+    # both is an arbitrage at this size when buy_both_cost < quantity.
+    quantity: Decimal
+    buy_both_cost: Decimal | None
+    sell_both_proceeds: Decimal | None
 
 
 @dataclass(slots=True)
@@ -34,16 +59,319 @@ class PairedBookSnapshot:
     depth_ask_5_up: Decimal
     depth_bid_5_down: Decimal
     depth_ask_5_down: Decimal
+    # Server timestamp gap between the two legs and the local time spent fetching
+    # them; a large skew means the legs describe different moments.
+    leg_skew_ms: int = 0
+    fetch_latency_ms: float | None = None
+    # Only filled when make_paired_snapshot is given depth_ladder / quantities.
+    depth_ladder: tuple[DepthRung, ...] = ()
+    size_costs: tuple[SizeCost, ...] = ()
+
+
+# The Decimal fields of PairedBookSnapshot, in declaration order.
+DECIMAL_FIELDS = (
+    "a_bid",
+    "a_ask",
+    "a_mid",
+    "a_spread",
+    "a_bid_sz",
+    "a_ask_sz",
+    "b_bid",
+    "b_ask",
+    "b_mid",
+    "b_spread",
+    "b_bid_sz",
+    "b_ask_sz",
+    "mid_sum",
+    "spread_sum",
+    "buy_both_cost",
+    "sell_both_proceeds",
+    "depth_bid_5_up",
+    "depth_ask_5_up",
+    "depth_bid_5_down",
+    "depth_ask_5_down",
+)
+
+
+@dataclass(slots=True)
+class CompactPairedSnapshot:
+    # A PairedBookSnapshot that keeps only the twelve values read off the books,
+    # as fixed-point tuples (mostly the shared ones from fixed.parse's cache).
+    # Mids, spreads and sums are worked out when read, and fixed_values() /
+    # texts() go straight to the CSV strings without building Decimals.
+    ts_ms: int
+    condition_id: str
+    token_a_id: str
+    token_b_id: str
+    outcome_a: str
+    outcome_b: str
+    # leg_values() of book A followed by leg_values() of book B.
+    legs: tuple[fixed.Fixed, ...]
+    leg_skew_ms: int = 0
+    fetch_latency_ms: float | None = None
+    depth_ladder: tuple[DepthRung, ...] = ()
+    size_costs: tuple[SizeCost, ...] = ()
+    # texts() once computed; dataclasses.replace() carries it over, so heartbeat
+    # copies of an unchanged snapshot are not formatted again.
+    rendered: tuple[str, ...] | None = field(default=None, repr=False, compare=False)
+
+    def fixed_values(self) -> tuple[fixed.Fixed, ...]:
+        # Every Decimal field of PairedBookSnapshot, in DECIMAL_FIELDS order.
+        (
+            a_bid,
+            a_ask,
+            a_bid_sz,
+            a_ask_sz,
+            a_depth_bid,
+            a_depth_ask,
+            b_bid,
+            b_ask,
+            b_bid_sz,
+            b_ask_sz,
+            b_depth_bid,
+            b_depth_ask,
+        ) = self.legs
+        a_mid = fixed.half(fixed.add(a_bid, a_ask))
+        b_mid = fixed.half(fixed.add(b_bid, b_ask))
+        a_spread = fixed.sub(a_ask, a_bid)
+        b_spread = fixed.sub(b_ask, b_bid)
+        return (
+            a_bid,
+            a_ask,
+            a_mid,
+            a_spread,
+            a_bid_sz,
+            a_ask_sz,
+            b_bid,
+            b_ask,
+            b_mid,
+            b_spread,
+            b_bid_sz,
+            b_ask_sz,
+            fixed.add(a_mid, b_mid),
+            fixed.add(a_spread, b_spread),
+            fixed.add(a_ask, b_ask),
+            fixed.add(a_bid, b_bid),
+            a_depth_bid,
+            a_depth_ask,
+            b_depth_bid,
+            b_depth_ask,
+        )
+
+    def texts(self) -> tuple[str, ...]:
+        if self.rendered is None:
+            cached = fixed.cached_text
+            self.rendered = tuple(
+                cached(value) or fixed.to_text(value) for value in self.fixed_values()
+            )
+        return self.rendered
+
+    def to_snapshot(self) -> PairedBookSnapshot:
+        return PairedBookSnapshot(
+            ts_ms=self.ts_ms,
+            condition_id=self.condition_id,
+            token_a_id=self.token_a_id,
+            token_b_id=self.token_b_id,
+            outcome_a=self.outcome_a,
+            outcome_b=self.outcome_b,
+            **dict(zip(DECIMAL_FIELDS, map(fixed.to_decimal, self.fixed_values()), strict=True)),
+            leg_skew_ms=self.leg_skew_ms,
+            fetch_latency_ms=self.fetch_latency_ms,
+            depth_ladder=self.depth_ladder,
+            size_costs=self.size_costs,
+        )
+
+    @property
+    def a_bid(self) -> Decimal:
+        return fixed.to_decimal(self.legs[0])
+
+    @property
+    def a_ask(self) -> Decimal:
+        return fixed.to_decimal(self.legs[1])
+
+    @property
+    def a_bid_sz(self) -> Decimal:
+        return fixed.to_decimal(self.legs[2])
+
+    @property
+    def a_ask_sz(self) -> Decimal:
+        return fixed.to_decimal(self.legs[3])
+
+    @property
+    def depth_bid_5_up(self) -> Decimal:
+        return fixed.to_decimal(self.legs[4])
+
+    @property
+    def depth_ask_5_up(self) -> Decimal:
+        return fixed.to_decimal(self.legs[5])
+
+    @property
+    def b_bid(self) -> Decimal:
+        return fixed.to_decimal(self.legs[6])
+
+    @property
+    def b_ask(self) -> Decimal:
+        return fixed.to_decimal(self.legs[7])
+
+    @property
+    def b_bid_sz(self) -> Decimal:
+        return fixed.to_decimal(self.legs[8])
+
+    @property
+    def b_ask_sz(self) -> Decimal:
+        return fixed.to_decimal(self.legs[9])
+
+    @property
+    def depth_bid_5_down(self) -> Decimal:
+        return fixed.to_decimal(self.legs[10])
+
+    @property
+    def depth_ask_5_down(self) -> Decimal:
+        return fixed.to_decimal(self.legs[11])
+
+    @property
+    def a_mid(self) -> Decimal:
+        return fixed.to_decimal(fixed.half(fixed.add(self.legs[0], self.legs[1])))
+
+    @property
+    def b_mid(self) -> Decimal:
+        return fixed.to_decimal(fixed.half(fixed.add(self.legs[6], self.legs[7])))
+
+    @property
+    def a_spread(self) -> Decimal:
+        return fixed.to_decimal(fixed.sub(self.legs[1], self.legs[0]))
+
+    @property
+    def b_spread(self) -> Decimal:
+        return fixed.to_decimal(fixed.sub(self.legs[7], self.legs[6]))
+
+    @property
+    def mid_sum(self) -> Decimal:
+        legs = self.legs
+        a_mid = fixed.half(fixed.add(legs[0], legs[1]))
+        b_mid = fixed.half(fixed.add(legs[6], legs[7]))
+        return fixed.to_decimal(fixed.add(a_mid, b_mid))
+
+    @property
+    def spread_sum(self) -> Decimal:
+        legs = self.legs
+        a_spread = fixed.sub(legs[1], legs[0])
+        b_spread = fixed.sub(legs[7], legs[6])
+        return fixed.to_decimal(fixed.add(a_spread, b_spread))
+
+    @property
+    def buy_both_cost(self) -> Decimal:
+        return fixed.to_decimal(fixed.add(self.legs[1], self.legs[7]))
+
+    @property
+    def sell_both_proceeds(self) -> Decimal:
+        return fixed.to_decimal(fixed.add(self.legs[0], self.legs[6]))
+
+
+# Either snapshot form; both expose the same fields.
+SnapshotRecord = PairedBookSnapshot | CompactPairedSnapshot
+
+
+def make_compact_snapshot(
+    book_a: OrderBook | TickBook,
+    book_b: OrderBook | TickBook,
+    *,
+    outcome_a: str,
+    outcome_b: str,
+    depth_levels: int = 5,
+    fetch_latency_ms: float | None = None,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+) -> CompactPairedSnapshot:
+    # Same inputs, checks and values as make_paired_snapshot.
+    leg_a = leg_values(book_a, depth_levels)
+    if leg_a is None:
+        raise ValueError("Missing book A best bid/ask")
+    leg_b = leg_values(book_b, depth_levels)
+    if leg_b is None:
+        raise ValueError("Missing book B best bid/ask")
+    legs = leg_a + leg_b
+    if isinstance(book_a, TickBook) or isinstance(book_b, TickBook):
+        # Decimal books already yield fixed.parse's cached tuples; tick books
+        # build fresh ones.
+        legs = tuple(map(fixed.shared, legs))
+    rungs, size_costs = pair_ladder(
+        book_a, book_b, depth_ladder=depth_ladder, quantities=quantities
+    )
+    return CompactPairedSnapshot(
+        ts_ms=max(book_a.timestamp_ms, book_b.timestamp_ms),
+        condition_id=book_a.market or book_b.market,
+        token_a_id=book_a.token_id,
+        token_b_id=book_b.token_id,
+        outcome_a=outcome_a,
+        outcome_b=outcome_b,
+        legs=legs,
+        leg_skew_ms=abs(book_a.timestamp_ms - book_b.timestamp_ms),
+        fetch_latency_ms=fetch_latency_ms,
+        depth_ladder=rungs,
+        size_costs=size_costs,
+    )
+
+
+def leg_values(book: OrderBook | TickBook, depth_levels: int) -> tuple[fixed.Fixed, ...] | None:
+    # (bid, ask, bid size, ask size, bid depth, ask depth) as fixed-point values,
+    # or None without a two-sided top of book.
+    if isinstance(book, TickBook):
+        if not book.bids or not book.asks:
+            return None
+        return (
+            book.bids.price(0, book.price_dp),
+            book.asks.price(0, book.price_dp),
+            book.bids.size(0, book.size_dp),
+            book.asks.size(0, book.size_dp),
+            book.bids.depth(depth_levels, book.size_dp),
+            book.asks.depth(depth_levels, book.size_dp),
+        )
+    best_bid = book.best_bid()
+    best_ask = book.best_ask()
+    if best_bid is None or best_ask is None:
+        return None
+    texts = (
+        str(best_bid[0]),
+        str(best_ask[0]),
+        str(best_bid[1]),
+        str(best_ask[1]),
+        str(sum_sizes(book.top_bids(depth_levels))),
+        str(sum_sizes(book.top_asks(depth_levels))),
+    )
+    cached = fixed.cached
+    return tuple(cached(text) or fixed.parse(text) for text in texts)
 
 
 def make_paired_snapshot(
-    book_a: OrderBook,
-    book_b: OrderBook,
+    book_a: OrderBook | TickBook,
+    book_b: OrderBook | TickBook,
     *,
     outcome_a: str,
     outcome_b: str,
     depth_levels: int = 5,
+    fetch_latency_ms: float | None = None,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
 ) -> PairedBookSnapshot:
+    if isinstance(book_a, TickBook) and isinstance(book_b, TickBook):
+        snapshot = _make_tick_snapshot(
+            book_a,
+            book_b,
+            outcome_a=outcome_a,
+            outcome_b=outcome_b,
+            depth_levels=depth_levels,
+            fetch_latency_ms=fetch_latency_ms,
+        )
+        if depth_ladder or quantities:
+            snapshot.depth_ladder, snapshot.size_costs = pair_ladder(
+                book_a, book_b, depth_ladder=depth_ladder, quantities=quantities
+            )
+        return snapshot
+    if isinstance(book_a, TickBook):
+        book_a = book_a.to_order_book()
+    if isinstance(book_b, TickBook):
+        book_b = book_b.to_order_book()
     a_best_bid = book_a.best_bid()
     a_best_ask = book_a.best_ask()
     b_best_bid = book_b.best_bid()
@@ -63,17 +391,18 @@ def make_paired_snapshot(
     a_spread = a_ask - a_bid
     b_spread = b_ask - b_bid
 
-    a_top = book_a.top_n(depth_levels)
-    b_top = book_b.top_n(depth_levels)
-    depth_bid_5_up = sum_sizes(a_top.bids)
-    depth_ask_5_up = sum_sizes(a_top.asks)
-    depth_bid_5_down = sum_sizes(b_top.bids)
-    depth_ask_5_down = sum_sizes(b_top.asks)
+    depth_bid_5_up = sum_sizes(book_a.top_bids(depth_levels))
+    depth_ask_5_up = sum_sizes(book_a.top_asks(depth_levels))
+    depth_bid_5_down = sum_sizes(book_b.top_bids(depth_levels))
+    depth_ask_5_down = sum_sizes(book_b.top_asks(depth_levels))
 
     mid_sum = a_mid + b_mid
     spread_sum = a_spread + b_spread
     buy_both_cost = a_ask + b_ask
     sell_both_proceeds = a_bid + b_bid
+    rungs, size_costs = pair_ladder(
+        book_a, book_b, depth_ladder=depth_ladder, quantities=quantities
+    )
 
     return PairedBookSnapshot(
         ts_ms=max(book_a.timestamp_ms, book_b.timestamp_ms),
@@ -102,4 +431,172 @@ def make_paired_snapshot(
         depth_ask_5_up=depth_ask_5_up,
         depth_bid_5_down=depth_bid_5_down,
         depth_ask_5_down=depth_ask_5_down,
+        leg_skew_ms=abs(book_a.timestamp_ms - book_b.timestamp_ms),
+        fetch_latency_ms=fetch_latency_ms,
+        depth_ladder=rungs,
+        size_costs=size_costs,
+    )
+
+
+def pair_ladder(
+    book_a: OrderBook | TickBook,
+    book_b: OrderBook | TickBook,
+    *,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+) -> tuple[tuple[DepthRung, ...], tuple[SizeCost, ...]]:
+    # Each side is walked once for all quantities, so the cost is one pass over
+    # the levels it takes to fill the largest quantity.
+    if not depth_ladder and not quantities:
+        return (), ()
+    rungs = tuple(
+        DepthRung(
+            levels=levels,
+            bid_up=_depth(book_a, "bid", levels),
+            ask_up=_depth(book_a, "ask", levels),
+            bid_down=_depth(book_b, "bid", levels),
+            ask_down=_depth(book_b, "ask", levels),
+        )
+        for levels in depth_ladder
+    )
+    if not quantities:
+        return rungs, ()
+    asks_a = _side_costs(book_a, "ask", quantities)
+    asks_b = _side_costs(book_b, "ask", quantities)
+    bids_a = _side_costs(book_a, "bid", quantities)
+    bids_b = _side_costs(book_b, "bid", quantities)
+    costs = tuple(
+        SizeCost(
+            quantity=quantity,
+            buy_both_cost=_both(asks_a[index], asks_b[index]),
+            sell_both_proceeds=_both(bids_a[index], bids_b[index]),
+        )
+        for index, quantity in enumerate(quantities)
+    )
+    return rungs, costs
+
+
+def walk_costs(levels: Iterable[OrderLevel], quantities: Sequence[Decimal]) -> list[Decimal | None]:
+    # Dollars paid for each quantity when taking levels in the order given.
+    order = sorted(range(len(quantities)), key=quantities.__getitem__)
+    costs: list[Decimal | None] = [None] * len(quantities)
+    filled = Decimal("0")
+    cost = Decimal("0")
+    position = 0
+    for level in levels:
+        while position < len(order) and quantities[order[position]] <= filled + level.size:
+            target = quantities[order[position]]
+            costs[order[position]] = cost + (target - filled) * level.price
+            position += 1
+        if position == len(order):
+            break
+        filled += level.size
+        cost += level.size * level.price
+    return costs
+
+
+def _tick_walk_costs(
+    side: TickLevels, price_dp: int, size_dp: int, quantities: Sequence[Decimal]
+) -> list[Decimal | None]:
+    # walk_costs in integer units: sizes at size_dp (or the quantities' finer
+    # scale), prices at price_dp, costs at their product. Cumulative sizes are
+    # summed once and each quantity finds its last level by bisection.
+    targets = [fixed.parse(quantity) for quantity in quantities]
+    dp = max([size_dp, *(-exponent for _, exponent in targets)])
+    shift = 10 ** (dp - size_dp)
+    filled = list(accumulate(side.sizes))
+    costs: list[Decimal | None] = []
+    for target in targets:
+        units = fixed.scale(target, dp)
+        # First level whose cumulative size covers the quantity.
+        index = bisect_left(filled, -(-units // shift))
+        if index == len(filled):
+            costs.append(None)
+            continue
+        before = filled[index - 1] * shift if index else 0
+        total = sum(map(mul, side.prices[:index], side.sizes[:index])) * shift
+        total += (units - before) * side.prices[index]
+        costs.append(fixed.to_decimal((total, -(dp + price_dp))))
+    return costs
+
+
+def _side_costs(
+    book: OrderBook | TickBook, side: str, quantities: Sequence[Decimal]
+) -> list[Decimal | None]:
+    if isinstance(book, TickBook):
+        levels = book.bids if side == "bid" else book.asks
+        return _tick_walk_costs(levels, book.price_dp, book.size_dp, quantities)
+    if side == "bid":
+        return walk_costs(book.top_bids(len(book.bids)), quantities)
+    return walk_costs(book.top_asks(len(book.asks)), quantities)
+
+
+def _depth(book: OrderBook | TickBook, side: str, levels: int) -> Decimal:
+    if isinstance(book, TickBook):
+        tick_levels = book.bids if side == "bid" else book.asks
+        return fixed.to_decimal(tick_levels.depth(levels, book.size_dp))
+    return sum_sizes(book.top_bids(levels) if side == "bid" else book.top_asks(levels))
+
+
+def _both(left: Decimal | None, right: Decimal | None) -> Decimal | None:
+    if left is None or right is None:
+        return None
+    return left + right
+
+
+def _make_tick_snapshot(
+    book_a: TickBook,
+    book_b: TickBook,
+    *,
+    outcome_a: str,
+    outcome_b: str,
+    depth_levels: int,
+    fetch_latency_ms: float | None,
+) -> PairedBookSnapshot:
+    # Integer arithmetic on (coefficient, exponent) pairs; only the final fields
+    # become Decimals, and they match the Decimal path digit for digit.
+    if not book_a.bids or not book_a.asks:
+        raise ValueError("Missing book A best bid/ask")
+    if not book_b.bids or not book_b.asks:
+        raise ValueError("Missing book B best bid/ask")
+
+    a_bid = book_a.bids.price(0, book_a.price_dp)
+    a_ask = book_a.asks.price(0, book_a.price_dp)
+    b_bid = book_b.bids.price(0, book_b.price_dp)
+    b_ask = book_b.asks.price(0, book_b.price_dp)
+    a_mid = fixed.half(fixed.add(a_bid, a_ask))
+    b_mid = fixed.half(fixed.add(b_bid, b_ask))
+    a_spread = fixed.sub(a_ask, a_bid)
+    b_spread = fixed.sub(b_ask, b_bid)
+    to_decimal = fixed.to_decimal
+
+    return PairedBookSnapshot(
+        ts_ms=max(book_a.timestamp_ms, book_b.timestamp_ms),
+        condition_id=book_a.market or book_b.market,
+        token_a_id=book_a.token_id,
+        token_b_id=book_b.token_id,
+        outcome_a=outcome_a,
+        outcome_b=outcome_b,
+        a_bid=to_decimal(a_bid),
+        a_ask=to_decimal(a_ask),
+        a_mid=to_decimal(a_mid),
+        a_spread=to_decimal(a_spread),
+        a_bid_sz=to_decimal(book_a.bids.size(0, book_a.size_dp)),
+        a_ask_sz=to_decimal(book_a.asks.size(0, book_a.size_dp)),
+        b_bid=to_decimal(b_bid),
+        b_ask=to_decimal(b_ask),
+        b_mid=to_decimal(b_mid),
+        b_spread=to_decimal(b_spread),
+        b_bid_sz=to_decimal(book_b.bids.size(0, book_b.size_dp)),
+        b_ask_sz=to_decimal(book_b.asks.size(0, book_b.size_dp)),
+        mid_sum=to_decimal(fixed.add(a_mid, b_mid)),
+        spread_sum=to_decimal(fixed.add(a_spread, b_spread)),
+        buy_both_cost=to_decimal(fixed.add(a_ask, b_ask)),
+        sell_both_proceeds=to_decimal(fixed.add(a_bid, b_bid)),
+        depth_bid_5_up=to_decimal(book_a.bids.depth(depth_levels, book_a.size_dp)),
+        depth_ask_5_up=to_decimal(book_a.asks.depth(depth_levels, book_a.size_dp)),
+        depth_bid_5_down=to_decimal(book_b.bids.depth(depth_levels, book_b.size_dp)),
+        depth_ask_5_down=to_decimal(book_b.asks.depth(depth_levels, book_b.size_dp)),
+        leg_skew_ms=abs(book_a.timestamp_ms - book_b.timestamp_ms),
+        fetch_latency_ms=fetch_latency_ms,
     )
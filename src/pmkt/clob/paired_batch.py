@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import numpy as np
+import numpy.typing as npt
+
+from . import fixed
+from .models import OrderBook, TickBook
+from .paired import (
+    DECIMAL_FIELDS,
+    DepthRung,
+    PairedBookSnapshot,
+    SizeCost,
+    leg_values,
+    pair_ladder,
+)
+
+IntArray = npt.NDArray[np.int64]
+FloatArray = npt.NDArray[np.float64]
+Book = OrderBook | TickBook
+
+
+@dataclass(slots=True)
+class FixedColumn:
+    # coefficient * 10**exponent per row, the vector form of fixed.Fixed. Keeping
+    # the exponent per row is what makes str() of a value match the Decimal path.
+    coef: IntArray
+    exp: IntArray
+
+    def __len__(self) -> int:
+        return len(self.coef)
+
+    def decimal(self, index: int) -> Decimal:
+        return fixed.to_decimal((int(self.coef[index]), int(self.exp[index])))
+
+    def strings(self) -> list[str]:
+        # str() of every value, as the CSV writes it, in one pass over the column.
+        to_decimal = fixed.to_decimal
+        return [
+            str(to_decimal(value))
+            for value in zip(self.coef.tolist(), self.exp.tolist(), strict=True)
+        ]
+
+    def units(self, dp: int) -> IntArray:
+        # Integer units of 10**-dp; dp must be at least -exp for every row.
+        return self.coef * _pow10(dp + self.exp)
+
+    def ge(self, threshold: Decimal) -> npt.NDArray[np.bool_]:
+        left, right = self._aligned(threshold)
+        return left >= right
+
+    def le(self, threshold: Decimal) -> npt.NDArray[np.bool_]:
+        left, right = self._aligned(threshold)
+        return left <= right
+
+    def distance_ge(self, center: Decimal, threshold: Decimal) -> npt.NDArray[np.bool_]:
+        # abs(value - center) >= threshold, exactly.
+        value_dp = _column_dp(self.exp)
+        dp = max(value_dp, _decimal_dp(center), _decimal_dp(threshold))
+        distance = np.abs(self.units(dp) - _decimal_units(center, dp))
+        return distance >= _decimal_units(threshold, dp)
+
+    def _aligned(self, threshold: Decimal) -> tuple[IntArray, int]:
+        dp = max(_column_dp(self.exp), _decimal_dp(threshold))
+        return self.units(dp), _decimal_units(threshold, dp)
+
+
+@dataclass(slots=True)
+class PairedSnapshotBatch:
+    # One sweep of paired snapshots as columns: row i is what make_paired_snapshot
+    # would return for the i-th pair that had both best bid and ask on each leg.
+    ts_ms: IntArray
+    leg_skew_ms: IntArray
+    # NaN where the latency is unknown.
+    fetch_latency_ms: FloatArray
+    condition_id: list[str]
+    token_a_id: list[str]
+    token_b_id: list[str]
+    outcome_a: list[str]
+    outcome_b: list[str]
+    columns: dict[str, FixedColumn]
+    # Per-row ladders, empty unless make_paired_snapshots was given them.
+    depth_ladder: list[tuple[DepthRung, ...]] = field(default_factory=list)
+    size_costs: list[tuple[SizeCost, ...]] = field(default_factory=list)
+    # Input position of each row, and the error for every input pair left out.
+    source: list[int] = field(default_factory=list)
+    errors: dict[int, Exception] = field(default_factory=dict)
+    # scheduler.threshold_distance of every row, filled in on first use.
+    _distances: list[Decimal] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.ts_ms)
+
+    def decimal(self, name: str, index: int) -> Decimal:
+        return self.columns[name].decimal(index)
+
+    def latency_ms(self, index: int) -> float | None:
+        value = float(self.fetch_latency_ms[index])
+        return None if np.isnan(value) else value
+
+    def threshold_distance(self, index: int) -> Decimal:
+        # max(min(buy_both_cost - 1, 1 - sell_both_proceeds), 0), computed for
+        # all rows at once in integer units so no row becomes a snapshot.
+        if self._distances is None:
+            buy = self.columns["buy_both_cost"]
+            sell = self.columns["sell_both_proceeds"]
+            dp = max(_column_dp(buy.exp), _column_dp(sell.exp))
+            one = 10**dp
+            distance = np.maximum(np.minimum(buy.units(dp) - one, one - sell.units(dp)), 0)
+            to_decimal = fixed.to_decimal
+            self._distances = [to_decimal((units, -dp)) for units in distance.tolist()]
+        return self._distances[index]
+
+    def snapshot(self, index: int) -> PairedBookSnapshot:
+        return PairedBookSnapshot(
+            ts_ms=int(self.ts_ms[index]),
+            condition_id=self.condition_id[index],
+            token_a_id=self.token_a_id[index],
+            token_b_id=self.token_b_id[index],
+            outcome_a=self.outcome_a[index],
+            outcome_b=self.outcome_b[index],
+            **{name: self.columns[name].decimal(index) for name in DECIMAL_FIELDS},
+            leg_skew_ms=int(self.leg_skew_ms[index]),
+            fetch_latency_ms=self.latency_ms(index),
+            depth_ladder=self.depth_ladder[index] if self.depth_ladder else (),
+            size_costs=self.size_costs[index] if self.size_costs else (),
+        )
+
+
+def make_paired_snapshots(
+    books_a: Sequence[Book],
+    books_b: Sequence[Book],
+    *,
+    outcomes_a: Sequence[str],
+    outcomes_b: Sequence[str],
+    depth_levels: int = 5,
+    fetch_latency_ms: Sequence[float | None] | None = None,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+) -> PairedSnapshotBatch:
+    # One pass per book pulls the six top-of-book/depth values as integers; the
+    # mids, spreads and two-leg sums are then computed for every pair at once.
+    latencies = fetch_latency_ms if fetch_latency_ms is not None else [None] * len(books_a)
+    if not len(books_a) == len(books_b) == len(outcomes_a) == len(outcomes_b) == len(latencies):
+        raise ValueError("make_paired_snapshots needs one entry per pair in every sequence")
+    legs_a: list[tuple[fixed.Fixed, ...]] = []
+    legs_b: list[tuple[fixed.Fixed, ...]] = []
+    kept: list[int] = []
+    errors: dict[int, Exception] = {}
+    for index, (book_a, book_b) in enumerate(zip(books_a, books_b, strict=True)):
+        leg_a = leg_values(book_a, depth_levels)
+        leg_b = leg_values(book_b, depth_levels)
+        if leg_a is None:
+            errors[index] = ValueError("Missing book A best bid/ask")
+        elif leg_b is None:
+            errors[index] = ValueError("Missing book B best bid/ask")
+        else:
+            legs_a.append(leg_a)
+            legs_b.append(leg_b)
+            kept.append(index)
+
+    a_bid, a_ask, a_bid_sz, a_ask_sz, a_depth_bid, a_depth_ask = _leg_columns(legs_a)
+    b_bid, b_ask, b_bid_sz, b_ask_sz, b_depth_bid, b_depth_ask = _leg_columns(legs_b)
+    a_mid = _half(_add(a_bid, a_ask))
+    b_mid = _half(_add(b_bid, b_ask))
+    a_spread = _sub(a_ask, a_bid)
+    b_spread = _sub(b_ask, b_bid)
+    ts_a = np.array([books_a[index].timestamp_ms for index in kept], dtype=np.int64)
+    ts_b = np.array([books_b[index].timestamp_ms for index in kept], dtype=np.int64)
+    # Ladder walks stop at a different level for every book, so they stay per pair.
+    ladders = (
+        [
+            pair_ladder(
+                books_a[index], books_b[index], depth_ladder=depth_ladder, quantities=quantities
+            )
+            for index in kept
+        ]
+        if depth_ladder or quantities
+        else []
+    )
+
+    return PairedSnapshotBatch(
+        ts_ms=np.maximum(ts_a, ts_b),
+        leg_skew_ms=np.abs(ts_a - ts_b),
+        fetch_latency_ms=np.array(
+            [np.nan if latencies[index] is None else latencies[index] for index in kept],
+            dtype=np.float64,
+        ),
+        condition_id=[books_a[index].market or books_b[index].market for index in kept],
+        token_a_id=[books_a[index].token_id for index in kept],
+        token_b_id=[books_b[index].token_id for index in kept],
+        outcome_a=[outcomes_a[index] for index in kept],
+        outcome_b=[outcomes_b[index] for index in kept],
+        columns={
+            "a_bid": a_bid,
+            "a_ask": a_ask,
+            "a_mid": a_mid,
+            "a_spread": a_spread,
+            "a_bid_sz": a_bid_sz,
+            "a_ask_sz": a_ask_sz,
+            "b_bid": b_bid,
+            "b_ask": b_ask,
+            "b_mid": b_mid,
+            "b_spread": b_spread,
+            "b_bid_sz": b_bid_sz,
+            "b_ask_sz": b_ask_sz,
+            "mid_sum": _add(a_mid, b_mid),
+            "spread_sum": _add(a_spread, b_spread),
+            "buy_both_cost": _add(a_ask, b_ask),
+            "sell_both_proceeds": _add(a_bid, b_bid),
+            "depth_bid_5_up": a_depth_bid,
+            "depth_ask_5_up": a_depth_ask,
+            "depth_bid_5_down": b_depth_bid,
+            "depth_ask_5_down": b_depth_ask,
+        },
+        depth_ladder=[rungs for rungs, _ in ladders],
+        size_costs=[costs for _, costs in ladders],
+        source=kept,
+        errors=errors,
+    )
+
+
+def _leg_columns(legs: list[tuple[fixed.Fixed, ...]]) -> list[FixedColumn]:
+    columns = []
+    for position in range(6):
+        values = [leg[position] for leg in legs]
+        columns.append(
+            FixedColumn(
+                coef=np.array([value[0] for value in values], dtype=np.int64),
+                exp=np.array([value[1] for value in values], dtype=np.int64),
+            )
+        )
+    return columns
+
+
+def _add(left: FixedColumn, right: FixedColumn) -> FixedColumn:
+    exp = np.minimum(left.exp, right.exp)
+    return FixedColumn(
+        coef=left.coef * _pow10(left.exp - exp) + right.coef * _pow10(right.exp - exp),
+        exp=exp,
+    )
+
+
+def _sub(left: FixedColumn, right: FixedColumn) -> FixedColumn:
+    return _add(left, FixedColumn(coef=-right.coef, exp=right.exp))
+
+
+def _half(value: FixedColumn) -> FixedColumn:
+    # Decimal division keeps the exponent when the result is exact and adds one
+    # digit for an odd coefficient.
+    even = value.coef % 2 == 0
+    return FixedColumn(
+        coef=np.where(even, value.coef // 2, value.coef * 5),
+        exp=np.where(even, value.exp, value.exp - 1),
+    )
+
+
+def _pow10(exponents: IntArray) -> IntArray:
+    return np.power(np.int64(10), exponents)
+
+
+def _column_dp(exp: IntArray) -> int:
+    return max(0, -int(exp.min())) if exp.size else 0
+
+
+def _decimal_dp(value: Decimal) -> int:
+    return max(0, -fixed.parse(str(value))[1])
+
+
+def _decimal_units(value: Decimal, dp: int) -> int:
+    return fixed.scale(fixed.parse(str(value)), dp)
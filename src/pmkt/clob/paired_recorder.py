@@ -1,23 +1,47 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 import json
 import logging
+import math
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime, timezone
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 
-from .client import ClobClient
-from .paired import PairedBookSnapshot, make_paired_snapshot
+from pmkt.ratelimit import CLOB, get_limiter
+
+from .book_cache import BookCache
+from .client import DEFAULT_MAX_CONCURRENCY, AsyncClobClient, ClobClient
+from .models import BookBatch, OrderBook, TickBook
+from .paired import (
+    DECIMAL_FIELDS,
+    CompactPairedSnapshot,
+    DepthRung,
+    SizeCost,
+    SnapshotRecord,
+    make_compact_snapshot,
+)
+from .paired_batch import PairedSnapshotBatch, make_paired_snapshots
+from .resilience import CircuitBreaker
+from .scheduler import AdaptivePollScheduler, threshold_distance
+from .session import SessionCheckpoint, SessionCheckpointer
+from .sinks import CsvSink, FlushPolicy, RecordSink, ResumableSink, ThreadedSink
+from .stream import DEFAULT_MARKET_WS_URL, MarketStream
 
 logger = logging.getLogger(__name__)
 
 MID_SUM_THRESHOLD = Decimal("0.02")
 SPREAD_SUM_THRESHOLD = Decimal("0.06")
 ONE_DOLLAR = Decimal("1.00")
+DEFAULT_HEARTBEAT_INTERVAL_S = 60.0
+DEFAULT_STATS_LOG_INTERVAL_S = 300.0
+ROW_KIND_QUOTE = "quote"
+ROW_KIND_HEARTBEAT = "heartbeat"
 
 
 @dataclass(slots=True)
@@ -107,73 +131,760 @@ def record_paired_quotes(
     market_index: dict[str, dict[str, Any]] | None = None,
     mid_sum_threshold: Decimal = MID_SUM_THRESHOLD,
     spread_sum_threshold: Decimal = SPREAD_SUM_THRESHOLD,
+    batch_books: bool = True,
+    heartbeat_interval_seconds: float | None = DEFAULT_HEARTBEAT_INTERVAL_S,
+    scheduler: AdaptivePollScheduler | None = None,
+    max_leg_skew_ms: int | None = None,
+    breaker: CircuitBreaker | None = None,
+    batch_snapshots: bool = False,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+    book_cache: BookCache | None = None,
+    sink: RecordSink | None = None,
+    flush_policy: FlushPolicy | None = None,
+    session: SessionCheckpointer | None = None,
+    stats_interval_seconds: float | None = DEFAULT_STATS_LOG_INTERVAL_S,
 ) -> None:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    quotes_path = out_dir / "paired_quotes.csv"
-    signals_path = out_dir / "signals.csv"
+    pairs = list(pairs)
+    _schedule_pairs(scheduler, pairs)
+    recorder = _SweepRecorder(
+        out_dir,
+        market_index=market_index or {},
+        mid_sum_threshold=mid_sum_threshold,
+        spread_sum_threshold=spread_sum_threshold,
+        heartbeat_interval_seconds=heartbeat_interval_seconds,
+        max_leg_skew_ms=max_leg_skew_ms,
+        batch_snapshots=batch_snapshots,
+        depth_ladder=depth_ladder,
+        quantities=quantities,
+        book_cache=book_cache,
+        sink=sink,
+        flush_policy=flush_policy,
+        pairs=pairs,
+        scheduler=scheduler,
+        session=session,
+        stats_interval_seconds=stats_interval_seconds,
+    )
     own_client = client is None
     client = client or ClobClient()
+    breaker = breaker or CircuitBreaker()
+    limiter = get_limiter(CLOB)
     try:
         iteration = 0
         while max_iters is None or iteration < max_iters:
-            for pair in pairs:
-                snapshot = _fetch_snapshot(pair, client)
-                if snapshot is None:
-                    continue
-                _append_snapshot(quotes_path, snapshot)
-                signals = _signals_for_snapshot(
-                    snapshot,
-                    pair=pair,
-                    market_meta=(market_index or {}).get(pair.condition_id, {}),
-                    mid_sum_threshold=mid_sum_threshold,
-                    spread_sum_threshold=spread_sum_threshold,
-                )
-                for signal in signals:
-                    _append_signal(signals_path, signal)
+            due = _due_pairs(scheduler, pairs)
+            if not due:
+                time.sleep(_pause_seconds(scheduler, interval_seconds))
+                continue
+            active = _allowed_pairs(breaker, due)
+            token_ids = _sweep_token_ids(active)
+            started = time.monotonic()
+            waited = limiter.wait_time_s
+            if batch_books:
+                batch = client.get_order_books(token_ids, known_hashes=recorder.book_hashes)
+            else:
+                batch = _fetch_books_individually(client, token_ids)
+            breaker.record_batch(token_ids, batch)
+            changed = recorder.record_sweep(active, batch)
+            _observe_sweep(scheduler, recorder, due, changed)
+            _log_sweep(iteration, len(due), batch, started, limiter.wait_time_s - waited)
             iteration += 1
             if max_iters is None or iteration < max_iters:
-                time.sleep(interval_seconds)
+                time.sleep(_pause_seconds(scheduler, interval_seconds))
     finally:
+        recorder.close()
         if own_client:
             client.close()
 
 
-def _fetch_snapshot(pair: TradablePair, client: ClobClient) -> PairedBookSnapshot | None:
+async def record_paired_quotes_async(
+    pairs: Iterable[TradablePair],
+    out_dir: Path,
+    interval_seconds: float = 2.0,
+    max_iters: int | None = None,
+    client: AsyncClobClient | None = None,
+    concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    market_index: dict[str, dict[str, Any]] | None = None,
+    mid_sum_threshold: Decimal = MID_SUM_THRESHOLD,
+    spread_sum_threshold: Decimal = SPREAD_SUM_THRESHOLD,
+    batch_books: bool = True,
+    heartbeat_interval_seconds: float | None = DEFAULT_HEARTBEAT_INTERVAL_S,
+    scheduler: AdaptivePollScheduler | None = None,
+    max_leg_skew_ms: int | None = None,
+    breaker: CircuitBreaker | None = None,
+    batch_snapshots: bool = False,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+    book_cache: BookCache | None = None,
+    sink: RecordSink | None = None,
+    flush_policy: FlushPolicy | None = None,
+    session: SessionCheckpointer | None = None,
+    stats_interval_seconds: float | None = DEFAULT_STATS_LOG_INTERVAL_S,
+) -> None:
+    pairs = list(pairs)
+    _schedule_pairs(scheduler, pairs)
+    recorder = _SweepRecorder(
+        out_dir,
+        market_index=market_index or {},
+        mid_sum_threshold=mid_sum_threshold,
+        spread_sum_threshold=spread_sum_threshold,
+        heartbeat_interval_seconds=heartbeat_interval_seconds,
+        max_leg_skew_ms=max_leg_skew_ms,
+        batch_snapshots=batch_snapshots,
+        depth_ladder=depth_ladder,
+        quantities=quantities,
+        book_cache=book_cache,
+        sink=sink,
+        flush_policy=flush_policy,
+        pairs=pairs,
+        scheduler=scheduler,
+        session=session,
+        stats_interval_seconds=stats_interval_seconds,
+    )
+    own_client = client is None
+    client = client or AsyncClobClient(max_concurrency=concurrency)
+    breaker = breaker or CircuitBreaker()
+    limiter = get_limiter(CLOB)
     try:
-        book_a = client.get_order_book(pair.token_a_id)
-        book_b = client.get_order_book(pair.token_b_id)
-        book_a.market = pair.condition_id
-        book_b.market = pair.condition_id
-        return make_paired_snapshot(
-            book_a,
-            book_b,
-            outcome_a=pair.outcome_a,
-            outcome_b=pair.outcome_b,
+        iteration = 0
+        while max_iters is None or iteration < max_iters:
+            due = _due_pairs(scheduler, pairs)
+            if not due:
+                await asyncio.sleep(_pause_seconds(scheduler, interval_seconds))
+                continue
+            active = _allowed_pairs(breaker, due)
+            token_ids = _sweep_token_ids(active)
+            started = time.monotonic()
+            waited = limiter.wait_time_s
+            # The client semaphore bounds in-flight requests, so a sweep takes
+            # roughly requests / concurrency round trips.
+            if batch_books:
+                batch = await client.get_order_books(
+                    token_ids, known_hashes=recorder.book_hashes
+                )
+            else:
+                batch = await _fetch_books_individually_async(client, token_ids)
+            breaker.record_batch(token_ids, batch)
+            changed = recorder.record_sweep(active, batch)
+            _observe_sweep(scheduler, recorder, due, changed)
+            _log_sweep(iteration, len(due), batch, started, limiter.wait_time_s - waited)
+            iteration += 1
+            if max_iters is None or iteration < max_iters:
+                await asyncio.sleep(_pause_seconds(scheduler, interval_seconds))
+    finally:
+        recorder.close()
+        if own_client:
+            await client.aclose()
+
+
+async def record_paired_quotes_stream(
+    pairs: Iterable[TradablePair],
+    out_dir: Path,
+    url: str = DEFAULT_MARKET_WS_URL,
+    max_messages: int | None = None,
+    stream: MarketStream | None = None,
+    market_index: dict[str, dict[str, Any]] | None = None,
+    mid_sum_threshold: Decimal = MID_SUM_THRESHOLD,
+    spread_sum_threshold: Decimal = SPREAD_SUM_THRESHOLD,
+    max_leg_skew_ms: int | None = None,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+    book_cache: BookCache | None = None,
+    sink: RecordSink | None = None,
+    flush_policy: FlushPolicy | None = None,
+    session: SessionCheckpointer | None = None,
+    stats_interval_seconds: float | None = DEFAULT_STATS_LOG_INTERVAL_S,
+) -> None:
+    pairs = list(pairs)
+    recorder = _SweepRecorder(
+        out_dir,
+        market_index=market_index or {},
+        mid_sum_threshold=mid_sum_threshold,
+        spread_sum_threshold=spread_sum_threshold,
+        heartbeat_interval_seconds=None,
+        max_leg_skew_ms=max_leg_skew_ms,
+        depth_ladder=depth_ladder,
+        quantities=quantities,
+        book_cache=book_cache,
+        sink=sink,
+        flush_policy=flush_policy,
+        pairs=pairs,
+        session=session,
+        stats_interval_seconds=stats_interval_seconds,
+    )
+    pairs_by_token: dict[str, list[TradablePair]] = {}
+    for pair in pairs:
+        pairs_by_token.setdefault(pair.token_a_id, []).append(pair)
+        pairs_by_token.setdefault(pair.token_b_id, []).append(pair)
+    stream = stream or MarketStream(_sweep_token_ids(pairs), url=url)
+    stop = asyncio.Event()
+    processed = 0
+
+    def on_update(books: dict[str, OrderBook]) -> None:
+        nonlocal processed
+        affected: dict[int, TradablePair] = {}
+        for token_id in books:
+            for pair in pairs_by_token.get(token_id, []):
+                legs_known = all(
+                    leg in books or leg in recorder.books
+                    for leg in (pair.token_a_id, pair.token_b_id)
+                )
+                if legs_known:
+                    affected[id(pair)] = pair
+        recorder.record_sweep(affected.values(), BookBatch(books=books))
+        processed += 1
+        if max_messages is not None and processed >= max_messages:
+            stop.set()
+
+    try:
+        await stream.run(on_update, stop)
+    finally:
+        recorder.close()
+
+
+@dataclass(slots=True)
+class _PairState:
+    snapshot: SnapshotRecord | None = None
+    last_written: float = 0.0
+    # With batch snapshots the latest row stays in its sweep's columns and is
+    # only turned into a PairedBookSnapshot when a heartbeat or the scheduler
+    # asks for it.
+    batch: PairedSnapshotBatch | None = None
+    row: int = 0
+
+    def has_snapshot(self) -> bool:
+        return self.snapshot is not None or self.batch is not None
+
+    def current(self) -> SnapshotRecord | None:
+        if self.batch is not None:
+            self.snapshot = self.batch.snapshot(self.row)
+            self.batch = None
+        return self.snapshot
+
+    def threshold_distance(self) -> Decimal | None:
+        # A batch row is read from its sweep's columns without being built, so
+        # --adaptive does not undo --batch-snapshots.
+        if self.batch is not None:
+            return self.batch.threshold_distance(self.row)
+        return threshold_distance(self.snapshot) if self.snapshot is not None else None
+
+    def set_row(self, batch: PairedSnapshotBatch, row: int) -> None:
+        self.snapshot = None
+        self.batch = batch
+        self.row = row
+
+
+class _SweepRecorder:
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        market_index: dict[str, dict[str, Any]],
+        mid_sum_threshold: Decimal,
+        spread_sum_threshold: Decimal,
+        heartbeat_interval_seconds: float | None,
+        max_leg_skew_ms: int | None = None,
+        batch_snapshots: bool = False,
+        depth_ladder: Sequence[int] = (),
+        quantities: Sequence[Decimal] = (),
+        book_cache: BookCache | None = None,
+        sink: RecordSink | None = None,
+        flush_policy: FlushPolicy | None = None,
+        pairs: Sequence[TradablePair] = (),
+        scheduler: AdaptivePollScheduler | None = None,
+        session: SessionCheckpointer | None = None,
+        stats_interval_seconds: float | None = DEFAULT_STATS_LOG_INTERVAL_S,
+    ) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        # Rows are buffered by the sink; each sweep ends with sink.end_sweep()
+        # and close() flushes whatever is left.
+        self.sink = (
+            sink
+            if sink is not None
+            else CsvSink(out_dir, flush_policy, depth_ladder=depth_ladder, quantities=quantities)
         )
-    except Exception as exc:  # noqa: BLE001 - keep polling
-        logger.warning("Skipping pair %s due to error: %s", pair.condition_id, exc)
-        return None
+        self.market_index = market_index
+        self.mid_sum_threshold = mid_sum_threshold
+        self.spread_sum_threshold = spread_sum_threshold
+        self.heartbeat_interval_seconds = heartbeat_interval_seconds
+        self.max_leg_skew_ms = max_leg_skew_ms
+        self.batch_snapshots = batch_snapshots
+        self.depth_ladder = tuple(depth_ladder)
+        self.quantities = tuple(quantities)
+        self.suppressed_signals = 0
+        self.book_hashes: dict[str, str] = {}
+        self.books = book_cache if book_cache is not None else BookCache()
+        self.books.evict_listeners.append(self._forget_hash)
+        self.pair_states: dict[tuple[str, str], _PairState] = {}
+        # With a session, the pairs, book hashes, scheduler state and output
+        # positions are checkpointed every session.interval_s and on close.
+        # Hashes restored from a checkpoint are kept apart from book_hashes:
+        # the books themselves were not saved, so they must be fetched in full
+        # once, and only then compared.
+        self.pairs = list(pairs)
+        self.scheduler = scheduler
+        self.session = session
+        self.sweeps = 0
+        self.resumed_hashes: dict[str, str] = {}
+        # Book cache and writer stats go to the log every stats_interval_seconds
+        # while recording, not just when the run ends.
+        self.stats_interval_seconds = stats_interval_seconds
+        self._stats_logged_at = time.monotonic()
+        if session is not None and session.restored is not None:
+            self._resume(session.restored)
 
+    def record_sweep(self, pairs: Iterable[TradablePair], batch: BookBatch) -> set[str]:
+        changed = self._absorb(batch)
+        now = time.monotonic()
+        pending: list[tuple[TradablePair, _PairState]] = []
+        for pair in pairs:
+            error = batch.errors.get(pair.token_a_id) or batch.errors.get(pair.token_b_id)
+            book_a = self.books.get(pair.token_a_id)
+            book_b = self.books.get(pair.token_b_id)
+            if error is not None or book_a is None or book_b is None:
+                logger.warning(
+                    "Skipping pair %s due to error: %s",
+                    pair.condition_id,
+                    error or "no book returned",
+                )
+                continue
+            state = self.pair_states.setdefault(_pair_key(pair), _PairState())
+            legs_changed = pair.token_a_id in changed or pair.token_b_id in changed
+            if state.has_snapshot() and not legs_changed:
+                self._maybe_heartbeat(state, book_a, book_b, now)
+                continue
+            if not legs_changed:
+                # After a resume: both books match the hashes the last rows
+                # were written from, so the state comes back without a
+                # duplicate row.
+                self._prime(pair, state, book_a, book_b, batch, now)
+                continue
+            if self.batch_snapshots:
+                pending.append((pair, state))
+                continue
+            try:
+                snapshot = _pair_snapshot(
+                    pair,
+                    book_a,
+                    book_b,
+                    fetch_latency_ms=_pair_latency_ms(pair, batch),
+                    depth_ladder=self.depth_ladder,
+                    quantities=self.quantities,
+                )
+            except Exception as exc:  # noqa: BLE001 - keep polling
+                logger.warning("Skipping pair %s due to error: %s", pair.condition_id, exc)
+                continue
+            state.snapshot = snapshot
+            state.last_written = now
+            skewed = (
+                self.max_leg_skew_ms is not None and snapshot.leg_skew_ms > self.max_leg_skew_ms
+            )
+            if skewed:
+                self.suppressed_signals += 1
+                logger.debug(
+                    "Suppressing signals for %s: leg skew %sms > %sms",
+                    pair.condition_id,
+                    snapshot.leg_skew_ms,
+                    self.max_leg_skew_ms,
+                )
+            _record_snapshot(
+                snapshot,
+                pair=pair,
+                sink=self.sink,
+                market_meta=self.market_index.get(pair.condition_id, {}),
+                mid_sum_threshold=self.mid_sum_threshold,
+                spread_sum_threshold=self.spread_sum_threshold,
+                emit_signals=not skewed,
+            )
+        if pending:
+            self._record_batch(pending, batch, now)
+        self.sink.end_sweep()
+        self.sweeps += 1
+        self.checkpoint()
+        self._maybe_log_stats()
+        return changed
 
-def _append_snapshot(path: Path, snapshot: PairedBookSnapshot) -> None:
-    row = _snapshot_row(snapshot)
-    _append_row(path, row)
+    def _maybe_log_stats(self) -> None:
+        interval = self.stats_interval_seconds
+        now = time.monotonic()
+        if not interval or now - self._stats_logged_at < interval:
+            return
+        self._stats_logged_at = now
+        self.books.log_stats()
+        if isinstance(self.sink, ThreadedSink):
+            self.sink.log_stats()
 
+    def checkpoint(self, force: bool = False) -> None:
+        session = self.session
+        if session is None or not (force or session.due()):
+            return
+        # The sink first: once it returns, every row queued so far is on disk,
+        # so the hashes saved below never get ahead of the files.
+        outputs = self.sink.checkpoint() if isinstance(self.sink, ResumableSink) else None
+        session.save(
+            SessionCheckpoint(
+                pairs=[asdict(pair) for pair in self.pairs],
+                market_index={
+                    pair.condition_id: self.market_index[pair.condition_id]
+                    for pair in self.pairs
+                    if pair.condition_id in self.market_index
+                },
+                book_hashes={**self.resumed_hashes, **self.book_hashes},
+                scheduler=self.scheduler.export_state() if self.scheduler is not None else None,
+                outputs=outputs,
+                sweeps=self.sweeps,
+            )
+        )
 
-def _append_signal(path: Path, signal: dict[str, Any]) -> None:
-    _append_row(path, signal)
+    def close(self) -> None:
+        try:
+            try:
+                self.checkpoint(force=True)
+            finally:
+                self.sink.close()
+        finally:
+            self.books.log_stats()
 
+    def _resume(self, checkpoint: SessionCheckpoint) -> None:
+        self.resumed_hashes = dict(checkpoint.book_hashes)
+        self.sweeps = checkpoint.sweeps
+        if self.scheduler is not None and checkpoint.scheduler:
+            self.scheduler.restore_state(checkpoint.scheduler)
+        logger.info(
+            "Resuming session from sweep %s pairs=%s hashes=%s",
+            checkpoint.sweeps,
+            len(self.pairs),
+            len(self.resumed_hashes),
+        )
+        if checkpoint.outputs is None:
+            return
+        if isinstance(self.sink, ResumableSink):
+            self.sink.restore(checkpoint.outputs)
+        else:
+            logger.warning("%s cannot resume its files", type(self.sink).__name__)
 
-def _append_row(path: Path, row: dict[str, Any]) -> None:
-    write_header = not path.exists()
-    with path.open("a", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=list(row.keys()))
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
+    def _prime(
+        self,
+        pair: TradablePair,
+        state: _PairState,
+        book_a: OrderBook | TickBook,
+        book_b: OrderBook | TickBook,
+        batch: BookBatch,
+        now: float,
+    ) -> None:
+        try:
+            state.snapshot = _pair_snapshot(
+                pair,
+                book_a,
+                book_b,
+                fetch_latency_ms=_pair_latency_ms(pair, batch),
+                depth_ladder=self.depth_ladder,
+                quantities=self.quantities,
+            )
+        except Exception as exc:  # noqa: BLE001 - keep polling
+            logger.warning("Skipping pair %s due to error: %s", pair.condition_id, exc)
+            return
+        state.last_written = now
 
+    def _record_batch(
+        self, pending: list[tuple[TradablePair, _PairState]], batch: BookBatch, now: float
+    ) -> None:
+        # Same rows and signals as the per-pair path, but the snapshot fields are
+        # computed as columns for the whole sweep and the signal thresholds are
+        # checked for every pair in one vectorized pass.
+        books_a = []
+        books_b = []
+        for pair, _ in pending:
+            book_a = self.books.peek(pair.token_a_id)
+            book_b = self.books.peek(pair.token_b_id)
+            assert book_a is not None and book_b is not None
+            book_a.market = pair.condition_id
+            book_b.market = pair.condition_id
+            books_a.append(book_a)
+            books_b.append(book_b)
+        snapshots = make_paired_snapshots(
+            books_a,
+            books_b,
+            outcomes_a=[pair.outcome_a for pair, _ in pending],
+            outcomes_b=[pair.outcome_b for pair, _ in pending],
+            fetch_latency_ms=[_pair_latency_ms(pair, batch) for pair, _ in pending],
+            depth_ladder=self.depth_ladder,
+            quantities=self.quantities,
+        )
+        for index, exc in snapshots.errors.items():
+            logger.warning("Skipping pair %s due to error: %s", pending[index][0].condition_id, exc)
+        signals = _batch_signal_masks(
+            snapshots,
+            mid_sum_threshold=self.mid_sum_threshold,
+            spread_sum_threshold=self.spread_sum_threshold,
+        )
+        rows = _batch_rows(snapshots)
+        for row, index in enumerate(snapshots.source):
+            pair, state = pending[index]
+            state.set_row(snapshots, row)
+            state.last_written = now
+            self.sink.write_quote(rows[row])
+            leg_skew_ms = int(snapshots.leg_skew_ms[row])
+            if self.max_leg_skew_ms is not None and leg_skew_ms > self.max_leg_skew_ms:
+                self.suppressed_signals += 1
+                logger.debug(
+                    "Suppressing signals for %s: leg skew %sms > %sms",
+                    pair.condition_id,
+                    leg_skew_ms,
+                    self.max_leg_skew_ms,
+                )
+                continue
+            ts_iso = None
+            for signal_type, (field_name, mask, details) in signals.items():
+                if not mask[row]:
+                    continue
+                if ts_iso is None:
+                    ts_iso = _ts_iso(int(snapshots.ts_ms[row]))
+                self.sink.write_signal(
+                    _signal_row(
+                        ts_iso,
+                        snapshots.condition_id[row],
+                        signal_type,
+                        snapshots.decimal(field_name, row),
+                        pair=pair,
+                        market_meta=self.market_index.get(pair.condition_id, {}),
+                        details=details,
+                    ),
+                )
+
+    def _absorb(self, batch: BookBatch) -> set[str]:
+        changed: set[str] = set()
+        for token_id, book in batch.books.items():
+            if (
+                book.hash
+                and book.hash == self.book_hashes.get(token_id)
+                and self.books.touch(token_id, book.timestamp_ms)
+            ):
+                continue
+            self.books.put(token_id, book)
+            if book.hash:
+                self.book_hashes[token_id] = book.hash
+            else:
+                self.book_hashes.pop(token_id, None)
+            resumed_hash = self.resumed_hashes.pop(token_id, None)
+            if not book.hash or book.hash != resumed_hash:
+                changed.add(token_id)
+        for token_id, timestamp_ms in batch.unchanged.items():
+            self.books.touch(token_id, timestamp_ms)
+        return changed
+
+    def _forget_hash(self, token_id: str) -> None:
+        # An evicted book must be fetched in full next time, not reported as
+        # unchanged against a hash we no longer hold the book for.
+        self.book_hashes.pop(token_id, None)
+
+    def _maybe_heartbeat(
+        self,
+        state: _PairState,
+        book_a: OrderBook | TickBook,
+        book_b: OrderBook | TickBook,
+        now: float,
+    ) -> None:
+        if not self.heartbeat_interval_seconds or not state.has_snapshot():
+            return
+        if now - state.last_written < self.heartbeat_interval_seconds:
+            return
+        snapshot = state.current()
+        assert snapshot is not None
+        heartbeat = replace(snapshot, ts_ms=max(book_a.timestamp_ms, book_b.timestamp_ms))
+        self.sink.write_quote(_snapshot_row(heartbeat, row_kind=ROW_KIND_HEARTBEAT))
+        state.last_written = now
+
+
+def _log_sweep(
+    iteration: int, pairs: int, batch: BookBatch, started: float, limiter_wait_s: float
+) -> None:
+    # Limiter wait close to the sweep time means the rate budget, not the
+    # network, is what bounds the sweep.
+    logger.debug(
+        "Sweep %s pairs=%s requests=%s elapsed_s=%.3f limiter_wait_s=%.3f",
+        iteration,
+        pairs,
+        batch.requests,
+        time.monotonic() - started,
+        limiter_wait_s,
+    )
+
+
+def _pair_key(pair: TradablePair) -> tuple[str, str]:
+    return pair.token_a_id, pair.token_b_id
+
+
+def _schedule_pairs(scheduler: AdaptivePollScheduler | None, pairs: list[TradablePair]) -> None:
+    if scheduler is None:
+        return
+    for pair in pairs:
+        scheduler.add(_pair_key(pair), pair.condition_id)
+
+
+def _due_pairs(
+    scheduler: AdaptivePollScheduler | None, pairs: list[TradablePair]
+) -> list[TradablePair]:
+    if scheduler is None:
+        return pairs
+    due = set(scheduler.due())
+    return [pair for pair in pairs if _pair_key(pair) in due]
+
+
+def _allowed_pairs(breaker: CircuitBreaker, pairs: list[TradablePair]) -> list[TradablePair]:
+    # Pairs with a leg in back-off are left out of the request entirely rather
+    # than failing, and warning, on every sweep.
+    return [
+        pair
+        for pair in pairs
+        if breaker.allow(pair.token_a_id) and breaker.allow(pair.token_b_id)
+    ]
+
+
+def _pause_seconds(scheduler: AdaptivePollScheduler | None, interval_seconds: float) -> float:
+    return interval_seconds if scheduler is None else scheduler.seconds_until_due()
+
+
+def _observe_sweep(
+    scheduler: AdaptivePollScheduler | None,
+    recorder: _SweepRecorder,
+    pairs: list[TradablePair],
+    changed: set[str],
+) -> None:
+    if scheduler is None:
+        return
+    for pair in pairs:
+        key = _pair_key(pair)
+        state = recorder.pair_states.get(key)
+        scheduler.observe(
+            key,
+            changed=pair.token_a_id in changed or pair.token_b_id in changed,
+            distance=state.threshold_distance() if state is not None else None,
+        )
+    scheduler.end_sweep()
+
+
+def _sweep_token_ids(pairs: Iterable[TradablePair]) -> list[str]:
+    token_ids: dict[str, None] = {}
+    for pair in pairs:
+        token_ids[pair.token_a_id] = None
+        token_ids[pair.token_b_id] = None
+    return list(token_ids)
+
+
+def _fetch_books_individually(client: ClobClient, token_ids: list[str]) -> BookBatch:
+    # Sweep token ids come in (leg a, leg b) order, so fetching them two at a time
+    # keeps both legs of a pair in flight together.
+    batch = BookBatch()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for start in range(0, len(token_ids), 2):
+            legs = token_ids[start : start + 2]
+            results = executor.map(lambda token_id: _timed_order_book(client, token_id), legs)
+            for token_id, result in zip(legs, results, strict=True):
+                batch.requests += 1
+                if isinstance(result, Exception):
+                    batch.errors[token_id] = result
+                else:
+                    batch.books[token_id], batch.latency_ms[token_id] = result
+    return batch
+
+
+def _timed_order_book(
+    client: ClobClient, token_id: str
+) -> tuple[OrderBook | TickBook, float] | Exception:
+    started = time.perf_counter()
+    try:
+        book = client.get_order_book(token_id)
+    except Exception as exc:  # noqa: BLE001 - report per token
+        return exc
+    return book, (time.perf_counter() - started) * 1000
+
+
+async def _fetch_books_individually_async(
+    client: AsyncClobClient, token_ids: list[str]
+) -> BookBatch:
+    results = await asyncio.gather(
+        *(_timed_order_book_async(client, token_id) for token_id in token_ids),
+        return_exceptions=True,
+    )
+    batch = BookBatch(requests=len(token_ids))
+    for token_id, result in zip(token_ids, results, strict=True):
+        if isinstance(result, Exception):
+            batch.errors[token_id] = result
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            batch.books[token_id], batch.latency_ms[token_id] = result
+    return batch
 
-def _snapshot_row(snapshot: PairedBookSnapshot) -> dict[str, Any]:
+
+async def _timed_order_book_async(
+    client: AsyncClobClient, token_id: str
+) -> tuple[OrderBook | TickBook, float]:
+    started = time.perf_counter()
+    book = await client.get_order_book(token_id)
+    return book, (time.perf_counter() - started) * 1000
+
+
+def _pair_snapshot(
+    pair: TradablePair,
+    book_a: OrderBook | TickBook,
+    book_b: OrderBook | TickBook,
+    fetch_latency_ms: float | None = None,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+) -> CompactPairedSnapshot:
+    book_a.market = pair.condition_id
+    book_b.market = pair.condition_id
+    return make_compact_snapshot(
+        book_a,
+        book_b,
+        outcome_a=pair.outcome_a,
+        outcome_b=pair.outcome_b,
+        fetch_latency_ms=fetch_latency_ms,
+        depth_ladder=depth_ladder,
+        quantities=quantities,
+    )
+
+
+def _pair_latency_ms(pair: TradablePair, batch: BookBatch) -> float | None:
+    latencies = [
+        batch.latency_ms[token_id]
+        for token_id in (pair.token_a_id, pair.token_b_id)
+        if token_id in batch.latency_ms
+    ]
+    return max(latencies) if latencies else None
+
+
+def _record_snapshot(
+    snapshot: SnapshotRecord,
+    *,
+    pair: TradablePair,
+    sink: RecordSink,
+    market_meta: dict[str, Any],
+    mid_sum_threshold: Decimal,
+    spread_sum_threshold: Decimal,
+    emit_signals: bool = True,
+) -> None:
+    sink.write_quote(_snapshot_row(snapshot))
+    if not emit_signals:
+        return
+    signals = _signals_for_snapshot(
+        snapshot,
+        pair=pair,
+        market_meta=market_meta,
+        mid_sum_threshold=mid_sum_threshold,
+        spread_sum_threshold=spread_sum_threshold,
+    )
+    for signal in signals:
+        sink.write_signal(signal)
+
+
+def _snapshot_row(snapshot: SnapshotRecord, row_kind: str = ROW_KIND_QUOTE) -> dict[str, Any]:
+    if isinstance(snapshot, CompactPairedSnapshot):
+        texts = snapshot.texts()
+    else:
+        texts = [str(getattr(snapshot, name)) for name in DECIMAL_FIELDS]
     return {
         "ts_ms": snapshot.ts_ms,
         "condition_id": snapshot.condition_id,
@@ -181,38 +892,111 @@ def _snapshot_row(snapshot: PairedBookSnapshot) -> dict[str, Any]:
         "token_b_id": snapshot.token_b_id,
         "outcome_a": snapshot.outcome_a,
         "outcome_b": snapshot.outcome_b,
-        "a_bid": str(snapshot.a_bid),
-        "a_ask": str(snapshot.a_ask),
-        "a_mid": str(snapshot.a_mid),
-        "a_spread": str(snapshot.a_spread),
-        "a_bid_sz": str(snapshot.a_bid_sz),
-        "a_ask_sz": str(snapshot.a_ask_sz),
-        "b_bid": str(snapshot.b_bid),
-        "b_ask": str(snapshot.b_ask),
-        "b_mid": str(snapshot.b_mid),
-        "b_spread": str(snapshot.b_spread),
-        "b_bid_sz": str(snapshot.b_bid_sz),
-        "b_ask_sz": str(snapshot.b_ask_sz),
-        "mid_sum": str(snapshot.mid_sum),
-        "spread_sum": str(snapshot.spread_sum),
-        "buy_both_cost": str(snapshot.buy_both_cost),
-        "sell_both_proceeds": str(snapshot.sell_both_proceeds),
-        "depth_bid_5_up": str(snapshot.depth_bid_5_up),
-        "depth_ask_5_up": str(snapshot.depth_ask_5_up),
-        "depth_bid_5_down": str(snapshot.depth_bid_5_down),
-        "depth_ask_5_down": str(snapshot.depth_ask_5_down),
+        **dict(zip(DECIMAL_FIELDS, texts, strict=True)),
+        "row_kind": row_kind,
+        "leg_skew_ms": snapshot.leg_skew_ms,
+        "fetch_latency_ms": (
+            f"{snapshot.fetch_latency_ms:.1f}" if snapshot.fetch_latency_ms is not None else ""
+        ),
+        **_ladder_values(snapshot.depth_ladder, snapshot.size_costs),
     }
 
 
+def _ladder_values(
+    depth_ladder: Sequence[DepthRung], size_costs: Sequence[SizeCost]
+) -> dict[str, str]:
+    # Extra columns after the fixed ones, named after the level count or
+    # quantity. Costs are written without trailing zeros so Decimal and tick
+    # books print the same text; an unfillable size is left blank.
+    values: dict[str, str] = {}
+    for rung in depth_ladder:
+        values[f"depth_bid_{rung.levels}_up"] = str(rung.bid_up)
+        values[f"depth_ask_{rung.levels}_up"] = str(rung.ask_up)
+        values[f"depth_bid_{rung.levels}_down"] = str(rung.bid_down)
+        values[f"depth_ask_{rung.levels}_down"] = str(rung.ask_down)
+    for cost in size_costs:
+        values[f"buy_both_cost_{cost.quantity}"] = _plain(cost.buy_both_cost)
+        values[f"sell_both_proceeds_{cost.quantity}"] = _plain(cost.sell_both_proceeds)
+    return values
+
+
+def _plain(value: Decimal | None) -> str:
+    return "" if value is None else format(value.normalize(), "f")
+
+
+def _batch_rows(batch: PairedSnapshotBatch) -> list[dict[str, Any]]:
+    # Column-for-column the same dicts as _snapshot_row, one per batch row.
+    columns = {
+        "ts_ms": batch.ts_ms.tolist(),
+        "condition_id": batch.condition_id,
+        "token_a_id": batch.token_a_id,
+        "token_b_id": batch.token_b_id,
+        "outcome_a": batch.outcome_a,
+        "outcome_b": batch.outcome_b,
+        **{name: batch.columns[name].strings() for name in DECIMAL_FIELDS},
+        "row_kind": [ROW_KIND_QUOTE] * len(batch),
+        "leg_skew_ms": batch.leg_skew_ms.tolist(),
+        "fetch_latency_ms": [
+            "" if math.isnan(latency_ms) else f"{latency_ms:.1f}"
+            for latency_ms in batch.fetch_latency_ms.tolist()
+        ],
+    }
+    names = list(columns)
+    rows = [dict(zip(names, values, strict=True)) for values in zip(*columns.values(), strict=True)]
+    # The ladder lists are empty, not one entry per row, when the run has no
+    # ladder columns.
+    if batch.depth_ladder or batch.size_costs:
+        for row, rungs, costs in zip(rows, batch.depth_ladder, batch.size_costs, strict=True):
+            row.update(_ladder_values(rungs, costs))
+    return rows
+
+
+def _batch_signal_masks(
+    batch: PairedSnapshotBatch,
+    *,
+    mid_sum_threshold: Decimal,
+    spread_sum_threshold: Decimal,
+) -> dict[str, tuple[str, Any, dict[str, Any]]]:
+    # signal type -> (value column, per-row mask, details), in the order
+    # _signals_for_snapshot emits them.
+    columns = batch.columns
+    return {
+        "MID_SUM_DRIFT": (
+            "mid_sum",
+            columns["mid_sum"].distance_ge(ONE_DOLLAR, mid_sum_threshold),
+            {"threshold": str(mid_sum_threshold)},
+        ),
+        "SPREAD_SUM_WIDE": (
+            "spread_sum",
+            columns["spread_sum"].ge(spread_sum_threshold),
+            {"threshold": str(spread_sum_threshold)},
+        ),
+        "BUY_BOTH_UNDER_1": (
+            "buy_both_cost",
+            columns["buy_both_cost"].le(ONE_DOLLAR),
+            {},
+        ),
+        "SELL_BOTH_OVER_1": (
+            "sell_both_proceeds",
+            columns["sell_both_proceeds"].ge(ONE_DOLLAR),
+            {},
+        ),
+    }
+
+
+def _ts_iso(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).isoformat()
+
+
 def _signals_for_snapshot(
-    snapshot: PairedBookSnapshot,
+    snapshot: SnapshotRecord,
     pair: TradablePair,
     market_meta: dict[str, Any],
     mid_sum_threshold: Decimal,
     spread_sum_threshold: Decimal,
 ) -> list[dict[str, Any]]:
     signals: list[dict[str, Any]] = []
-    ts_iso = datetime.fromtimestamp(snapshot.ts_ms / 1000, tz=timezone.utc).isoformat()
+    ts_iso = _ts_iso(snapshot.ts_ms)
     if abs(snapshot.mid_sum - ONE_DOLLAR) >= mid_sum_threshold:
         signals.append(
             _signal_row(
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from .models import BookBatch
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_LATENCY_WINDOW = 512
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_BASE_BACKOFF_S = 5.0
+DEFAULT_MAX_BACKOFF_S = 300.0
+
+
+class LatencyTracker:
+    def __init__(
+        self,
+        quantile: float = DEFAULT_HEDGE_QUANTILE,
+        window: int = DEFAULT_LATENCY_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> None:
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency_s: float) -> None:
+        self._samples.append(latency_s)
+
+    def threshold_s(self) -> float | None:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+
+class HedgePolicy:
+    # Sends a second copy of a request once it has been outstanding longer than
+    # the rolling latency quantile and keeps whichever reply lands first. Only
+    # the slow tail is duplicated, so the extra load is about 1 - quantile.
+    def __init__(self, tracker: LatencyTracker | None = None) -> None:
+        self.tracker = tracker or LatencyTracker()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+    async def run_async(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        self.requests += 1
+        started = time.perf_counter()
+        threshold = self.tracker.threshold_s()
+        primary = asyncio.ensure_future(attempt())
+        pending: set[asyncio.Future[T]] = {primary}
+        hedge: asyncio.Future[T] | None = None
+        error: BaseException | None = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=threshold)
+            if not done:
+                self.hedged += 1
+                hedge = asyncio.ensure_future(attempt())
+                pending.add(hedge)
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        self._finish(started, won_by_hedge=task is hedge)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+        assert error is not None
+        raise error
+
+    def run(self, attempt: Callable[[], T]) -> T:
+        self.requests += 1
+        started = time.perf_counter()
+        threshold = self.tracker.threshold_s()
+        if threshold is None:
+            result = attempt()
+            self._finish(started, won_by_hedge=False)
+            return result
+        # Threads cannot be cancelled, so a losing request runs to completion and
+        # its reply is dropped.
+        executor = self._thread_pool()
+        primary = executor.submit(attempt)
+        done, pending = concurrent.futures.wait({primary}, timeout=threshold)
+        hedge: concurrent.futures.Future[T] | None = None
+        if not done:
+            self.hedged += 1
+            hedge = executor.submit(attempt)
+            pending.add(hedge)
+        error: BaseException | None = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    self._finish(started, won_by_hedge=future is hedge)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+        assert error is not None
+        raise error
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "threshold_s": self.tracker.threshold_s() or 0.0,
+        }
+
+    def close(self) -> None:
+        if self.requests:
+            logger.info(
+                "Hedged %s of %s requests (%s won) at p%.0f threshold %.3fs",
+                self.hedged,
+                self.requests,
+                self.hedge_wins,
+                self.tracker.quantile * 100,
+                self.tracker.threshold_s() or 0.0,
+            )
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _finish(self, started: float, *, won_by_hedge: bool) -> None:
+        self.tracker.record(time.perf_counter() - started)
+        if won_by_hedge:
+            self.hedge_wins += 1
+
+    def _thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=4, thread_name_prefix="clob-hedge"
+            )
+        return self._executor
+
+
+@dataclass(slots=True)
+class _TokenCircuit:
+    failures: int = 0
+    backoff_s: float = 0.0
+    open_until: float = 0.0
+
+
+class CircuitBreaker:
+    # A token that fails failure_threshold times in a row is skipped until its
+    # backoff expires, then gets a single trial request; every failed trial
+    # doubles the backoff up to max_backoff_s.
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        base_backoff_s: float = DEFAULT_BASE_BACKOFF_S,
+        max_backoff_s: float = DEFAULT_MAX_BACKOFF_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        self.failure_threshold = failure_threshold
+        self.base_backoff_s = base_backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._clock = clock
+        self._circuits: dict[str, _TokenCircuit] = {}
+
+    def allow(self, token_id: str) -> bool:
+        circuit = self._circuits.get(token_id)
+        return circuit is None or circuit.open_until <= self._clock()
+
+    def is_open(self, token_id: str) -> bool:
+        return not self.allow(token_id)
+
+    def record_success(self, token_id: str) -> None:
+        circuit = self._circuits.pop(token_id, None)
+        if circuit is not None and circuit.backoff_s:
+            logger.info("Token %s recovered after %s failures", token_id, circuit.failures)
+
+    def record_failure(self, token_id: str, error: object = None) -> None:
+        circuit = self._circuits.setdefault(token_id, _TokenCircuit())
+        circuit.failures += 1
+        if circuit.failures < self.failure_threshold:
+            return
+        circuit.backoff_s = min(
+            self.max_backoff_s,
+            circuit.backoff_s * 2 if circuit.backoff_s else self.base_backoff_s,
+        )
+        circuit.open_until = self._clock() + circuit.backoff_s
+        logger.warning(
+            "Token %s failed %s times (%s); backing off %.0fs",
+            token_id,
+            circuit.failures,
+            error,
+            circuit.backoff_s,
+        )
+
+    def record_batch(self, token_ids: Iterable[str], batch: BookBatch) -> None:
+        for token_id in token_ids:
+            error = batch.errors.get(token_id)
+            if error is not None:
+                self.record_failure(token_id, error)
+            elif token_id in batch.books or token_id in batch.unchanged:
+                self.record_success(token_id)
+
+    def open_tokens(self) -> list[str]:
+        now = self._clock()
+        return [token for token, circuit in self._circuits.items() if circuit.open_until > now]
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+try:  # zstd compresses recorder CSVs better and several times faster than gzip
+    import zstandard
+except ImportError:  # pragma: no cover - depends on optional extra
+    zstandard = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.jsonl"
+SEGMENT_COMPRESSIONS = ("auto", "gzip", "zstd", "none")
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+_COPY_CHUNK_BYTES = 1 << 20
+
+TimeKey = Callable[[dict[str, Any]], int | None]
+
+
+@dataclass(slots=True)
+class RotationPolicy:
+    # A segment is closed at the first sweep end after the wall clock crosses a
+    # multiple of every_s (so hourly segments start on the hour) or after it
+    # grows past max_bytes. Closed segments are compressed, and listed in
+    # manifest.jsonl.
+    every_s: float | None = None
+    max_bytes: int | None = None
+    compression: str = "auto"
+
+    def codec(self) -> str:
+        if self.compression == "auto":
+            return "zstd" if zstandard is not None else "gzip"
+        if self.compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package; install 'zstd'")
+        return self.compression
+
+
+class SegmentTracker:
+    # Names, measures and closes the segments of one output stream (e.g. the
+    # quotes of a run). The writer owns the open file; this keeps the row count
+    # and time range that go into the manifest.
+    def __init__(
+        self,
+        out_dir: Path,
+        name: str,
+        suffix: str,
+        policy: RotationPolicy,
+        time_key: TimeKey,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.out_dir = out_dir
+        self.name = name
+        self.suffix = suffix
+        self.policy = policy
+        self.time_key = time_key
+        self.codec = policy.codec()
+        self._wall_clock = wall_clock
+        self.path: Path | None = None
+        self.rows = 0
+        self.ts_min_ms: int | None = None
+        self.ts_max_ms: int | None = None
+        self._opened_at = 0.0
+
+    def open_path(self) -> Path:
+        self._opened_at = self._wall_clock()
+        self.path = _segment_path(self.out_dir, self.name, self.suffix, self._opened_at)
+        self.rows = 0
+        self.ts_min_ms = None
+        self.ts_max_ms = None
+        return self.path
+
+    def observe(self, row: dict[str, Any]) -> None:
+        self.rows += 1
+        ts_ms = self.time_key(row)
+        if ts_ms is None:
+            return
+        if self.ts_min_ms is None or ts_ms < self.ts_min_ms:
+            self.ts_min_ms = ts_ms
+        if self.ts_max_ms is None or ts_ms > self.ts_max_ms:
+            self.ts_max_ms = ts_ms
+
+    def state(self) -> dict[str, Any] | None:
+        # The open segment as a session checkpoint records it.
+        if self.path is None:
+            return None
+        return {
+            "file": self.path.name,
+            "opened_at": self._opened_at,
+            "rows": self.rows,
+            "ts_min_ms": self.ts_min_ms,
+            "ts_max_ms": self.ts_max_ms,
+        }
+
+    def resume(self, path: Path, state: dict[str, Any] | None = None) -> None:
+        # Makes path, an uncompressed segment left by an earlier run, the open
+        # segment again. Without a checkpointed state the opened time comes
+        # from the name and the caller observes the rows already in the file.
+        state = state or {}
+        self.path = path
+        opened_at = state.get("opened_at")
+        self._opened_at = opened_at if opened_at is not None else _stamp_time(path, self.name)
+        self.rows = state.get("rows", 0)
+        self.ts_min_ms = state.get("ts_min_ms")
+        self.ts_max_ms = state.get("ts_max_ms")
+
+    def unfinished(self) -> list[Path]:
+        # Segments of this stream that were never compressed or listed.
+        return sorted(self.out_dir.glob(f"{self.name}.*{self.suffix}"))
+
+    def due(self, nbytes: int) -> bool:
+        if self.path is None:
+            return False
+        every_s = self.policy.every_s
+        if every_s and self._wall_clock() >= (self._opened_at // every_s + 1) * every_s:
+            return True
+        return self.policy.max_bytes is not None and nbytes >= self.policy.max_bytes
+
+    def finish(self, compress: bool = True, codec: str | None = None) -> dict[str, Any] | None:
+        # Call after the writer has closed the file. Returns the manifest entry.
+        if self.path is None:
+            return None
+        path = compress_file(self.path, self.codec) if compress else self.path
+        entry = {
+            "stream": self.name,
+            "file": path.name,
+            "rows": self.rows,
+            "ts_min_ms": self.ts_min_ms,
+            "ts_max_ms": self.ts_max_ms,
+            "opened_at": _iso(self._opened_at),
+            "closed_at": _iso(self._wall_clock()),
+            "bytes": path.stat().st_size,
+            "compression": codec or (self.codec if compress else "none"),
+        }
+        append_manifest(self.out_dir, entry)
+        logger.info("Closed segment %s rows=%s bytes=%s", path.name, self.rows, entry["bytes"])
+        self.path = None
+        return entry
+
+
+def compress_file(path: Path, codec: str) -> Path:
+    # Streams path into path.gz / path.zst in fixed-size chunks and removes the
+    # original. The output is renamed into place only when it is complete.
+    if codec == "none":
+        return path
+    target = path.with_name(path.name + COMPRESSED_SUFFIXES[codec])
+    partial = target.with_name(target.name + ".partial")
+    with path.open("rb") as source:
+        if codec == "gzip":
+            with gzip.open(partial, "wb") as sink:
+                shutil.copyfileobj(source, sink, _COPY_CHUNK_BYTES)
+        else:
+            with partial.open("wb") as sink:
+                zstandard.ZstdCompressor().copy_stream(source, sink)
+    os.replace(partial, target)
+    path.unlink()
+    return target
+
+
+def append_manifest(out_dir: Path, entry: dict[str, Any]) -> None:
+    with (out_dir / MANIFEST_FILENAME).open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entry, sort_keys=True) + "\n")
+
+
+def read_manifest(out_dir: Path) -> list[dict[str, Any]]:
+    path = out_dir / MANIFEST_FILENAME
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def segments_between(
+    out_dir: Path, stream: str, start_ms: int | None = None, end_ms: int | None = None
+) -> Iterator[Path]:
+    # Closed segments of a stream whose rows may fall in [start_ms, end_ms].
+    for entry in read_manifest(out_dir):
+        if entry["stream"] != stream:
+            continue
+        ts_min, ts_max = entry.get("ts_min_ms"), entry.get("ts_max_ms")
+        if start_ms is not None and ts_max is not None and ts_max < start_ms:
+            continue
+        if end_ms is not None and ts_min is not None and ts_min > end_ms:
+            continue
+        yield out_dir / entry["file"]
+
+
+def _segment_path(out_dir: Path, name: str, suffix: str, opened_at: float) -> Path:
+    stamp = datetime.fromtimestamp(opened_at, tz=UTC).strftime("%Y%m%dT%H%M%SZ")
+    base = f"{name}.{stamp}"
+    path = out_dir / f"{base}{suffix}"
+    index = 0
+    while _taken(path):
+        index += 1
+        path = out_dir / f"{base}.{index}{suffix}"
+    return path
+
+
+def _stamp_time(path: Path, name: str) -> float:
+    stamp = path.name[len(name) + 1 :].split(".", 1)[0]
+    try:
+        opened = datetime.strptime(stamp, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+    except ValueError:
+        return path.stat().st_mtime
+    return opened.timestamp()
+
+
+def _taken(path: Path) -> bool:
+    return any(
+        path.with_name(path.name + extension).exists() for extension in COMPRESSED_SUFFIXES.values()
+    )
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=UTC).isoformat()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+from .paired import SnapshotRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL_S = 0.5
+DEFAULT_MAX_INTERVAL_S = 60.0
+DEFAULT_SPEEDUP = 0.5
+DEFAULT_BACKOFF = 2.0
+DEFAULT_NEAR_DISTANCE = Decimal("0.01")
+DEFAULT_FAR_DISTANCE = Decimal("0.05")
+DEFAULT_LOG_INTERVAL_S = 300.0
+_ONE = Decimal("1")
+
+
+@dataclass(slots=True)
+class PairSchedule:
+    label: str
+    interval_s: float
+    next_due: float
+    polls: int = 0
+    changes: int = 0
+    polls_since_log: int = 0
+
+
+class AdaptivePollScheduler:
+    # Each pair keeps its own interval: it shrinks while the book keeps changing
+    # or sits near a signal threshold and grows while the book hash is unchanged
+    # or far from every threshold. When the summed request rate would exceed the
+    # budget, every interval is stretched by the same factor.
+    def __init__(
+        self,
+        *,
+        initial_interval_s: float = 2.0,
+        min_interval_s: float = DEFAULT_MIN_INTERVAL_S,
+        max_interval_s: float = DEFAULT_MAX_INTERVAL_S,
+        budget_rps: float | None = None,
+        request_cost: float = 2.0,
+        speedup: float = DEFAULT_SPEEDUP,
+        backoff: float = DEFAULT_BACKOFF,
+        near_distance: Decimal = DEFAULT_NEAR_DISTANCE,
+        far_distance: Decimal = DEFAULT_FAR_DISTANCE,
+        log_interval_s: float = DEFAULT_LOG_INTERVAL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if min_interval_s <= 0 or max_interval_s < min_interval_s:
+            raise ValueError("need 0 < min_interval_s <= max_interval_s")
+        self.initial_interval_s = min(max(initial_interval_s, min_interval_s), max_interval_s)
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max_interval_s
+        self.budget_rps = budget_rps
+        self.request_cost = request_cost
+        self.speedup = speedup
+        self.backoff = backoff
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.log_interval_s = log_interval_s
+        self.stretch = 1.0
+        self._clock = clock
+        self._schedules: dict[Hashable, PairSchedule] = {}
+        self._last_log = clock()
+
+    def add(self, key: Hashable, label: str) -> None:
+        if key not in self._schedules:
+            # Everything is due immediately so the first sweep covers the universe.
+            self._schedules[key] = PairSchedule(
+                label=label, interval_s=self.initial_interval_s, next_due=self._clock()
+            )
+
+    def schedule(self, key: Hashable) -> PairSchedule:
+        return self._schedules[key]
+
+    def due(self) -> list[Hashable]:
+        now = self._clock()
+        return [key for key, state in self._schedules.items() if state.next_due <= now]
+
+    def seconds_until_due(self) -> float:
+        if not self._schedules:
+            return self.max_interval_s
+        next_due = min(state.next_due for state in self._schedules.values())
+        return max(0.0, next_due - self._clock())
+
+    def observe(self, key: Hashable, *, changed: bool, distance: Decimal | None) -> None:
+        state = self._schedules[key]
+        state.polls += 1
+        state.polls_since_log += 1
+        if changed:
+            state.changes += 1
+        if distance is not None and distance <= self.near_distance:
+            interval = self.min_interval_s
+        elif not changed or distance is None or distance >= self.far_distance:
+            interval = state.interval_s * self.backoff
+        else:
+            interval = state.interval_s * self.speedup
+        state.interval_s = min(max(interval, self.min_interval_s), self.max_interval_s)
+        state.next_due = self._clock() + state.interval_s * self.stretch
+
+    def end_sweep(self) -> None:
+        self._rebalance()
+        self.maybe_log()
+
+    def export_state(self) -> list[dict[str, Any]]:
+        # JSON-ready learned intervals and counters, one entry per pair.
+        return [
+            {
+                "key": list(key) if isinstance(key, tuple) else key,
+                "interval_s": state.interval_s,
+                "polls": state.polls,
+                "changes": state.changes,
+            }
+            for key, state in self._schedules.items()
+        ]
+
+    def restore_state(self, entries: list[dict[str, Any]]) -> None:
+        # Pairs added since keep their defaults. Restored pairs keep their
+        # learned interval but are due at once, as after add(), since their
+        # books may have moved while the recorder was down.
+        for entry in entries:
+            key = entry["key"]
+            state = self._schedules.get(tuple(key) if isinstance(key, list) else key)
+            if state is None:
+                continue
+            interval = entry["interval_s"]
+            state.interval_s = min(max(interval, self.min_interval_s), self.max_interval_s)
+            state.polls = entry.get("polls", 0)
+            state.changes = entry.get("changes", 0)
+            state.next_due = self._clock()
+        self._rebalance()
+
+    def demand_rps(self) -> float:
+        return sum(self.request_cost / state.interval_s for state in self._schedules.values())
+
+    def effective_interval_s(self, key: Hashable) -> float:
+        return self._schedules[key].interval_s * self.stretch
+
+    def maybe_log(self, force: bool = False) -> None:
+        now = self._clock()
+        elapsed = now - self._last_log
+        if not force and elapsed < self.log_interval_s:
+            return
+        elapsed = max(elapsed, 1e-9)
+        demand_rps = self.demand_rps()
+        logger.info(
+            "Adaptive polling pairs=%s demand_rps=%.2f effective_rps=%.2f budget_rps=%s "
+            "stretch=%.2f",
+            len(self._schedules),
+            demand_rps,
+            demand_rps / self.stretch,
+            self.budget_rps,
+            self.stretch,
+        )
+        for state in self._schedules.values():
+            logger.info(
+                "Pair %s interval_s=%.2f polls_per_min=%.2f polls=%s changes=%s",
+                state.label,
+                state.interval_s * self.stretch,
+                state.polls_since_log * 60.0 / elapsed,
+                state.polls,
+                state.changes,
+            )
+            state.polls_since_log = 0
+        self._last_log = now
+
+    def _rebalance(self) -> None:
+        if not self.budget_rps or self.budget_rps <= 0:
+            self.stretch = 1.0
+            return
+        self.stretch = max(1.0, self.demand_rps() / self.budget_rps)
+
+
+def threshold_distance(snapshot: SnapshotRecord) -> Decimal:
+    # Only the two-leg arbitrage signals count. Mid drift and wide spreads are
+    # what dead markets look like, so they must not pull a pair to the fast lane.
+    distance = min(snapshot.buy_both_cost - _ONE, _ONE - snapshot.sell_both_proceeds)
+    return max(distance, Decimal("0"))
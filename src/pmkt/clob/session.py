@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SESSION_FILENAME = "session.json"
+SESSION_VERSION = 1
+DEFAULT_CHECKPOINT_INTERVAL_S = 30.0
+
+
+@dataclass(slots=True)
+class SessionCheckpoint:
+    # Everything a restarted recorder needs to carry on in the same out_dir:
+    # the pair universe (TradablePair fields) and its market metadata, the book
+    # hashes the last rows were written from, the adaptive scheduler's learned
+    # intervals, and where each output file's complete rows end. config holds
+    # the run options that decide which rows, files and columns are written.
+    pairs: list[dict[str, Any]]
+    market_index: dict[str, dict[str, Any]] = field(default_factory=dict)
+    book_hashes: dict[str, str] = field(default_factory=dict)
+    scheduler: list[dict[str, Any]] | None = None
+    outputs: dict[str, Any] | None = None
+    config: dict[str, Any] = field(default_factory=dict)
+    sweeps: int = 0
+    saved_at: str = ""
+
+
+class SessionCheckpointer:
+    # Saves session.json in out_dir when interval_s has passed since the last
+    # save (the recorder asks at the end of every sweep) and once more when the
+    # run ends; without an interval, only then. restored is the checkpoint a
+    # resumed run starts from.
+    def __init__(
+        self,
+        out_dir: Path,
+        interval_s: float | None = DEFAULT_CHECKPOINT_INTERVAL_S,
+        *,
+        config: dict[str, Any] | None = None,
+        restored: SessionCheckpoint | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.out_dir = out_dir
+        self.interval_s = interval_s
+        self.config = dict(config or {})
+        self.restored = restored
+        self.saves = 0
+        self._clock = clock
+        self._saved_at = clock()
+
+    def due(self) -> bool:
+        if not self.interval_s:
+            return False
+        return self._clock() - self._saved_at >= self.interval_s
+
+    def save(self, checkpoint: SessionCheckpoint) -> None:
+        checkpoint.config = self.config
+        save_checkpoint(self.out_dir, checkpoint)
+        self._saved_at = self._clock()
+        self.saves += 1
+
+
+def save_checkpoint(out_dir: Path, checkpoint: SessionCheckpoint) -> Path:
+    # The checkpoint is synced to a temporary file and renamed over the old
+    # one, so a crash leaves either the previous checkpoint or this one.
+    out_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint.saved_at = datetime.now(UTC).isoformat()
+    path = out_dir / SESSION_FILENAME
+    partial = path.with_name(path.name + ".partial")
+    payload = {"version": SESSION_VERSION, **asdict(checkpoint)}
+    with partial.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, separators=(",", ":"))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+    _sync_dir(out_dir)
+    logger.debug("Saved session checkpoint %s sweeps=%s", path, checkpoint.sweeps)
+    return path
+
+
+def load_checkpoint(out_dir: Path) -> SessionCheckpoint:
+    path = out_dir / SESSION_FILENAME
+    with path.open(encoding="utf-8") as handle:
+        payload = json.load(handle)
+    version = payload.pop("version", None)
+    if version != SESSION_VERSION:
+        raise ValueError(f"{path} has unsupported session version {version}")
+    return SessionCheckpoint(**payload)
+
+
+def _sync_dir(path: Path) -> None:
+    # Makes the rename itself durable. Not every platform can open a directory.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,1074 @@
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Any, Protocol, runtime_checkable
+
+from pmkt.adapters.sqlite import connect_wal, ensure_columns, execute_with_retry
+
+from .paired import DECIMAL_FIELDS
+from .rotation import RotationPolicy, SegmentTracker, TimeKey
+from .ticklog import TickLogWriter
+
+logger = logging.getLogger(__name__)
+
+QUOTES_NAME = "paired_quotes"
+SIGNALS_NAME = "signals"
+QUOTES_FILENAME = f"{QUOTES_NAME}.csv"
+SIGNALS_FILENAME = f"{SIGNALS_NAME}.csv"
+DEFAULT_BUFFER_BYTES = 1 << 20
+SINK_FORMATS = ("csv", "parquet", "ticklog", "sqlite")
+TICKLOG_FILENAME = f"{QUOTES_NAME}.ticks"
+SQLITE_FILENAME = f"{QUOTES_NAME}.sqlite"
+DEFAULT_ROW_GROUP_SIZE = 100_000
+PARQUET_COMPRESSIONS = ("zstd", "snappy", "gzip", "lz4", "brotli", "none")
+DEFAULT_PARQUET_COMPRESSION = "zstd"
+# Book prices have at most a few decimals and sizes two; mids and sums add one
+# more, so ten leaves plenty of room while keeping every value exact.
+DECIMAL_PRECISION = 28
+DECIMAL_SCALE = 10
+BACKPRESSURE_MODES = ("block", "drop-heartbeats")
+DEFAULT_WRITER_QUEUE = 10_000
+# paired_recorder.ROW_KIND_HEARTBEAT; these rows repeat an unchanged quote.
+_HEARTBEAT_ROW_KIND = "heartbeat"
+_QUOTE, _SIGNAL, _SWEEP, _CALL, _STOP = range(5)
+
+# (name, kind) per column, in file order. The kinds map to Parquet types in
+# _arrow_type and to value conversions in _CONVERTERS. "price" is a decimal
+# known to stay within a few dollars (prices, spreads and two-leg sums), which
+# lets compact formats store it narrower than sizes and depth.
+Column = tuple[str, str]
+_UNBOUNDED_FIELDS = frozenset(
+    name for name in DECIMAL_FIELDS if name.endswith("_sz") or name.startswith("depth_")
+)
+
+SIGNAL_COLUMNS: tuple[Column, ...] = (
+    ("ts_iso", "timestamp"),
+    ("condition_id", "string"),
+    ("gamma_market_id", "string"),
+    ("question", "string"),
+    ("outcomes", "string"),
+    ("token_a_id", "string"),
+    ("outcome_a", "string"),
+    ("token_b_id", "string"),
+    ("outcome_b", "string"),
+    ("lifecycle_state", "string"),
+    ("active", "bool"),
+    ("closed", "bool"),
+    ("enable_order_book", "bool"),
+    ("accepting_orders", "bool"),
+    ("liquidity", "float"),
+    ("event_start_time", "string"),
+    ("end_date", "string"),
+    ("signal_type", "string"),
+    ("signal_value", "decimal"),
+    ("details_json", "string"),
+)
+
+
+# The ladder cost columns, as named by quote_columns.
+_COST_PREFIXES = ("buy_both_cost_", "sell_both_proceeds_")
+
+
+def quote_columns(
+    depth_ladder: Sequence[int] = (), quantities: Sequence[Decimal] = ()
+) -> tuple[Column, ...]:
+    # The paired_quotes columns for a run; the ladder columns depend on the
+    # configured depth levels and cost sizes.
+    ladder: list[Column] = []
+    for levels in depth_ladder:
+        for name in ("bid", "ask"):
+            ladder.append((f"depth_{name}_{levels}_up", "decimal"))
+        for name in ("bid", "ask"):
+            ladder.append((f"depth_{name}_{levels}_down", "decimal"))
+    for quantity in quantities:
+        ladder.append((f"buy_both_cost_{quantity}", "decimal"))
+        ladder.append((f"sell_both_proceeds_{quantity}", "decimal"))
+    return (
+        ("ts_ms", "int"),
+        ("condition_id", "string"),
+        ("token_a_id", "string"),
+        ("token_b_id", "string"),
+        ("outcome_a", "string"),
+        ("outcome_b", "string"),
+        *((name, "decimal" if name in _UNBOUNDED_FIELDS else "price") for name in DECIMAL_FIELDS),
+        ("row_kind", "string"),
+        ("leg_skew_ms", "int"),
+        ("fetch_latency_ms", "float"),
+        *ladder,
+    )
+
+
+@dataclass(slots=True)
+class FlushPolicy:
+    # Written rows reach the file when any enabled trigger fires, and always on
+    # close. The default flushes once per sweep.
+    every_rows: int | None = None
+    every_s: float | None = None
+    on_sweep: bool = True
+
+
+class RecordSink(Protocol):
+    # Where the paired recorder sends its quote and signal rows.
+    def write_quote(self, row: dict[str, Any]) -> None: ...
+
+    def write_signal(self, row: dict[str, Any]) -> None: ...
+
+    def end_sweep(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+@runtime_checkable
+class ResumableSink(RecordSink, Protocol):
+    # A sink whose files a restarted run can carry on appending to.
+    # checkpoint() makes everything written so far durable and returns
+    # JSON-ready positions (None if this sink cannot resume); restore() takes
+    # them back before the first write of the new run.
+    def checkpoint(self) -> dict[str, Any] | None: ...
+
+    def restore(self, state: dict[str, Any]) -> None: ...
+
+
+class CsvRowWriter:
+    # One CSV file kept open for the whole run. The file is created on the first
+    # row, and the header is written only when the file is new or empty, so a
+    # rerun into the same directory appends as before. Without fieldnames the
+    # columns come from the first row. With a rotation policy, rows go to
+    # name.<opened UTC>.csv segments instead, each with its own header.
+    def __init__(
+        self,
+        path: Path,
+        policy: FlushPolicy | None = None,
+        buffer_bytes: int = DEFAULT_BUFFER_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+        fieldnames: Sequence[str] | None = None,
+        rotation: RotationPolicy | None = None,
+        time_key: TimeKey | None = None,
+    ) -> None:
+        self.path = path
+        self.policy = policy or FlushPolicy()
+        self.fieldnames = list(fieldnames) if fieldnames is not None else None
+        self.segments = (
+            SegmentTracker(path.parent, path.stem, path.suffix, rotation, time_key or _no_time)
+            if rotation is not None
+            else None
+        )
+        self.buffer_bytes = buffer_bytes
+        self.rows = 0
+        self.flushes = 0
+        self._clock = clock
+        self._handle: IO[str] | None = None
+        self._writer: csv.DictWriter[str] | None = None
+        self._pending = 0
+        self._flushed_at = clock()
+
+    def write(self, row: dict[str, Any]) -> None:
+        if self._writer is None:
+            self._writer = self._open(self.fieldnames or list(row))
+        self._writer.writerow(row)
+        if self.segments is not None:
+            self.segments.observe(row)
+        self.rows += 1
+        self._pending += 1
+        policy = self.policy
+        if (policy.every_rows is not None and self._pending >= policy.every_rows) or (
+            policy.every_s is not None and self._clock() - self._flushed_at >= policy.every_s
+        ):
+            self.flush()
+
+    def end_sweep(self) -> None:
+        # Segments only roll over here, so a sweep never straddles two files.
+        if self.policy.on_sweep:
+            self.flush()
+        if (
+            self.segments is not None
+            and self._handle is not None
+            and self.segments.due(self._handle.tell())
+        ):
+            self.close()
+
+    def flush(self) -> None:
+        self._flushed_at = self._clock()
+        if self._handle is None or not self._pending:
+            return
+        self._handle.flush()
+        self._pending = 0
+        self.flushes += 1
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        self.flush()
+        self._handle.close()
+        self._handle = None
+        self._writer = None
+        if self.segments is not None:
+            self.segments.finish()
+
+    def checkpoint(self) -> dict[str, Any]:
+        # Flushes and syncs the open file, then returns where its complete rows
+        # end (and, with rotation, the open segment's manifest fields).
+        self.flush()
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        path: Path | None = self.path
+        state: dict[str, Any] = {"offset": 0}
+        if self.segments is not None:
+            path = self.segments.path
+            state["segment"] = self.segments.state()
+        if path is not None and path.exists():
+            state["offset"] = path.stat().st_size
+        return state
+
+    def restore(self, state: dict[str, Any]) -> None:
+        # Before the first write of a resumed run. Rows written after the
+        # checkpoint are kept and a row torn by the crash is cut off. With
+        # rotation the checkpointed segment is reopened, and a later segment the
+        # checkpoint never saw is closed as rotation would have closed it.
+        offset = state.get("offset", 0)
+        if self.segments is None:
+            if self.path.exists():
+                _trim_torn_row(self.path, offset)
+            return
+        segment = state.get("segment")
+        current = self.path.parent / segment["file"] if segment else None
+        for path in self.segments.unfinished():
+            if path == current:
+                continue
+            self.segments.resume(path)
+            self._observe_rows(path, _trim_torn_row(path, 0), header=True)
+            self.segments.finish()
+        if current is not None and current.exists():
+            tail = _trim_torn_row(current, offset)
+            self.segments.resume(current, segment)
+            self._observe_rows(current, tail, header=offset == 0)
+
+    def _observe_rows(self, path: Path, data: bytes, header: bool) -> None:
+        assert self.segments is not None
+        fieldnames = None if header else self.fieldnames or _csv_header(path)
+        text = io.StringIO(data.decode("utf-8"), newline="")
+        for row in csv.DictReader(text, fieldnames=fieldnames):
+            self.segments.observe(row)
+
+    def _open(self, fieldnames: list[str]) -> csv.DictWriter[str]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.segments is None:
+            path = self.path
+        else:
+            # A segment reopened by restore() is carried on, not replaced.
+            path = self.segments.path or self.segments.open_path()
+        self._handle = path.open("a", encoding="utf-8", newline="", buffering=self.buffer_bytes)
+        writer = csv.DictWriter(self._handle, fieldnames=fieldnames)
+        if self._handle.tell() == 0:
+            writer.writeheader()
+        return writer
+
+
+class CsvSink:
+    # paired_quotes.csv and signals.csv in out_dir, both kept open.
+    def __init__(
+        self,
+        out_dir: Path,
+        policy: FlushPolicy | None = None,
+        *,
+        depth_ladder: Sequence[int] = (),
+        quantities: Sequence[Decimal] = (),
+        rotation: RotationPolicy | None = None,
+    ) -> None:
+        self.quotes = CsvRowWriter(
+            out_dir / QUOTES_FILENAME,
+            policy,
+            fieldnames=[name for name, _ in quote_columns(depth_ladder, quantities)],
+            rotation=rotation,
+            time_key=_quote_ts_ms,
+        )
+        self.signals = CsvRowWriter(
+            out_dir / SIGNALS_FILENAME,
+            policy,
+            fieldnames=[name for name, _ in SIGNAL_COLUMNS],
+            rotation=rotation,
+            time_key=_signal_ts_ms,
+        )
+
+    def write_quote(self, row: dict[str, Any]) -> None:
+        self.quotes.write(row)
+
+    def write_signal(self, row: dict[str, Any]) -> None:
+        self.signals.write(row)
+
+    def end_sweep(self) -> None:
+        self.quotes.end_sweep()
+        self.signals.end_sweep()
+
+    def checkpoint(self) -> dict[str, Any]:
+        return {QUOTES_NAME: self.quotes.checkpoint(), SIGNALS_NAME: self.signals.checkpoint()}
+
+    def restore(self, state: dict[str, Any]) -> None:
+        self.quotes.restore(state.get(QUOTES_NAME, {}))
+        self.signals.restore(state.get(SIGNALS_NAME, {}))
+
+    def close(self) -> None:
+        self.quotes.close()
+        self.signals.close()
+        logger.debug(
+            "Closed CSV sink quotes=%s signals=%s flushes=%s",
+            self.quotes.rows,
+            self.signals.rows,
+            self.quotes.flushes + self.signals.flushes,
+        )
+
+
+class ParquetTableWriter:
+    # Buffers rows as typed columns and writes one row group each time
+    # row_group_size rows are buffered, when policy.every_s has passed, and on
+    # close. Every row group is a separate write, and the Parquet footer is only
+    # valid once the file is closed. For those reasons every_rows and on_sweep
+    # are not used. An existing file is never appended to; a rerun starts the
+    # next free name.parquet / name.N.parquet. Rotated segments are left as they
+    # are, since Parquet already compresses each column chunk.
+    def __init__(
+        self,
+        out_dir: Path,
+        name: str,
+        columns: Sequence[Column],
+        policy: FlushPolicy | None = None,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_PARQUET_COMPRESSION,
+        clock: Callable[[], float] = time.monotonic,
+        rotation: RotationPolicy | None = None,
+        time_key: TimeKey | None = None,
+    ) -> None:
+        self.pa, self.pq = _pyarrow()
+        self.out_dir = out_dir
+        self.name = name
+        self.columns = tuple(columns)
+        self.schema = self.pa.schema(
+            [(column, _arrow_type(self.pa, kind)) for column, kind in self.columns]
+        )
+        self.policy = policy or FlushPolicy()
+        self.row_group_size = row_group_size
+        self.compression = None if compression == "none" else compression
+        self.segments = (
+            SegmentTracker(out_dir, name, ".parquet", rotation, time_key or _no_time)
+            if rotation is not None
+            else None
+        )
+        self.path: Path | None = None
+        self.rows = 0
+        self.flushes = 0
+        self._clock = clock
+        self._writer: Any = None
+        self._converters = [_CONVERTERS[kind] for _, kind in self.columns]
+        self._buffer: list[list[Any]] = [[] for _ in self.columns]
+        self._pending = 0
+        self._flushed_at = clock()
+
+    def write(self, row: dict[str, Any]) -> None:
+        for (column, _), convert, values in zip(
+            self.columns, self._converters, self._buffer, strict=True
+        ):
+            values.append(convert(row.get(column, "")))
+        if self.segments is not None:
+            self.segments.observe(row)
+        self.rows += 1
+        self._pending += 1
+        if self._pending >= self.row_group_size or self._interval_elapsed():
+            self.flush()
+
+    def end_sweep(self) -> None:
+        if self._interval_elapsed():
+            self.flush()
+        if (
+            self.segments is not None
+            and self.path is not None
+            and self.segments.due(self.path.stat().st_size)
+        ):
+            self.close()
+
+    def flush(self) -> None:
+        self._flushed_at = self._clock()
+        if not self._pending:
+            return
+        if self._writer is None:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            self.path = (
+                self.segments.open_path()
+                if self.segments is not None
+                else _free_path(self.out_dir, self.name, ".parquet")
+            )
+            self._writer = self.pq.ParquetWriter(
+                self.path, self.schema, compression=self.compression
+            )
+        arrays = [
+            self.pa.array(values, type=field.type)
+            for values, field in zip(self._buffer, self.schema, strict=True)
+        ]
+        self._writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        self._buffer = [[] for _ in self.columns]
+        self._pending = 0
+        self.flushes += 1
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self.path = None
+        if self.segments is not None:
+            self.segments.finish(compress=False, codec=self.compression or "none")
+
+    def _interval_elapsed(self) -> bool:
+        every_s = self.policy.every_s
+        return every_s is not None and self._clock() - self._flushed_at >= every_s
+
+
+class ParquetSink:
+    # paired_quotes.parquet and signals.parquet with fixed, typed schemas:
+    # integer timestamps, exact decimal128 prices and sizes, and nulls where
+    # the CSV has blanks. Needs the 'parquet' extra (pyarrow).
+    def __init__(
+        self,
+        out_dir: Path,
+        policy: FlushPolicy | None = None,
+        *,
+        depth_ladder: Sequence[int] = (),
+        quantities: Sequence[Decimal] = (),
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_PARQUET_COMPRESSION,
+        rotation: RotationPolicy | None = None,
+    ) -> None:
+        self.quotes = ParquetTableWriter(
+            out_dir,
+            QUOTES_NAME,
+            quote_columns(depth_ladder, quantities),
+            policy,
+            row_group_size=row_group_size,
+            compression=compression,
+            rotation=rotation,
+            time_key=_quote_ts_ms,
+        )
+        self.signals = ParquetTableWriter(
+            out_dir,
+            SIGNALS_NAME,
+            SIGNAL_COLUMNS,
+            policy,
+            row_group_size=row_group_size,
+            compression=compression,
+            rotation=rotation,
+            time_key=_signal_ts_ms,
+        )
+
+    def write_quote(self, row: dict[str, Any]) -> None:
+        self.quotes.write(row)
+
+    def write_signal(self, row: dict[str, Any]) -> None:
+        self.signals.write(row)
+
+    def end_sweep(self) -> None:
+        self.quotes.end_sweep()
+        self.signals.end_sweep()
+
+    def close(self) -> None:
+        try:
+            self.quotes.close()
+        finally:
+            self.signals.close()
+        logger.debug(
+            "Closed Parquet sink quotes=%s signals=%s row_groups=%s",
+            self.quotes.rows,
+            self.signals.rows,
+            self.quotes.flushes + self.signals.flushes,
+        )
+
+
+class TickLogSink:
+    # Quotes go to paired_quotes.ticks, an append-only fixed-width binary log
+    # (see pmkt.clob.ticklog). Signals are rare and stay in signals.csv.
+    # Buffered quotes are written under the same FlushPolicy as the CSV.
+    def __init__(
+        self,
+        out_dir: Path,
+        policy: FlushPolicy | None = None,
+        *,
+        depth_ladder: Sequence[int] = (),
+        quantities: Sequence[Decimal] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy or FlushPolicy()
+        # Costs are price times size and can have more places than the log
+        # keeps, so they are rounded to its scale rather than rejected.
+        columns = quote_columns(depth_ladder, quantities)
+        self.quotes = TickLogWriter(
+            out_dir / TICKLOG_FILENAME,
+            columns,
+            rounded=[name for name, _ in columns if name.startswith(_COST_PREFIXES)],
+        )
+        self.signals = CsvRowWriter(
+            out_dir / SIGNALS_FILENAME, policy, fieldnames=[name for name, _ in SIGNAL_COLUMNS]
+        )
+        self._clock = clock
+        self._flushed_at = clock()
+
+    def write_quote(self, row: dict[str, Any]) -> None:
+        self.quotes.write(row)
+        policy = self.policy
+        if (policy.every_rows is not None and self.quotes.pending >= policy.every_rows) or (
+            policy.every_s is not None and self._clock() - self._flushed_at >= policy.every_s
+        ):
+            self._flush_quotes()
+
+    def write_signal(self, row: dict[str, Any]) -> None:
+        self.signals.write(row)
+
+    def end_sweep(self) -> None:
+        if self.policy.on_sweep:
+            self._flush_quotes()
+        self.signals.end_sweep()
+
+    def checkpoint(self) -> dict[str, Any]:
+        self._flushed_at = self._clock()
+        return {QUOTES_NAME: self.quotes.checkpoint(), SIGNALS_NAME: self.signals.checkpoint()}
+
+    def restore(self, state: dict[str, Any]) -> None:
+        self.quotes.restore(state.get(QUOTES_NAME, {}))
+        self.signals.restore(state.get(SIGNALS_NAME, {}))
+
+    def close(self) -> None:
+        try:
+            self.quotes.close()
+        finally:
+            self.signals.close()
+
+    def _flush_quotes(self) -> None:
+        self._flushed_at = self._clock()
+        self.quotes.flush()
+
+
+class SqliteSink:
+    # paired_quotes and signals tables in out_dir/paired_quotes.sqlite, opened
+    # in WAL mode so other processes can query while the recorder writes.
+    # Timestamps are integer milliseconds (the signals' ts_iso becomes ts_ms),
+    # prices and sizes REAL, flags 0/1, and both tables are indexed on
+    # (condition_id, ts_ms). Rows are buffered and committed in one
+    # transaction per sweep, or when every_rows / every_s fire. A commit that
+    # still finds the database locked after the retries keeps its rows for
+    # the next one.
+    def __init__(
+        self,
+        out_dir: Path,
+        policy: FlushPolicy | None = None,
+        *,
+        depth_ladder: Sequence[int] = (),
+        quantities: Sequence[Decimal] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.path = out_dir / SQLITE_FILENAME
+        self.policy = policy or FlushPolicy()
+        # Written from the ThreadedSink writer thread, but only one at a time.
+        self.conn = connect_wal(self.path, check_same_thread=False)
+        self.rows = 0
+        self.commits = 0
+        self._tables = {
+            QUOTES_NAME: _SqliteTable(QUOTES_NAME, quote_columns(depth_ladder, quantities)),
+            SIGNALS_NAME: _SqliteTable(SIGNALS_NAME, SIGNAL_COLUMNS),
+        }
+        for table in self._tables.values():
+            table.create(self.conn)
+        self.conn.commit()
+        self._clock = clock
+        self._flushed_at = clock()
+
+    def write_quote(self, row: dict[str, Any]) -> None:
+        self._write(QUOTES_NAME, row)
+
+    def write_signal(self, row: dict[str, Any]) -> None:
+        self._write(SIGNALS_NAME, row)
+
+    def end_sweep(self) -> None:
+        if self.policy.on_sweep:
+            self.flush()
+
+    def flush(self) -> None:
+        self._flushed_at = self._clock()
+        tables = [table for table in self._tables.values() if table.pending]
+        if not tables:
+            return
+
+        def _write() -> None:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN")
+            for table in tables:
+                cur.executemany(table.insert, table.pending)
+            self.conn.commit()
+
+        if not execute_with_retry("sqlite_sink_commit", _write, conn=self.conn):
+            return
+        for table in tables:
+            table.pending = []
+        self.commits += 1
+
+    def checkpoint(self) -> dict[str, Any]:
+        # Committed transactions are whole, so a resumed run has nothing to
+        # trim; committing the buffered rows is all a checkpoint needs.
+        self.flush()
+        return {}
+
+    def restore(self, state: dict[str, Any]) -> None:
+        pass
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+        logger.debug("Closed SQLite sink rows=%s commits=%s", self.rows, self.commits)
+
+    def _write(self, name: str, row: dict[str, Any]) -> None:
+        table = self._tables[name]
+        table.pending.append(table.values(row))
+        self.rows += 1
+        policy = self.policy
+        pending = sum(len(table.pending) for table in self._tables.values())
+        if (policy.every_rows is not None and pending >= policy.every_rows) or (
+            policy.every_s is not None and self._clock() - self._flushed_at >= policy.every_s
+        ):
+            self.flush()
+
+
+class _SqliteTable:
+    # One table's schema, insert statement and buffered rows.
+    def __init__(self, name: str, columns: Sequence[Column]) -> None:
+        self.name = name
+        self.columns = tuple(columns)
+        self.names = [_sqlite_name(column, kind) for column, kind in self.columns]
+        self.types = [_SQLITE_TYPES[kind] for _, kind in self.columns]
+        self._converters = [_SQLITE_CONVERTERS[kind] for _, kind in self.columns]
+        quoted = ", ".join(f'"{column}"' for column in self.names)
+        placeholders = ", ".join("?" for _ in self.names)
+        self.insert = f'INSERT INTO "{name}" ({quoted}) VALUES ({placeholders})'
+        self.pending: list[tuple[Any, ...]] = []
+
+    def create(self, conn: sqlite3.Connection) -> None:
+        definitions = ", ".join(
+            f'"{column}" {kind}' for column, kind in zip(self.names, self.types, strict=True)
+        )
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.name}" ({definitions})')
+        # A rerun with more ladder columns extends the existing table.
+        ensure_columns(conn, self.name, dict(zip(self.names, self.types, strict=True)))
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "{self.name}_condition_ts" '
+            f'ON "{self.name}" (condition_id, ts_ms)'
+        )
+
+    def values(self, row: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(
+            convert(row.get(column, ""))
+            for (column, _), convert in zip(self.columns, self._converters, strict=True)
+        )
+
+
+class ThreadedSink:
+    # Runs another sink on a dedicated writer thread, so a slow disk (or a
+    # segment being compressed) delays the writer instead of the next fetch.
+    # Rows wait in a queue of at most max_queue items; the writer takes
+    # everything queued at once and writes it as one batch. When the queue is
+    # full, "block" makes the recorder wait, and "drop-heartbeats" drops the
+    # incoming or oldest queued heartbeat row first and only blocks when no
+    # heartbeat is left to drop. A write error on the thread is raised on the
+    # next call. checkpoint() and restore() run on the writer thread, after
+    # everything queued before them.
+    def __init__(
+        self,
+        sink: RecordSink,
+        max_queue: int = DEFAULT_WRITER_QUEUE,
+        backpressure: str = "block",
+    ) -> None:
+        if backpressure not in BACKPRESSURE_MODES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_MODES}")
+        self.sink = sink
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.max_depth = 0
+        self.dropped = 0
+        self.blocked_s = 0.0
+        self.batches = 0
+        self.rows = 0
+        self.write_s = 0.0
+        self.max_write_s = 0.0
+        self._queue: deque[tuple[int, Any]] = deque()
+        self._cond = threading.Condition()
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="record-sink", daemon=True)
+        self._thread.start()
+
+    def write_quote(self, row: dict[str, Any]) -> None:
+        self._put(_QUOTE, row)
+
+    def write_signal(self, row: dict[str, Any]) -> None:
+        self._put(_SIGNAL, row)
+
+    def end_sweep(self) -> None:
+        self._put(_SWEEP, None)
+
+    def checkpoint(self) -> dict[str, Any] | None:
+        if not isinstance(self.sink, ResumableSink):
+            return None
+        return self._call(self.sink.checkpoint)
+
+    def restore(self, state: dict[str, Any]) -> None:
+        sink = self.sink
+        if isinstance(sink, ResumableSink):
+            self._call(lambda: sink.restore(state))
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        with self._cond:
+            self._queue.append((_STOP, None))
+            self._cond.notify_all()
+        self._thread.join()
+        try:
+            self.sink.close()
+        finally:
+            self.log_stats()
+        self._raise_error()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "blocked_s": round(self.blocked_s, 3),
+            "batches": self.batches,
+            "rows": self.rows,
+            "write_ms_avg": round(self.write_s / self.batches * 1000, 3) if self.batches else 0.0,
+            "write_ms_max": round(self.max_write_s * 1000, 3),
+        }
+
+    def log_stats(self, level: int = logging.INFO) -> None:
+        stats = self.stats()
+        logger.log(
+            level,
+            "sink writer rows=%s batches=%s depth=%s max_depth=%s dropped=%s blocked_s=%.3f "
+            "write_ms_avg=%.3f write_ms_max=%.3f",
+            stats["rows"],
+            stats["batches"],
+            stats["depth"],
+            stats["max_depth"],
+            stats["dropped"],
+            stats["blocked_s"],
+            stats["write_ms_avg"],
+            stats["write_ms_max"],
+        )
+
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        call = _Call(fn)
+        self._put(_CALL, call)
+        with self._cond:
+            while not call.done and self._error is None:
+                self._cond.wait()
+        self._raise_error()
+        return call.result
+
+    def _put(self, kind: int, row: Any) -> None:
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("ThreadedSink is closed")
+        with self._cond:
+            if len(self._queue) >= self.max_queue and self._drop_heartbeat(kind, row):
+                return
+            if len(self._queue) >= self.max_queue:
+                started = time.monotonic()
+                while len(self._queue) >= self.max_queue and self._error is None:
+                    self._cond.wait()
+                self.blocked_s += time.monotonic() - started
+                self._raise_error()
+            self._queue.append((kind, row))
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+
+    def _drop_heartbeat(self, kind: int, row: dict[str, Any] | None) -> bool:
+        # True when the incoming row itself is dropped; otherwise the oldest
+        # queued heartbeat, if any, makes way for it.
+        if self.backpressure != "drop-heartbeats":
+            return False
+        if kind == _QUOTE and _is_heartbeat(row):
+            self.dropped += 1
+            return True
+        for index, (queued_kind, queued_row) in enumerate(self._queue):
+            if queued_kind == _QUOTE and _is_heartbeat(queued_row):
+                del self._queue[index]
+                self.dropped += 1
+                break
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                batch = self._queue
+                self._queue = deque()
+                self._cond.notify_all()
+            started = time.monotonic()
+            try:
+                stop = self._write_batch(batch)
+            except BaseException as exc:  # noqa: BLE001 - handed to the recorder thread
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            elapsed = time.monotonic() - started
+            self.batches += 1
+            self.write_s += elapsed
+            self.max_write_s = max(self.max_write_s, elapsed)
+            if stop:
+                return
+
+    def _write_batch(self, batch: deque[tuple[int, Any]]) -> bool:
+        sink = self.sink
+        for kind, row in batch:
+            if kind == _QUOTE:
+                sink.write_quote(row)  # type: ignore[arg-type]
+                self.rows += 1
+            elif kind == _SIGNAL:
+                sink.write_signal(row)  # type: ignore[arg-type]
+                self.rows += 1
+            elif kind == _SWEEP:
+                sink.end_sweep()
+            elif kind == _CALL:
+                row.result = row.fn()
+                with self._cond:
+                    row.done = True
+                    self._cond.notify_all()
+            else:
+                return True
+        return False
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Record sink writer failed") from self._error
+
+
+@dataclass(slots=True)
+class _Call:
+    fn: Callable[[], Any]
+    result: Any = None
+    done: bool = False
+
+
+def make_sink(
+    sink_format: str,
+    out_dir: Path,
+    policy: FlushPolicy | None = None,
+    *,
+    depth_ladder: Sequence[int] = (),
+    quantities: Sequence[Decimal] = (),
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = DEFAULT_PARQUET_COMPRESSION,
+    rotation: RotationPolicy | None = None,
+) -> RecordSink:
+    if sink_format == "csv":
+        return CsvSink(
+            out_dir, policy, depth_ladder=depth_ladder, quantities=quantities, rotation=rotation
+        )
+    if sink_format in {"ticklog", "sqlite"} and rotation is not None:
+        raise ValueError(f"The {sink_format} format does not support rotation")
+    if sink_format == "ticklog":
+        return TickLogSink(out_dir, policy, depth_ladder=depth_ladder, quantities=quantities)
+    if sink_format == "sqlite":
+        return SqliteSink(out_dir, policy, depth_ladder=depth_ladder, quantities=quantities)
+    if sink_format == "parquet":
+        return ParquetSink(
+            out_dir,
+            policy,
+            depth_ladder=depth_ladder,
+            quantities=quantities,
+            row_group_size=row_group_size,
+            compression=compression,
+            rotation=rotation,
+        )
+    raise ValueError(f"Unknown sink format {sink_format!r}; expected one of {SINK_FORMATS}")
+
+
+def _pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:  # pragma: no cover - depends on optional extra
+        raise RuntimeError(
+            "Parquet output needs the pyarrow package; install the 'parquet' extra"
+        ) from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _arrow_type(pa: Any, kind: str) -> Any:
+    if kind == "int":
+        return pa.int64()
+    if kind == "float":
+        return pa.float64()
+    if kind in {"decimal", "price"}:
+        return pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE)
+    if kind == "bool":
+        return pa.bool_()
+    if kind == "timestamp":
+        return pa.timestamp("ms", tz="UTC")
+    return pa.string()
+
+
+def _sqlite_name(column: str, kind: str) -> str:
+    # Timestamps are stored as epoch milliseconds, so ts_iso becomes ts_ms.
+    return column.removesuffix("_iso") + "_ms" if kind == "timestamp" else column
+
+
+def _free_path(out_dir: Path, name: str, suffix: str) -> Path:
+    path = out_dir / f"{name}{suffix}"
+    index = 0
+    while path.exists():
+        index += 1
+        path = out_dir / f"{name}.{index}{suffix}"
+    return path
+
+
+def _trim_torn_row(path: Path, offset: int) -> bytes:
+    # Cuts a row left half-written by a crash off the end of a CSV file whose
+    # complete rows reached offset at the last checkpoint, and returns the
+    # complete rows written after it.
+    with path.open("r+b") as handle:
+        size = handle.seek(0, 2)
+        if size < offset:
+            raise ValueError(f"{path} is shorter than its session checkpoint")
+        handle.seek(offset)
+        tail = handle.read()
+        end = _complete_rows_end(tail)
+        if end < len(tail):
+            handle.truncate(offset + end)
+            logger.warning("Dropped %s bytes of a torn row at the end of %s", len(tail) - end, path)
+    return tail[:end]
+
+
+def _complete_rows_end(data: bytes) -> int:
+    # Length of the CSV records in data that end in a newline outside quotes.
+    # A quoted field may hold newlines, and its quotes (doubled ones included)
+    # always pair up within a complete record.
+    end = position = 0
+    quoted = False
+    for line in data.split(b"\n")[:-1]:
+        position += len(line) + 1
+        quoted ^= line.count(b'"') % 2 == 1
+        if not quoted:
+            end = position
+    return end
+
+
+def _csv_header(path: Path) -> list[str]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return next(csv.reader(handle), [])
+
+
+def _is_heartbeat(row: dict[str, Any] | None) -> bool:
+    return row is not None and row.get("row_kind") == _HEARTBEAT_ROW_KIND
+
+
+def _quote_ts_ms(row: dict[str, Any]) -> int | None:
+    return _to_int(row.get("ts_ms", ""))
+
+
+def _signal_ts_ms(row: dict[str, Any]) -> int | None:
+    ts = _to_timestamp(row.get("ts_iso", ""))
+    return int(ts.timestamp() * 1000) if ts is not None else None
+
+
+def _no_time(row: dict[str, Any]) -> int | None:
+    return None
+
+
+# Row values are what the CSV would hold: numbers as text or ints, blanks for
+# missing values. Each converter turns one into the column's Python type.
+def _to_int(value: Any) -> int | None:
+    return None if value == "" or value is None else int(value)
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        return None if value == "" or value is None else float(value)
+    except ValueError:
+        return None
+
+
+def _to_decimal(value: Any) -> Decimal | None:
+    if value == "" or value is None:
+        return None
+    return value if isinstance(value, Decimal) else Decimal(value)
+
+
+def _to_bool(value: Any) -> bool | None:
+    if isinstance(value, bool):
+        return value
+    return {"true": True, "false": False}.get(str(value).strip().lower())
+
+
+def _to_timestamp(value: Any) -> datetime | None:
+    if value == "" or value is None:
+        return None
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def _to_string(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _to_real(value: Any) -> float | None:
+    return None if value == "" or value is None else float(value)
+
+
+def _to_epoch_ms(value: Any) -> int | None:
+    ts = _to_timestamp(value)
+    return int(ts.timestamp() * 1000) if ts is not None else None
+
+
+_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "int": _to_int,
+    "float": _to_float,
+    "decimal": _to_decimal,
+    "price": _to_decimal,
+    "bool": _to_bool,
+    "timestamp": _to_timestamp,
+    "string": _to_string,
+}
+
+_SQLITE_TYPES = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "decimal": "REAL",
+    "price": "REAL",
+    "bool": "INTEGER",
+    "timestamp": "INTEGER",
+    "string": "TEXT",
+}
+_SQLITE_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    **_CONVERTERS,
+    "decimal": _to_real,
+    "price": _to_real,
+    "timestamp": _to_epoch_ms,
+}
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from . import decode
+from .l2 import L2Book, L2BookEngine, changes_from_event
+from .models import OrderBook, SortedOrderBook
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKET_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+DEFAULT_PING_INTERVAL_S = 10.0
+DEFAULT_RECONNECT_DELAY_S = 0.5
+DEFAULT_MAX_RECONNECT_DELAY_S = 30.0
+
+BookUpdateHandler = Callable[[dict[str, OrderBook]], None]
+
+
+class MarketStream:
+    def __init__(
+        self,
+        token_ids: Iterable[str],
+        url: str = DEFAULT_MARKET_WS_URL,
+        *,
+        ping_interval_s: float = DEFAULT_PING_INTERVAL_S,
+        reconnect_delay_s: float = DEFAULT_RECONNECT_DELAY_S,
+        max_reconnect_delay_s: float = DEFAULT_MAX_RECONNECT_DELAY_S,
+    ) -> None:
+        self.token_ids = list(dict.fromkeys(token_ids))
+        self.url = url
+        self.ping_interval_s = ping_interval_s
+        self.reconnect_delay_s = reconnect_delay_s
+        self.max_reconnect_delay_s = max_reconnect_delay_s
+        # Books come only from the feed: a book is dropped on reconnect or when a
+        # change leaves it crossed, and rebuilt from the next "book" event.
+        self.engine = L2BookEngine(None)
+        self._subscribed = set(self.token_ids)
+        self.connections = 0
+        self.messages = 0
+
+    def subscription(self) -> dict[str, Any]:
+        return {"assets_ids": self.token_ids, "type": "market"}
+
+    async def run(self, on_update: BookUpdateHandler, stop: asyncio.Event | None = None) -> None:
+        connect = _websocket_connect()
+        stop = stop or asyncio.Event()
+        delay = self.reconnect_delay_s
+        while not stop.is_set():
+            try:
+                async with connect(self.url, ping_interval=None) as websocket:
+                    self.connections += 1
+                    self.engine.books.clear()
+                    await websocket.send(json.dumps(self.subscription()))
+                    logger.info(
+                        "Subscribed to %s tokens on %s (connection %s)",
+                        len(self.token_ids),
+                        self.url,
+                        self.connections,
+                    )
+                    delay = self.reconnect_delay_s
+                    await self._consume(websocket, on_update, stop)
+                    if stop.is_set():
+                        return
+                    error: object = "closed by server"
+            except Exception as exc:  # noqa: BLE001 - reconnect on any transport error
+                error = exc
+            if stop.is_set():
+                return
+            logger.warning("Market stream disconnected (%s); reconnecting in %.2fs", error, delay)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            delay = min(delay * 2, self.max_reconnect_delay_s)
+
+    def handle_message(self, raw: str | bytes) -> dict[str, OrderBook]:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        if raw in {"PONG", "PING"}:
+            return {}
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.debug("Ignoring non-JSON stream message: %s", raw[:200])
+            return {}
+        events = payload if isinstance(payload, list) else [payload]
+        touched: set[str] = set()
+        for event in events:
+            if isinstance(event, dict):
+                touched.update(self._apply_event(event))
+        self.messages += 1
+        books = self.engine.books
+        return {token_id: _detached(books[token_id]) for token_id in touched if token_id in books}
+
+    async def _consume(
+        self, websocket: Any, on_update: BookUpdateHandler, stop: asyncio.Event
+    ) -> None:
+        pinger = asyncio.create_task(self._ping(websocket))
+        stopper = asyncio.create_task(stop.wait())
+        try:
+            while not stop.is_set():
+                receive = asyncio.ensure_future(websocket.recv())
+                done, _ = await asyncio.wait(
+                    {receive, stopper}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if receive not in done:
+                    receive.cancel()
+                    with contextlib.suppress(BaseException):
+                        await receive
+                    return
+                updates = self.handle_message(receive.result())
+                if updates:
+                    on_update(updates)
+        finally:
+            pinger.cancel()
+            stopper.cancel()
+
+    async def _ping(self, websocket: Any) -> None:
+        if self.ping_interval_s <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.ping_interval_s)
+            try:
+                await websocket.send("PING")
+            except Exception:  # noqa: BLE001 - the receive loop reports the disconnect
+                return
+
+    def _apply_event(self, event: dict[str, Any]) -> set[str]:
+        event_type = event.get("event_type")
+        if event_type == "book":
+            token_id = str(event.get("asset_id") or "")
+            if token_id not in self._subscribed:
+                return set()
+            self.engine.apply_snapshot(token_id, event)
+            return {token_id}
+        if event_type == "price_change":
+            return {
+                change.token_id
+                for change in changes_from_event(event)
+                if self.engine.apply(change) is not None
+            }
+        if event_type == "tick_size_change":
+            book = self.engine.books.get(str(event.get("asset_id") or ""))
+            if book is not None and event.get("new_tick_size"):
+                book.tick_size = decode.to_decimal(event["new_tick_size"])
+        return set()
+
+
+def _websocket_connect() -> Any:
+    try:
+        from websockets.asyncio.client import connect
+    except ImportError as exc:  # pragma: no cover - depends on optional extra
+        raise RuntimeError(
+            "Stream mode needs the websockets package; install the 'stream' extra"
+        ) from exc
+    return connect
+
+
+def _detached(book: L2Book) -> OrderBook:
+    # The engine keeps editing its books in place, while the recorder and the
+    # book cache hold on to what they are given, so they get their own levels.
+    return SortedOrderBook(
+        token_id=book.token_id,
+        market=book.market,
+        timestamp_ms=book.timestamp_ms,
+        bids=list(book.bids),
+        asks=list(book.asks),
+        tick_size=book.tick_size,
+        min_order_size=book.min_order_size,
+        hash=book.hash,
+    )
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+from collections.abc import Collection, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+import numpy as np
+import numpy.typing as npt
+
+from . import fixed
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC, a little-endian u32 header length, a JSON header padded
+# with spaces so records start on a 64-byte boundary, then fixed-width records
+# (the numpy dtype described in the header) back to back. Strings are stored
+# as indexes into a sidecar .symbols file, one JSON string per line, appended
+# before any record that uses them.
+MAGIC = b"PMKTTICK"
+VERSION = 1
+DEFAULT_SCALE = 6
+INT_NULL = np.iinfo(np.int64).min
+PRICE_NULL = np.iinfo(np.int32).min
+SYMBOLS_SUFFIX = ".symbols"
+_HEADER_ALIGN = 64
+_LENGTH = struct.Struct("<I")
+# Column kinds as in sinks.quote_columns. "decimal" and "price" are stored as
+# integer units of 10**-scale (int32 is enough for prices below 2147 at the
+# default scale), "string" as a symbol index. The smallest value of an integer
+# column marks a blank.
+_FORMATS = {
+    "int": "<i8",
+    "decimal": "<i8",
+    "price": "<i4",
+    "float": "<f8",
+    "string": "<u4",
+    "bool": "u1",
+}
+
+Column = tuple[str, str]
+
+
+def record_dtype(columns: Sequence[Column]) -> np.dtype[Any]:
+    # Eight-byte fields first so every column of an aligned record is aligned.
+    ordered = sorted(columns, key=lambda column: -np.dtype(_FORMATS[column[1]]).itemsize)
+    return np.dtype([(name, _FORMATS[kind]) for name, kind in ordered], align=True)
+
+
+class TickLogWriter:
+    # Appends rows (as the CSV sink would get them) to a tick log. Rows are
+    # buffered until flush(). Reopening an existing log checks that the columns
+    # and scale match, drops any torn record at the end, and carries on
+    # appending with the same symbol table. Decimal columns named in rounded
+    # (products such as ladder costs, which can be finer than the scale) are
+    # rounded half-even to the scale and counted in rounded_values; any other
+    # value finer than the scale is an error.
+    def __init__(
+        self,
+        path: Path,
+        columns: Sequence[Column],
+        scale: int = DEFAULT_SCALE,
+        *,
+        rounded: Collection[str] = (),
+    ) -> None:
+        self.path = path
+        self.symbols_path = symbols_path(path)
+        self.columns = tuple((name, kind) for name, kind in columns)
+        self.scale = scale
+        self.dtype = record_dtype(self.columns)
+        self.rows = 0
+        self.rounded_values = 0
+        self._names = list(self.dtype.names or ())
+        kinds = dict(self.columns)
+        self._converters = [
+            self._rounded_units
+            if name in rounded and kinds[name] == "decimal"
+            else self._converter(kinds[name])
+            for name in self._names
+        ]
+        self._symbols: dict[str, int] = {}
+        self._new_symbols: list[str] = []
+        self._pending: list[tuple[Any, ...]] = []
+        self._handle: IO[bytes] | None = None
+        self._offset: int | None = None
+        if path.exists() and path.stat().st_size:
+            self._resume()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def write(self, row: dict[str, Any]) -> None:
+        self._pending.append(
+            tuple(
+                convert(row.get(name, ""))
+                for name, convert in zip(self._names, self._converters, strict=True)
+            )
+        )
+        self.rows += 1
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        if self._handle is None:
+            self._handle = self._open()
+        if self._new_symbols:
+            with self.symbols_path.open("a", encoding="utf-8") as symbols:
+                symbols.writelines(json.dumps(symbol) + "\n" for symbol in self._new_symbols)
+            self._new_symbols = []
+        self._handle.write(np.array(self._pending, dtype=self.dtype).tobytes())
+        self._handle.flush()
+        self._pending = []
+
+    def checkpoint(self) -> dict[str, Any]:
+        # Flushes and syncs the log and its symbols, then returns where the
+        # complete records end.
+        self.flush()
+        if self._handle is not None:
+            os.fsync(self._handle.fileno())
+        if self.symbols_path.exists():
+            with self.symbols_path.open("rb") as symbols:
+                os.fsync(symbols.fileno())
+        return {"offset": self.path.stat().st_size if self.path.exists() else 0}
+
+    def restore(self, state: dict[str, Any]) -> None:
+        # Records after the checkpoint are kept and a torn one is already cut
+        # off on reopening, so all that is left is to check nothing was lost.
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if size < state.get("offset", 0):
+            raise ValueError(f"{self.path} is shorter than its session checkpoint")
+
+    def close(self) -> None:
+        self.flush()
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.rounded_values:
+            logger.info(
+                "Rounded %s values in %s to %s decimal places",
+                self.rounded_values,
+                self.path,
+                self.scale,
+            )
+
+    def _resume(self) -> None:
+        header, self._offset = read_header(self.path)
+        if [tuple(column) for column in header["columns"]] != list(self.columns) or (
+            header["scale"] != self.scale
+        ):
+            raise ValueError(f"{self.path} was written with different columns or scale")
+        # Symbols may be ahead of the records after a crash, never behind, so
+        # a kept record never points at a missing symbol.
+        for symbol in read_symbols(self.symbols_path, repair=True):
+            self._symbols[symbol] = len(self._symbols)
+
+    def _open(self) -> IO[bytes]:
+        if self._offset is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.symbols_path.write_text("", encoding="utf-8")
+            handle = self.path.open("wb")
+            handle.write(_encode_header(self.columns, self.scale, self.dtype))
+            return handle
+        handle = self.path.open("r+b")
+        whole = (self.path.stat().st_size - self._offset) // self.dtype.itemsize
+        handle.truncate(self._offset + whole * self.dtype.itemsize)
+        handle.seek(0, 2)
+        return handle
+
+    def _converter(self, kind: str) -> Any:
+        if kind == "decimal":
+            return self._units
+        if kind == "price":
+            return self._price_units
+        if kind == "string":
+            return self._intern
+        if kind == "float":
+            return _float_or_nan
+        if kind == "bool":
+            return _bool_byte
+        return _int_or_null
+
+    def _units(self, value: Any) -> int:
+        if value == "" or value is None:
+            return INT_NULL
+        coefficient, exponent = fixed.parse(value)
+        if exponent >= -self.scale:
+            return coefficient * 10 ** (self.scale + exponent)
+        units, remainder = divmod(coefficient, 10 ** (-self.scale - exponent))
+        if remainder:
+            raise ValueError(f"{value} has more than {self.scale} decimal places")
+        return units
+
+    def _rounded_units(self, value: Any) -> int:
+        if value == "" or value is None:
+            return INT_NULL
+        coefficient, exponent = fixed.parse(value)
+        if exponent >= -self.scale:
+            return coefficient * 10 ** (self.scale + exponent)
+        step = 10 ** (-self.scale - exponent)
+        units, remainder = divmod(coefficient, step)
+        if remainder:
+            self.rounded_values += 1
+            # divmod floors, so remainder is in [0, step) for either sign.
+            if 2 * remainder > step or (2 * remainder == step and units % 2):
+                units += 1
+        return units
+
+    def _price_units(self, value: Any) -> int:
+        if value == "" or value is None:
+            return PRICE_NULL
+        units = self._units(value)
+        if not PRICE_NULL < units <= -PRICE_NULL - 1:
+            raise ValueError(f"{value} does not fit a price column at scale {self.scale}")
+        return units
+
+    def _intern(self, value: Any) -> int:
+        text = "" if value is None else str(value)
+        index = self._symbols.get(text)
+        if index is None:
+            index = self._symbols[text] = len(self._symbols)
+            self._new_symbols.append(text)
+        return index
+
+
+class TickLogReader:
+    # Memory-maps a tick log. column() returns a zero-copy view of one field
+    # across all records; values() and strings() return converted copies.
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        header, offset = read_header(path)
+        self.columns: list[Column] = [tuple(column) for column in header["columns"]]
+        self.scale: int = header["scale"]
+        self.dtype = np.dtype(header["dtype"])
+        count = (path.stat().st_size - offset) // self.dtype.itemsize
+        self.records: npt.NDArray[Any] = (
+            np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+            if count
+            else np.empty(0, dtype=self.dtype)
+        )
+        self.symbols = read_symbols(symbols_path(path))
+        self._symbol_ids = {symbol: index for index, symbol in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, name: str) -> npt.NDArray[Any]:
+        return self.records[name]
+
+    def values(self, name: str) -> npt.NDArray[np.float64]:
+        # A decimal or price column as floats, NaN where the value was blank.
+        units = self.records[name]
+        return np.where(units == np.iinfo(units.dtype).min, np.nan, units / 10**self.scale)
+
+    def strings(self, name: str) -> npt.NDArray[np.object_]:
+        return np.asarray(self.symbols, dtype=object)[self.records[name]]
+
+    def where(self, name: str, value: str) -> npt.NDArray[np.bool_]:
+        # Mask of records whose string column equals value, without decoding.
+        index = self._symbol_ids.get(value)
+        if index is None:
+            return np.zeros(len(self.records), dtype=bool)
+        return self.records[name] == index
+
+
+def symbols_path(path: Path) -> Path:
+    return path.with_name(path.name + SYMBOLS_SUFFIX)
+
+
+def read_header(path: Path) -> tuple[dict[str, Any], int]:
+    with path.open("rb") as handle:
+        prefix = handle.read(len(MAGIC) + _LENGTH.size)
+        if prefix[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a tick log")
+        (length,) = _LENGTH.unpack(prefix[len(MAGIC) :])
+        header = json.loads(handle.read(length))
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path} has unsupported tick log version {header.get('version')}")
+    return header, len(prefix) + length
+
+
+def read_symbols(path: Path, repair: bool = False) -> list[str]:
+    # A line without its newline was cut off mid-write and is ignored (and
+    # with repair, removed).
+    if not path.exists():
+        return []
+    data = path.read_bytes()
+    complete = data[: data.rfind(b"\n") + 1]
+    if repair and len(complete) != len(data):
+        with path.open("r+b") as handle:
+            handle.truncate(len(complete))
+    return [json.loads(line) for line in complete.decode("utf-8").splitlines()]
+
+
+def _encode_header(columns: Sequence[Column], scale: int, dtype: np.dtype[Any]) -> bytes:
+    fields = dtype.fields or {}
+    names = list(dtype.names or ())
+    header = {
+        "version": VERSION,
+        "scale": scale,
+        "columns": [list(column) for column in columns],
+        "dtype": {
+            "names": names,
+            "formats": [fields[name][0].str for name in names],
+            "offsets": [fields[name][1] for name in names],
+            "itemsize": dtype.itemsize,
+        },
+    }
+    body = json.dumps(header, sort_keys=True).encode("utf-8")
+    prefix = len(MAGIC) + _LENGTH.size
+    body += b" " * (-(prefix + len(body)) % _HEADER_ALIGN)
+    return MAGIC + _LENGTH.pack(len(body)) + body
+
+
+def _int_or_null(value: Any) -> int:
+    return INT_NULL if value == "" or value is None else int(value)
+
+
+def _float_or_nan(value: Any) -> float:
+    return float("nan") if value == "" or value is None else float(value)
+
+
+def _bool_byte(value: Any) -> int:
+    return 1 if value is True or str(value).strip().lower() == "true" else 0
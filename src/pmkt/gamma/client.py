@@ -4,13 +4,24 @@ from typing import Any
 
 import httpx
 
+from pmkt.ratelimit import GAMMA, TokenBucket, get_limiter
+from pmkt.transport import shared_client, warmup
+
 DEFAULT_EVENTS_URL = "https://gamma-api.polymarket.com/events"
 
 
 class GammaClient:
-    def __init__(self, events_url: str = DEFAULT_EVENTS_URL, timeout_s: float = 10.0) -> None:
+    def __init__(
+        self,
+        events_url: str = DEFAULT_EVENTS_URL,
+        timeout_s: float = 10.0,
+        client: httpx.Client | None = None,
+        limiter: TokenBucket | None = None,
+    ) -> None:
         self._events_url = events_url
-        self._client = httpx.Client(timeout=timeout_s)
+        self._timeout = timeout_s
+        self._client = client or shared_client()
+        self._limiter = limiter or get_limiter(GAMMA)
 
     def fetch_events(
         self,
@@ -29,9 +40,14 @@ class GammaClient:
             params["order"] = order
         if ascending is not None:
             params["ascending"] = "true" if ascending else "false"
-        response = self._client.get(self._events_url, params=params or None)
+        self._limiter.acquire()
+        response = self._client.get(self._events_url, params=params or None, timeout=self._timeout)
         response.raise_for_status()
         return response.json()
 
+    def warmup(self, connections: int = 1) -> None:
+        warmup(self._client, [self._events_url], connections)
+
     def close(self) -> None:
-        self._client.close()
+        # The HTTP pool is either the process-wide shared one or owned by the caller.
+        pass
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+GAMMA = "gamma"
+CLOB = "clob"
+
+
+@dataclass(frozen=True, slots=True)
+class RateBudget:
+    rate_per_s: float
+    burst: float
+
+
+DEFAULT_BUDGETS: dict[str, RateBudget] = {
+    GAMMA: RateBudget(rate_per_s=10.0, burst=20.0),
+    CLOB: RateBudget(rate_per_s=50.0, burst=100.0),
+}
+
+
+class TokenBucket:
+    # Callers reserve tokens under a short lock and then sleep outside it, so the
+    # same bucket can be shared by threads and by coroutines on an event loop.
+    def __init__(
+        self,
+        rate_per_s: float,
+        burst: float,
+        name: str = "",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_time_s = 0.0
+        self.max_wait_s = 0.0
+        self.configure(rate_per_s, burst)
+
+    def configure(self, rate_per_s: float, burst: float) -> None:
+        with self._lock:
+            self.rate_per_s = rate_per_s
+            self.burst = max(1.0, burst)
+            self._tokens = self.burst
+            self._updated = self._clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            self.acquired += 1
+            if self.rate_per_s <= 0:
+                return 0.0
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+            self._tokens -= tokens
+            wait_s = -self._tokens / self.rate_per_s if self._tokens < 0 else 0.0
+            if wait_s > 0:
+                self.delayed += 1
+                self.wait_time_s += wait_s
+                self.max_wait_s = max(self.max_wait_s, wait_s)
+            return wait_s
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        wait_s = self.reserve(tokens)
+        if wait_s > 0:
+            time.sleep(wait_s)
+        return wait_s
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        wait_s = self.reserve(tokens)
+        if wait_s > 0:
+            await asyncio.sleep(wait_s)
+        return wait_s
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate_per_s": self.rate_per_s,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "delayed": self.delayed,
+                "wait_time_s": round(self.wait_time_s, 6),
+                "max_wait_s": round(self.max_wait_s, 6),
+            }
+
+
+_limiters_lock = threading.Lock()
+_limiters: dict[str, TokenBucket] = {}
+
+
+def get_limiter(name: str) -> TokenBucket:
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            budget = DEFAULT_BUDGETS.get(name, RateBudget(rate_per_s=0.0, burst=1.0))
+            limiter = TokenBucket(budget.rate_per_s, budget.burst, name=name)
+            _limiters[name] = limiter
+        return limiter
+
+
+def configure_budget(name: str, budget: RateBudget) -> None:
+    get_limiter(name).configure(budget.rate_per_s, budget.burst)
+
+
+def limiter_stats() -> list[dict[str, Any]]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.stats() for limiter in limiters]
+
+
+def log_limiter_stats(level: int = logging.INFO) -> None:
+    for stats in limiter_stats():
+        logger.log(
+            level,
+            "rate limiter %s acquired=%s delayed=%s wait_time_s=%.3f max_wait_s=%.3f",
+            stats["name"],
+            stats["acquired"],
+            stats["delayed"],
+            stats["wait_time_s"],
+            stats["max_wait_s"],
+        )
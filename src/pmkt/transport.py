@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_S = 10.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY_S = 30.0
+DEFAULT_WARMUP_CONNECTIONS = 1
+DEFAULT_STATS_INTERVAL_S = 60.0
+
+
+@dataclass(frozen=True, slots=True)
+class TransportConfig:
+    timeout_s: float = DEFAULT_TIMEOUT_S
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry_s: float = DEFAULT_KEEPALIVE_EXPIRY_S
+    http2: bool = True
+    warmup_connections: int = DEFAULT_WARMUP_CONNECTIONS
+    stats_interval_s: float = DEFAULT_STATS_INTERVAL_S
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_s,
+        )
+
+
+class ConnectionStats:
+    def __init__(self, log_interval_s: float = DEFAULT_STATS_INTERVAL_S) -> None:
+        self.log_interval_s = log_interval_s
+        self.requests = 0
+        self.tcp_connects = 0
+        self.tls_handshakes = 0
+        self.per_connection: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+        self._last_logged: tuple[int, int, int] = (0, 0, 0)
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.tcp_connects)
+
+    def on_trace(self, name: str, info: dict[str, Any]) -> None:
+        if name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.tcp_connects += 1
+        elif name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    async def on_trace_async(self, name: str, info: dict[str, Any]) -> None:
+        self.on_trace(name, info)
+
+    def on_response(self, response: httpx.Response) -> None:
+        key = _connection_key(response.extensions.get("network_stream"))
+        with self._lock:
+            self.requests += 1
+            self.per_connection[key] = self.per_connection.get(key, 0) + 1
+        if self.log_interval_s > 0 and time.monotonic() - self._last_log >= self.log_interval_s:
+            self.log()
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "tcp_connects": self.tcp_connects,
+                "tls_handshakes": self.tls_handshakes,
+                "reused": self.reused,
+                "per_connection": dict(self.per_connection),
+            }
+
+    def log(self, level: int = logging.INFO) -> None:
+        with self._lock:
+            current = (self.requests, self.tcp_connects, self.tls_handshakes)
+            previous, self._last_logged = self._last_logged, current
+            self._last_log = time.monotonic()
+            per_connection = dict(self.per_connection)
+        logger.log(
+            level,
+            "http connections requests=%s (+%s) tcp_connects=%s (+%s) "
+            "tls_handshakes=%s (+%s) reused=%s per_connection=%s",
+            current[0],
+            current[0] - previous[0],
+            current[1],
+            current[1] - previous[1],
+            current[2],
+            current[2] - previous[2],
+            max(0, current[0] - current[1]),
+            per_connection,
+        )
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def accepted_encodings() -> str:
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    if importlib.util.find_spec("zstandard"):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+def build_client(
+    config: TransportConfig | None = None, stats: ConnectionStats | None = None
+) -> httpx.Client:
+    config = config or TransportConfig()
+    stats = stats or ConnectionStats(config.stats_interval_s)
+
+    def _attach_trace(request: httpx.Request) -> None:
+        request.extensions["trace"] = stats.on_trace
+
+    return httpx.Client(
+        timeout=config.timeout_s,
+        limits=config.limits(),
+        http2=_use_http2(config),
+        headers={"Accept-Encoding": accepted_encodings()},
+        event_hooks={"request": [_attach_trace], "response": [stats.on_response]},
+    )
+
+
+def build_async_client(
+    config: TransportConfig | None = None, stats: ConnectionStats | None = None
+) -> httpx.AsyncClient:
+    config = config or TransportConfig()
+    stats = stats or ConnectionStats(config.stats_interval_s)
+
+    async def _attach_trace(request: httpx.Request) -> None:
+        request.extensions["trace"] = stats.on_trace_async
+
+    async def _count_response(response: httpx.Response) -> None:
+        stats.on_response(response)
+
+    return httpx.AsyncClient(
+        timeout=config.timeout_s,
+        limits=config.limits(),
+        http2=_use_http2(config),
+        headers={"Accept-Encoding": accepted_encodings()},
+        event_hooks={"request": [_attach_trace], "response": [_count_response]},
+    )
+
+
+def warmup(client: httpx.Client, urls: Iterable[str], connections: int = 1) -> None:
+    origins = _origins(urls)
+    if not origins or connections < 1:
+        return
+    targets = [origin for origin in origins for _ in range(connections)]
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        list(pool.map(lambda origin: _warm_origin(client, origin), targets))
+
+
+async def warmup_async(
+    client: httpx.AsyncClient, urls: Iterable[str], connections: int = 1
+) -> None:
+    origins = _origins(urls)
+    if not origins or connections < 1:
+        return
+
+    async def _warm(origin: str) -> None:
+        try:
+            await client.head(origin)
+        except httpx.HTTPError as exc:
+            logger.warning("Connection warmup to %s failed: %s", origin, exc)
+
+    await asyncio.gather(*(_warm(origin) for origin in origins for _ in range(connections)))
+
+
+_shared_lock = threading.Lock()
+_shared_config = TransportConfig()
+_shared_stats = ConnectionStats(_shared_config.stats_interval_s)
+_shared_client: httpx.Client | None = None
+
+
+def configure(config: TransportConfig) -> None:
+    global _shared_config, _shared_client
+    with _shared_lock:
+        _shared_config = config
+        _shared_stats.log_interval_s = config.stats_interval_s
+        if _shared_client is not None:
+            _shared_client.close()
+            _shared_client = None
+
+
+def shared_config() -> TransportConfig:
+    return _shared_config
+
+
+def shared_stats() -> ConnectionStats:
+    return _shared_stats
+
+
+def shared_client() -> httpx.Client:
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None or _shared_client.is_closed:
+            _shared_client = build_client(_shared_config, _shared_stats)
+        return _shared_client
+
+
+def shared_async_client() -> httpx.AsyncClient:
+    # Async clients are bound to the running event loop, so each caller gets its
+    # own pool; configuration and counters are still shared.
+    return build_async_client(_shared_config, _shared_stats)
+
+
+def close_shared() -> None:
+    global _shared_client
+    with _shared_lock:
+        client, _shared_client = _shared_client, None
+    if client is not None:
+        client.close()
+        _shared_stats.log()
+
+
+def _use_http2(config: TransportConfig) -> bool:
+    if config.http2 and not http2_available():
+        logger.debug("HTTP/2 requested but h2 is not installed; using HTTP/1.1")
+        return False
+    return config.http2
+
+
+def _connection_key(stream: Any) -> str:
+    if stream is None:
+        return "unknown"
+    try:
+        client_addr = stream.get_extra_info("client_addr")
+    except Exception:  # noqa: BLE001 - best-effort label
+        client_addr = None
+    if isinstance(client_addr, tuple) and len(client_addr) >= 2:
+        return f"{client_addr[0]}:{client_addr[1]}"
+    return f"stream-{id(stream):x}"
+
+
+def _origins(urls: Iterable[str]) -> list[str]:
+    origins: dict[str, None] = {}
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.scheme and parts.netloc:
+            origins[f"{parts.scheme}://{parts.netloc}/"] = None
+    return list(origins)
+
+
+def _warm_origin(client: httpx.Client, origin: str) -> None:
+    try:
+        client.head(origin)
+    except httpx.HTTPError as exc:
+        logger.warning("Connection warmup to %s failed: %s", origin, exc)
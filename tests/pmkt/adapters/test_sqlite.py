@@ -0,0 +1,33 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from pmkt.adapters.sqlite import connect_wal, execute_with_retry
+
+
+def test_locked_writes_are_rolled_back_and_retried(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    conn = connect_wal(tmp_path / "test.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    calls = {"count": 0}
+
+    def write() -> None:
+        calls["count"] += 1
+        conn.execute("BEGIN")
+        conn.execute("INSERT INTO t VALUES (?)", (calls["count"],))
+        if calls["count"] < 3:
+            raise sqlite3.OperationalError("database is locked")
+        conn.commit()
+
+    assert execute_with_retry("test", write, conn=conn) is True
+    assert [tuple(row) for row in conn.execute("SELECT x FROM t")] == [(3,)]
+
+    def locked() -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+    assert execute_with_retry("test", locked) is False
+    conn.close()
@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+import pytest
+
+from pmkt.cli import _build_parser
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--cost-sizes", "abc"],
+        ["--cost-sizes", "0"],
+        ["--cost-sizes", "-5"],
+        ["--cost-sizes", "NaN"],
+        ["--depth-ladder", "-1"],
+        ["--depth-ladder", "0"],
+        ["--depth-ladder", "1.5"],
+    ],
+)
+def test_ladder_options_reject_non_positive_values(
+    argv: list[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit):
+        _build_parser().parse_args(["paired-quotes", *argv])
+    assert f"argument {argv[0]}: {argv[1]!r}" in capsys.readouterr().err
+
+
+def test_ladder_options_accept_positive_values() -> None:
+    args = _build_parser().parse_args(
+        ["paired-quotes", "--cost-sizes", "10", "2.5", "--depth-ladder", "1", "10"]
+    )
+    assert args.cost_sizes == [Decimal("10"), Decimal("2.5")]
+    assert args.depth_ladder == [1, 10]
@@ -0,0 +1,70 @@
+import csv
+from pathlib import Path
+
+from pmkt.cli import _build_parser, _build_sink, _load_session, _session_config
+from pmkt.clob.rotation import read_manifest
+from pmkt.clob.session import SessionCheckpoint, save_checkpoint
+
+
+def _quote(ts_ms: int) -> dict[str, object]:
+    return {"ts_ms": ts_ms, "condition_id": "c", "mid_sum": "1.0"}
+
+
+def test_resume_keeps_rotation_without_the_rotate_flags(tmp_path: Path) -> None:
+    parser = _build_parser()
+    args = parser.parse_args(
+        [
+            "paired-quotes",
+            "--out",
+            str(tmp_path),
+            "--rotate-mb",
+            "64",
+            "--segment-compression",
+            "gzip",
+            "--no-background-writer",
+        ]
+    )
+    sink = _build_sink(args, tmp_path)
+    sink.write_quote(_quote(1000))
+    sink.end_sweep()
+    save_checkpoint(
+        tmp_path,
+        SessionCheckpoint(pairs=[], outputs=sink.checkpoint(), config=_session_config(args)),
+    )
+    # The run dies here, with its segment still open.
+
+    args = parser.parse_args(
+        ["paired-quotes", "--resume", "--out", str(tmp_path), "--no-background-writer"]
+    )
+    out_dir, checkpoint = _load_session(args)
+    assert (args.rotate_mb, args.segment_compression) == (64, "gzip")
+    resumed = _build_sink(args, out_dir)
+    resumed.restore(checkpoint.outputs)  # type: ignore[attr-defined]
+    resumed.write_quote(_quote(2000))
+    resumed.end_sweep()
+    resumed.close()
+
+    assert not (tmp_path / "paired_quotes.csv").exists()
+    entries = [entry for entry in read_manifest(tmp_path) if entry["stream"] == "paired_quotes"]
+    assert [(entry["rows"], entry["compression"]) for entry in entries] == [(2, "gzip")]
+    assert entries[0]["file"].endswith(".csv.gz")
+    assert not list(tmp_path.glob("paired_quotes.*.csv"))
+
+
+def test_resume_restores_ladder_columns(tmp_path: Path) -> None:
+    parser = _build_parser()
+    args = parser.parse_args(
+        ["paired-quotes", "--out", str(tmp_path), "--cost-sizes", "100", "--depth-ladder", "3"]
+    )
+    save_checkpoint(tmp_path, SessionCheckpoint(pairs=[], config=_session_config(args)))
+
+    args = parser.parse_args(["paired-quotes", "--resume", "--out", str(tmp_path)])
+    _load_session(args)
+    assert [str(size) for size in args.cost_sizes] == ["100"]
+    assert args.depth_ladder == [3]
+    sink = _build_sink(args, tmp_path)
+    sink.write_quote(_quote(1000))
+    sink.close()
+    with (tmp_path / "paired_quotes.csv").open(encoding="utf-8", newline="") as handle:
+        header = next(csv.reader(handle))
+    assert "buy_both_cost_100" in header and "depth_bid_3_up" in header
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from pmkt.clob.book_cache import BookCache, book_nbytes
+from pmkt.clob.decode import tick_book_from_payload
+from pmkt.clob.models import OrderBook, OrderLevel
+
+
+def _book(token_id: str, levels: int = 1) -> OrderBook:
+    return OrderBook(
+        token_id=token_id,
+        market="cond-1",
+        timestamp_ms=1000,
+        bids=[OrderLevel(price=Decimal("0.49"), size=Decimal("10"))] * levels,
+        asks=[OrderLevel(price=Decimal("0.51"), size=Decimal("10"))] * levels,
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_recently_used_book_is_evicted_and_reported() -> None:
+    evicted: list[str] = []
+    cache = BookCache(max_bytes=None, max_entries=2)
+    cache.evict_listeners.append(evicted.append)
+
+    cache.put("a", _book("a"))
+    cache.put("b", _book("b"))
+    assert cache.get("a") is not None
+    cache.put("c", _book("c"))
+
+    assert evicted == ["b"]
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_byte_cap_tracks_book_sizes() -> None:
+    small = _book("small")
+    large = _book("large", levels=50)
+    cache = BookCache(max_bytes=book_nbytes(large) + book_nbytes(small))
+
+    cache.put("small", small)
+    cache.put("large", large)
+    assert cache.nbytes == book_nbytes(small) + book_nbytes(large)
+    cache.put("large-2", _book("large-2", levels=50))
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["nbytes"], stats["evictions"]) == (1, book_nbytes(large), 2)
+    payload = {"bids": [{"price": "0.49", "size": "10"}] * 50, "asks": []}
+    assert book_nbytes(tick_book_from_payload("tick", payload)) < book_nbytes(large)
+
+
+def test_stale_books_are_not_returned_until_touched() -> None:
+    clock = _Clock()
+    cache = BookCache(clock=clock)
+    cache.put("a", _book("a"))
+
+    clock.now = 10.0
+    assert cache.age_s("a") == 10.0
+    assert cache.get("a", max_age_s=5.0) is None
+    assert cache.touch("a", 2000)
+    book = cache.get("a", max_age_s=5.0)
+
+    assert book is not None and book.timestamp_ms == 2000
+    assert cache.stats()["stale"] == 1
+    assert not cache.touch("missing", 2000)
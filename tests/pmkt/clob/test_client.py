@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import httpx
+from tests.pmkt.conftest import book_payload
+
+from pmkt.clob.client import AsyncClobClient, ClobClient
+from pmkt.clob.models import BookBatch
+
+if TYPE_CHECKING:
+    from tests.pmkt.conftest import FakeClobServer
+
+
+def test_async_client_bounds_in_flight_requests() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        token_id = request.url.params["token_id"]
+        return httpx.Response(200, content=json.dumps(book_payload(token_id)))
+
+    async def run() -> list[str]:
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client = AsyncClobClient(
+            book_url="https://clob.test/book", max_concurrency=3, client=http_client
+        )
+        try:
+            books = await asyncio.gather(
+                *(client.get_order_book(f"token-{idx}") for idx in range(12))
+            )
+        finally:
+            await http_client.aclose()
+        return [book.token_id for book in books]
+
+    token_ids = asyncio.run(run())
+
+    assert token_ids == [f"token-{idx}" for idx in range(12)]
+    assert peak == 3
+
+
+def _client(server: FakeClobServer, **kwargs: object) -> ClobClient:
+    return ClobClient(
+        book_url=f"{server.base_url}/book",
+        books_url=f"{server.base_url}/books",
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def test_get_order_books_chunks_batch_requests(clob_server: FakeClobServer) -> None:
+    client = _client(clob_server, batch_size=4)
+    token_ids = [f"token-{idx}" for idx in range(10)]
+    try:
+        batch = client.get_order_books(token_ids)
+    finally:
+        client.close()
+
+    assert sorted(batch.books) == sorted(token_ids)
+    assert batch.books["token-3"].best_bid() == (Decimal("0.49"), Decimal("687"))
+    assert batch.requests == 3
+    assert clob_server.requests == {"/books": 3}
+
+
+def test_get_order_books_falls_back_to_single_book(clob_server: FakeClobServer) -> None:
+    clob_server.books_enabled = False
+    clob_server.failing_tokens = {"token-bad"}
+    client = _client(clob_server)
+    try:
+        first = client.get_order_books(["token-1", "token-bad"])
+        second = client.get_order_books(["token-1"])
+    finally:
+        client.close()
+
+    assert list(first.books) == ["token-1"]
+    assert isinstance(first.errors["token-bad"], httpx.HTTPStatusError)
+    assert list(second.books) == ["token-1"]
+    assert clob_server.requests == {"/books": 1, "/book": 3}
+
+
+def test_async_get_order_books_fills_tokens_missing_from_batch(
+    clob_server: FakeClobServer,
+) -> None:
+    clob_server.failing_tokens = {"token-bad"}
+
+    async def run() -> BookBatch:
+        client = AsyncClobClient(
+            book_url=f"{clob_server.base_url}/book",
+            books_url=f"{clob_server.base_url}/books",
+            batch_size=2,
+        )
+        try:
+            return await client.get_order_books(["token-1", "token-2", "token-bad"])
+        finally:
+            await client.aclose()
+
+    batch = asyncio.run(run())
+
+    assert sorted(batch.books) == ["token-1", "token-2"]
+    assert set(batch.errors) == {"token-bad"}
+    assert clob_server.requests == {"/books": 2, "/book": 1}
+
+
+def test_get_order_books_skips_parsing_known_hashes(clob_server: FakeClobServer) -> None:
+    client = _client(clob_server)
+    try:
+        batch = client.get_order_books(
+            ["token-1", "token-2"], known_hashes={"token-1": "hash-token-1", "token-2": "stale"}
+        )
+    finally:
+        client.close()
+
+    assert list(batch.books) == ["token-2"]
+    assert batch.unchanged == {"token-1": 1000}
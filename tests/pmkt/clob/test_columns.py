@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from pmkt.clob.client import _order_book_from_payload
+from pmkt.clob.columns import ColumnarBook
+from pmkt.clob.decode import tick_book_from_payload
+from pmkt.clob.models import sum_sizes
+
+PAYLOAD = {
+    "market": "cond-1",
+    "timestamp": "1000",
+    "hash": "abc",
+    "bids": [
+        {"price": "0.45", "size": "30"},
+        {"price": "0.49", "size": "10"},
+        {"price": "0.47", "size": "20"},
+        {"price": "0.01", "size": "1000"},
+    ],
+    "asks": [
+        {"price": "0.99", "size": "1000"},
+        {"price": "0.51", "size": "10"},
+        {"price": "0.53", "size": "0"},
+        {"price": "0.52", "size": "5"},
+    ],
+    "tick_size": "0.01",
+}
+
+
+@pytest.fixture(params=["order_book", "tick_book", "payload"])
+def book(request: pytest.FixtureRequest) -> ColumnarBook:
+    if request.param == "order_book":
+        return ColumnarBook.from_order_book(_order_book_from_payload("token-1", PAYLOAD))
+    if request.param == "tick_book":
+        return ColumnarBook.from_tick_book(tick_book_from_payload("token-1", PAYLOAD))
+    return ColumnarBook.from_payload("token-1", PAYLOAD)
+
+
+def test_columns_match_order_book(book: ColumnarBook) -> None:
+    reference = _order_book_from_payload("token-1", PAYLOAD)
+
+    assert book.best_bid() == (0.49, 10.0)
+    assert book.best_ask() == (0.51, 10.0)
+    assert book.hash == "abc"
+    for levels in (1, 3, 10):
+        bids = reference.top_bids(levels)
+        asks = reference.top_asks(levels)
+        assert book.depth("bid", levels) == pytest.approx(float(sum_sizes(bids)))
+        assert book.depth("ask", levels) == pytest.approx(float(sum_sizes(asks)))
+    assert book.cumulative_depth("bid").tolist() == [10, 30, 60, 1060]
+
+
+def test_vwap_walks_the_ladder(book: ColumnarBook) -> None:
+    result = book.vwap("ask", [5, 12, 15, 2000, 0])
+
+    assert result[0] == pytest.approx(0.51)
+    assert result[1] == pytest.approx((10 * 0.51 + 2 * 0.52) / 12)
+    assert result[2] == pytest.approx((10 * 0.51 + 5 * 0.52) / 15)
+    assert math.isnan(result[3])
+    assert math.isnan(result[4])
+
+
+def test_depth_within_ticks_of_mid(book: ColumnarBook) -> None:
+    assert book.mid() == pytest.approx(0.5)
+    assert book.depth_within_ticks(1) == (10.0, 10.0)
+    assert book.depth_within_ticks(3) == (30.0, 15.0)
+
+
+def test_empty_side_has_no_fill() -> None:
+    book = ColumnarBook.from_payload("token-1", {"bids": [], "asks": None})
+
+    assert book.best_bid() is None
+    assert book.mid() is None
+    assert np.isnan(book.vwap("bid", [1.0])).all()
+    assert book.depth_within_ticks(5) == (0.0, 0.0)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pmkt.clob import decode
+from pmkt.clob.client import ClobClient, _order_book_from_payload
+
+if TYPE_CHECKING:
+    from tests.pmkt.conftest import FakeClobServer
+
+PAYLOADS: list[dict[str, Any]] = [
+    {
+        "market": "cond-1",
+        "asset_id": "token-1",
+        "timestamp": "1700000000123",
+        "hash": "abc",
+        "bids": [{"price": "0.01", "size": "1000"}, {"price": "0.490", "size": "687.25"}],
+        "asks": [{"price": "0.99", "size": "1000"}, {"price": "0.51", "size": "0"}],
+        "tick_size": "0.001",
+        "min_order_size": "5",
+    },
+    {
+        "conditionId": "cond-2",
+        "timestampMs": 5,
+        "bids": [{"price": 0.48, "size": 100}, {"price": "0.3"}, "junk"],
+        "asks": [{"price": 0.52, "size": 12.5}],
+        "tickSize": 0.01,
+        "minOrderSize": 1,
+    },
+    {"bids": None, "asks": {}, "hash": ""},
+]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+@pytest.mark.parametrize("backend", ["default", "stdlib"])
+def test_fast_decoder_matches_reference_parser(
+    payload: dict[str, Any], backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if backend == "stdlib":
+        monkeypatch.setattr(decode, "orjson", None)
+    raw = json.dumps(payload).encode()
+
+    expected = _order_book_from_payload("token-1", json.loads(raw))
+    first = decode.decode_book("token-1", raw)
+    cached = decode.decode_book("token-1", raw)
+
+    assert first == expected
+    assert cached == expected
+    assert [str(level.price) for level in first.bids] == [
+        str(level.price) for level in expected.bids
+    ]
+
+
+def test_client_fast_decode_round_trip(clob_server: FakeClobServer) -> None:
+    token_ids = [f"token-{idx}" for idx in range(5)]
+    book_url = f"{clob_server.base_url}/book"
+    books_url = f"{clob_server.base_url}/books"
+    reference = ClobClient(book_url=book_url, books_url=books_url)
+    fast = ClobClient(book_url=book_url, books_url=books_url, fast_decode=True)
+
+    assert fast.get_order_books(token_ids).books == reference.get_order_books(token_ids).books
+    assert fast.get_order_book("token-1") == reference.get_order_book("token-1")
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_tick_book_round_trips_to_reference_book(payload: dict[str, Any]) -> None:
+    expected = _order_book_from_payload("token-1", payload)
+    tick_book = decode.tick_book_from_payload("token-1", payload)
+
+    assert tick_book.best_bid() == expected.best_bid()
+    assert tick_book.best_ask() == expected.best_ask()
+    round_trip = tick_book.to_order_book()
+    assert round_trip == expected.top_n(len(expected.bids) + len(expected.asks))
+    assert [str(level.price) for level in round_trip.bids] == [
+        str(level.price) for level in expected.top_n(len(expected.bids)).bids
+    ]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from pmkt.clob.l2 import L2BookEngine, replay
+from pmkt.clob.paired import make_paired_snapshot
+
+REPLAY_PATH = Path(__file__).resolve().parents[3] / "data" / "fixtures" / "l2_replay.jsonl"
+
+# What /book returns when the engine re-snapshots during the replay.
+SERVER_BOOKS: dict[str, dict[str, Any]] = {
+    "token-up": {
+        "market": "cond-1",
+        "timestamp": "1035",
+        "hash": "up-1035",
+        "seq": 15,
+        "bids": [{"price": "0.49", "size": "12"}, {"price": "0.48", "size": "20"}],
+        "asks": [{"price": "0.51", "size": "9"}, {"price": "0.53", "size": "15"}],
+    },
+    "token-down": {
+        "market": "cond-1",
+        "timestamp": "1055",
+        "hash": "down-1055",
+        "bids": [{"price": "0.48", "size": "8"}],
+        "asks": [{"price": "0.50", "size": "6"}],
+    },
+}
+
+
+def _load_events() -> list[dict[str, Any]]:
+    with REPLAY_PATH.open(encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _levels(levels: Any) -> list[tuple[str, str]]:
+    return [(str(level.price), str(level.size)) for level in levels]
+
+
+def test_replay_applies_deltas_and_resnapshots_on_gaps() -> None:
+    fetched: list[str] = []
+
+    def fetch(token_id: str) -> dict[str, Any]:
+        fetched.append(token_id)
+        return SERVER_BOOKS[token_id]
+
+    engine = L2BookEngine(fetch)
+    books = list(replay(engine, _load_events()))
+
+    # seq 12 -> 15 on token-up and a crossed token-down book both re-snapshot.
+    assert fetched == ["token-up", "token-down"]
+    assert (engine.applied, engine.stale, engine.gaps, engine.resyncs) == (6, 1, 2, 2)
+    assert len(books) == 10
+
+    up = engine.books["token-up"]
+    assert up.seq == 15
+    assert up.hash == "up-1035"
+    assert _levels(up.bids) == [("0.49", "12"), ("0.48", "20")]
+
+    down = engine.books["token-down"]
+    assert down.timestamp_ms == 1055
+    assert _levels(down.asks) == [("0.50", "6")]
+
+    snapshot = make_paired_snapshot(up, down, outcome_a="Up", outcome_b="Down")
+    assert snapshot.buy_both_cost == Decimal("1.01")
+    assert snapshot.leg_skew_ms == 20
+
+
+def test_deltas_without_gaps_keep_the_book_sorted() -> None:
+    engine = L2BookEngine(lambda token_id: SERVER_BOOKS[token_id])
+    events = _load_events()[:5]
+    list(replay(engine, events))
+
+    up = engine.books["token-up"]
+    assert engine.gaps == 0
+    assert up.seq == 12
+    assert _levels(up.bids) == [("0.49", "12"), ("0.48", "20"), ("0.47", "30"), ("0.01", "1000")]
+    assert _levels(up.asks) == [("0.53", "15"), ("0.99", "1000")]
+    assert up.best_bid() == (Decimal("0.49"), Decimal("12"))
+    assert _levels(up.top_asks(1)) == [("0.53", "15")]
+    assert _levels(engine.books["token-down"].bids) == [("0.48", "8"), ("0.47", "40")]
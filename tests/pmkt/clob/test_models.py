@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from pmkt.clob.models import OrderBook, OrderLevel
+from pmkt.clob.models import OrderBook, OrderLevel, SortedOrderBook, sum_sizes
 
 
 def test_best_bid_ask_selects_extrema() -> None:
@@ -31,3 +31,37 @@ def test_best_bid_ask_selects_extrema() -> None:
     assert best_ask is not None
     assert best_bid[0] == Decimal("0.49")
     assert best_ask[0] == Decimal("0.51")
+
+
+def test_sorted_order_book_matches_scanning_book() -> None:
+    bids = [
+        OrderLevel(price=Decimal("0.01"), size=Decimal("1000")),
+        OrderLevel(price=Decimal("0.30"), size=Decimal("50")),
+        OrderLevel(price=Decimal("0.49"), size=Decimal("687")),
+    ]
+    asks = [
+        OrderLevel(price=Decimal("0.99"), size=Decimal("1000")),
+        OrderLevel(price=Decimal("0.70"), size=Decimal("10")),
+        OrderLevel(price=Decimal("0.51"), size=Decimal("687")),
+    ]
+    fields = dict(
+        token_id="token-up",
+        market="cond-1",
+        timestamp_ms=1,
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+    book = OrderBook(bids=list(bids), asks=list(asks), **fields)
+    sorted_book = SortedOrderBook(bids=list(bids), asks=list(asks), **fields)
+
+    assert sorted_book.best_bid() == book.best_bid()
+    assert sorted_book.best_ask() == book.best_ask()
+    for n in (0, 2, 5):
+        assert list(sorted_book.top_bids(n)) == book.top_bids(n)
+        assert list(sorted_book.top_asks(n)) == book.top_asks(n)
+        assert sorted_book.top_n(n) == book.top_n(n)
+    view = sorted_book.top_asks(2)
+    assert len(view) == 2
+    assert view[-1] is sorted_book.asks[1]
+    assert sum_sizes(view) == Decimal("697")
@@ -1,7 +1,10 @@
+from dataclasses import astuple
 from decimal import Decimal
 
+from pmkt.clob.client import _order_book_from_payload
+from pmkt.clob.decode import tick_book_from_payload
 from pmkt.clob.models import OrderBook, OrderLevel
-from pmkt.clob.paired import make_paired_snapshot
+from pmkt.clob.paired import DECIMAL_FIELDS, make_compact_snapshot, make_paired_snapshot
 
 
 def _book(token_id: str, bids: list[OrderLevel], asks: list[OrderLevel]) -> OrderBook:
@@ -43,3 +46,117 @@ def test_make_paired_snapshot_metrics() -> None:
     assert snapshot.spread_sum == Decimal("0.04")
     assert snapshot.buy_both_cost == Decimal("1.02")
     assert snapshot.sell_both_proceeds == Decimal("0.98")
+
+
+def test_tick_book_snapshot_matches_decimal_snapshot() -> None:
+    payload_a = {
+        "market": "cond-1",
+        "timestamp": "1000",
+        "bids": [
+            {"price": "0.01", "size": "1000"},
+            {"price": "0.490", "size": "687.25"},
+            {"price": "0.3", "size": "5"},
+        ],
+        "asks": [{"price": "0.99", "size": "12.5"}, {"price": "0.515", "size": "0"}],
+    }
+    payload_b = {
+        "market": "cond-1",
+        "timestamp": "1040",
+        "bids": [{"price": 0.47, "size": 100}],
+        "asks": [{"price": "0.52", "size": "3.125"}, {"price": "0.53", "size": "2"}],
+    }
+
+    for depth_levels in (1, 2, 5):
+        expected = make_paired_snapshot(
+            _order_book_from_payload("token-up", payload_a),
+            _order_book_from_payload("token-down", payload_b),
+            outcome_a="Up",
+            outcome_b="Down",
+            depth_levels=depth_levels,
+        )
+        actual = make_paired_snapshot(
+            tick_book_from_payload("token-up", payload_a),
+            tick_book_from_payload("token-down", payload_b),
+            outcome_a="Up",
+            outcome_b="Down",
+            depth_levels=depth_levels,
+        )
+        assert [str(value) for value in astuple(actual)] == [
+            str(value) for value in astuple(expected)
+        ]
+
+
+def test_depth_ladder_and_size_costs_walk_the_book() -> None:
+    payload_a = {
+        "market": "cond-1",
+        "timestamp": "1000",
+        "bids": [{"price": "0.48", "size": "10"}, {"price": "0.490", "size": "5.5"}],
+        "asks": [{"price": "0.52", "size": "10"}, {"price": "0.51", "size": "5"}],
+    }
+    payload_b = {
+        "market": "cond-1",
+        "timestamp": "1000",
+        "bids": [{"price": "0.45", "size": "100"}],
+        "asks": [{"price": "0.47", "size": "2.25"}, {"price": "0.5", "size": "100"}],
+    }
+    quantities = [Decimal("20"), Decimal("5"), Decimal("12.5")]
+
+    snapshots = [
+        make_paired_snapshot(
+            decode("token-up", payload_a),
+            decode("token-down", payload_b),
+            outcome_a="Up",
+            outcome_b="Down",
+            depth_ladder=[1, 2],
+            quantities=quantities,
+        )
+        for decode in (_order_book_from_payload, tick_book_from_payload)
+    ]
+
+    for snapshot in snapshots:
+        assert [rung.levels for rung in snapshot.depth_ladder] == [1, 2]
+        assert snapshot.depth_ladder[0].ask_up == Decimal("5")
+        assert snapshot.depth_ladder[1].bid_up == Decimal("15.5")
+        costs = {cost.quantity: cost for cost in snapshot.size_costs}
+        # 5 @ 0.51 + 2.25 @ 0.47 + 2.75 @ 0.5
+        assert costs[Decimal("5")].buy_both_cost == Decimal("2.55") + Decimal("2.4325")
+        # 5 @ 0.51 + 7.5 @ 0.52, and 2.25 @ 0.47 + 10.25 @ 0.5
+        assert costs[Decimal("12.5")].buy_both_cost == Decimal("6.45") + Decimal("6.1825")
+        # 5.5 @ 0.49 + 7 @ 0.48, and 12.5 @ 0.45
+        assert costs[Decimal("12.5")].sell_both_proceeds == Decimal("6.055") + Decimal("5.625")
+        # Leg A only has 15 shares offered.
+        assert costs[Decimal("20")].buy_both_cost is None
+    assert [str(value) for value in astuple(snapshots[0])[:-2]] == [
+        str(value) for value in astuple(snapshots[1])[:-2]
+    ]
+
+
+def test_compact_snapshot_reads_and_formats_like_the_full_snapshot() -> None:
+    payload_a = {
+        "market": "cond-1",
+        "timestamp": "1000",
+        "bids": [{"price": "0.490", "size": "687.25"}, {"price": "0.3", "size": "5"}],
+        "asks": [{"price": "0.515", "size": "1E+2"}],
+    }
+    payload_b = {
+        "market": "cond-1",
+        "timestamp": "1040",
+        "bids": [{"price": 0.47, "size": 100}],
+        "asks": [{"price": "0.52", "size": "3.125"}, {"price": "0.53", "size": "2"}],
+    }
+    for decode in (_order_book_from_payload, tick_book_from_payload):
+        book_a = decode("token-up", payload_a)
+        book_b = decode("token-down", payload_b)
+        full = make_paired_snapshot(
+            book_a, book_b, outcome_a="Up", outcome_b="Down", fetch_latency_ms=1.5
+        )
+        compact = make_compact_snapshot(
+            book_a, book_b, outcome_a="Up", outcome_b="Down", fetch_latency_ms=1.5
+        )
+
+        assert list(compact.texts()) == [str(getattr(full, name)) for name in DECIMAL_FIELDS]
+        for name in DECIMAL_FIELDS:
+            assert str(getattr(compact, name)) == str(getattr(full, name))
+        assert [str(value) for value in astuple(compact.to_snapshot())] == [
+            str(value) for value in astuple(full)
+        ]
@@ -0,0 +1,104 @@
+from dataclasses import astuple
+from decimal import Decimal
+
+import pytest
+
+from pmkt.clob.client import _order_book_from_payload
+from pmkt.clob.decode import tick_book_from_payload
+from pmkt.clob.paired import make_paired_snapshot
+from pmkt.clob.paired_batch import make_paired_snapshots
+from pmkt.clob.scheduler import threshold_distance
+
+_PAYLOADS = [
+    {
+        "timestamp": "1000",
+        "bids": [{"price": "0.490", "size": "687.25"}, {"price": "0.3", "size": "5"}],
+        "asks": [{"price": "0.515", "size": "3"}, {"price": "0.99", "size": "12.5"}],
+    },
+    {
+        "timestamp": "1040",
+        "bids": [{"price": 0.47, "size": 100}],
+        "asks": [{"price": "0.52", "size": "3.125"}, {"price": "0.53", "size": "2"}],
+    },
+    {
+        "timestamp": "990",
+        "bids": [{"price": "0.55", "size": "10"}],
+        "asks": [{"price": "0.57", "size": "1"}],
+    },
+    {"timestamp": "995", "bids": [], "asks": [{"price": "0.45", "size": "1"}]},
+]
+
+
+@pytest.mark.parametrize("decode", [_order_book_from_payload, tick_book_from_payload])
+def test_batch_rows_match_per_pair_snapshots(decode) -> None:  # type: ignore[no-untyped-def]
+    books = [decode(f"token-{index}", payload) for index, payload in enumerate(_PAYLOADS)]
+    for book in books:
+        book.market = "cond-1"
+    legs = [(0, 1), (2, 0), (1, 3), (2, 1)]
+
+    batch = make_paired_snapshots(
+        [books[a] for a, _ in legs],
+        [books[b] for _, b in legs],
+        outcomes_a=["Yes"] * len(legs),
+        outcomes_b=["No"] * len(legs),
+        depth_levels=2,
+        fetch_latency_ms=[12.5, None, 3.0, 4.0],
+    )
+
+    assert batch.source == [0, 1, 3]
+    assert str(batch.errors[2]) == "Missing book B best bid/ask"
+    for row, index in enumerate(batch.source):
+        a, b = legs[index]
+        expected = make_paired_snapshot(
+            books[a],
+            books[b],
+            outcome_a="Yes",
+            outcome_b="No",
+            depth_levels=2,
+            fetch_latency_ms=[12.5, None, 3.0, 4.0][index],
+        )
+        assert [str(value) for value in astuple(batch.snapshot(row))] == [
+            str(value) for value in astuple(expected)
+        ]
+
+
+def test_fixed_column_comparisons_are_exact() -> None:
+    book_a = _order_book_from_payload(
+        "a", {"bids": [{"price": "0.49", "size": "1"}], "asks": [{"price": "0.505", "size": "1"}]}
+    )
+    book_b = _order_book_from_payload(
+        "b", {"bids": [{"price": "0.47", "size": "1"}], "asks": [{"price": "0.495", "size": "1"}]}
+    )
+
+    batch = make_paired_snapshots([book_a], [book_b], outcomes_a=["Yes"], outcomes_b=["No"])
+
+    # mid_sum = 0.4975 + 0.4825 = 0.9800, exactly on the 0.02 drift threshold.
+    assert batch.decimal("mid_sum", 0) == Decimal("0.9800")
+    assert batch.columns["mid_sum"].distance_ge(Decimal("1.00"), Decimal("0.02")).tolist() == [True]
+    assert batch.columns["mid_sum"].distance_ge(Decimal("1"), Decimal("0.0201")).tolist() == [False]
+    assert batch.columns["buy_both_cost"].le(Decimal("1.00")).tolist() == [True]
+    assert batch.columns["sell_both_proceeds"].ge(Decimal("0.96")).tolist() == [True]
+    assert batch.columns["sell_both_proceeds"].ge(Decimal("0.9601")).tolist() == [False]
+
+
+def test_threshold_distances_match_the_built_rows() -> None:
+    quotes = [("0.49", "0.505"), ("0.47", "0.495"), ("0.55", "0.6"), ("0.3", "0.6")]
+    books = [
+        _order_book_from_payload(
+            f"token-{index}",
+            {"bids": [{"price": bid, "size": "1"}], "asks": [{"price": ask, "size": "1"}]},
+        )
+        for index, (bid, ask) in enumerate(quotes)
+    ]
+    legs = [(0, 1), (2, 3), (2, 0), (3, 3)]
+
+    batch = make_paired_snapshots(
+        [books[a] for a, _ in legs],
+        [books[b] for _, b in legs],
+        outcomes_a=["Yes"] * len(legs),
+        outcomes_b=["No"] * len(legs),
+    )
+
+    distances = [batch.threshold_distance(row) for row in range(len(batch))]
+    assert distances == [threshold_distance(batch.snapshot(row)) for row in range(len(batch))]
+    assert distances == [Decimal("0"), Decimal("0.15"), Decimal("0"), Decimal("0.2")]
@@ -1,10 +1,34 @@
+from __future__ import annotations
+
+import asyncio
 import csv
 import json
+import logging
+import threading
+from collections import Counter
 from decimal import Decimal
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
 
-from pmkt.clob.models import OrderBook, OrderLevel
-from pmkt.clob.paired_recorder import TradablePair, build_market_index, record_paired_quotes
+from pmkt.clob import paired_recorder
+from pmkt.clob.book_cache import BookCache
+from pmkt.clob.client import ClobClient
+from pmkt.clob.models import BookBatch, OrderBook, OrderLevel
+from pmkt.clob.paired_batch import PairedSnapshotBatch
+from pmkt.clob.paired_recorder import (
+    TradablePair,
+    build_market_index,
+    record_paired_quotes,
+    record_paired_quotes_async,
+)
+from pmkt.clob.resilience import CircuitBreaker
+from pmkt.clob.scheduler import AdaptivePollScheduler
+from pmkt.clob.sinks import CsvSink, ThreadedSink
+
+if TYPE_CHECKING:
+    from tests.pmkt.conftest import FakeClobServer
 
 
 class _FakeClient:
@@ -23,6 +47,11 @@ class _FakeClient:
             hash=self._book.hash,
         )
 
+    def get_order_books(
+        self, token_ids: list[str], known_hashes: dict[str, str] | None = None
+    ) -> BookBatch:
+        return BookBatch(books={token_id: self.get_order_book(token_id) for token_id in token_ids})
+
     def close(self) -> None:
         pass
 
@@ -142,3 +171,591 @@ def test_signals_include_market_metadata(tmp_path: Path) -> None:
     assert row["liquidity"] == "123.45"
     assert row["accepting_orders"] == "true"
     assert row["enable_order_book"] == "true"
+
+
+class _FakeAsyncClient:
+    def __init__(self, book: OrderBook) -> None:
+        self._sync = _FakeClient(book)
+        self.calls = 0
+
+    async def get_order_book(self, token_id: str) -> OrderBook:
+        self.calls += 1
+        return self._sync.get_order_book(token_id)
+
+    async def get_order_books(
+        self, token_ids: list[str], known_hashes: dict[str, str] | None = None
+    ) -> BookBatch:
+        return BookBatch(
+            books={token_id: await self.get_order_book(token_id) for token_id in token_ids}
+        )
+
+    async def aclose(self) -> None:
+        pass
+
+
+def test_record_paired_quotes_async_writes_csv(tmp_path: Path) -> None:
+    book = OrderBook(
+        token_id="token-up",
+        market="cond-1",
+        timestamp_ms=1000,
+        bids=[OrderLevel(price=Decimal("0.49"), size=Decimal("687"))],
+        asks=[OrderLevel(price=Decimal("0.51"), size=Decimal("687"))],
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{idx}",
+            token_a_id=f"token-up-{idx}",
+            token_b_id=f"token-down-{idx}",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for idx in range(3)
+    ]
+    client = _FakeAsyncClient(book)
+    out_dir = tmp_path / "quotes"
+    asyncio.run(
+        record_paired_quotes_async(
+            pairs,
+            out_dir=out_dir,
+            interval_seconds=0,
+            max_iters=2,
+            client=client,
+        )
+    )
+
+    with (out_dir / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [row["condition_id"] for row in rows] == ["cond-0", "cond-1", "cond-2"] * 2
+    assert client.calls == 12
+
+
+def test_record_paired_quotes_batches_round_trips(
+    tmp_path: Path, clob_server: FakeClobServer
+) -> None:
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{idx}",
+            token_a_id=f"token-up-{idx}",
+            token_b_id=f"token-down-{idx}",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for idx in range(25)
+    ]
+    client = ClobClient(
+        book_url=f"{clob_server.base_url}/book",
+        books_url=f"{clob_server.base_url}/books",
+        batch_size=20,
+    )
+    out_dir = tmp_path / "quotes"
+    try:
+        record_paired_quotes(pairs, out_dir=out_dir, interval_seconds=0, max_iters=2, client=client)
+    finally:
+        client.close()
+
+    with (out_dir / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    # The stand-in server returns the same hashes, so the second sweep writes nothing.
+    assert len(rows) == 25
+    assert clob_server.requests == {"/books": 6}
+
+
+class _SequencedHashClient(_FakeClient):
+    def __init__(self, book: OrderBook, hashes: list[str]) -> None:
+        super().__init__(book)
+        self._hashes = hashes
+        self.sweeps = 0
+
+    def get_order_books(
+        self, token_ids: list[str], known_hashes: dict[str, str] | None = None
+    ) -> BookBatch:
+        book_hash = self._hashes[min(self.sweeps, len(self._hashes) - 1)]
+        self.sweeps += 1
+        batch = BookBatch()
+        for token_id in token_ids:
+            if known_hashes and known_hashes.get(token_id) == book_hash:
+                batch.unchanged[token_id] = 1000 + self.sweeps
+                continue
+            book = self.get_order_book(token_id)
+            book.hash = book_hash
+            book.timestamp_ms = 1000 + self.sweeps
+            batch.books[token_id] = book
+        return batch
+
+
+def test_unchanged_books_are_skipped_with_heartbeats(tmp_path: Path) -> None:
+    book = OrderBook(
+        token_id="token-up",
+        market="cond-1",
+        timestamp_ms=1000,
+        bids=[OrderLevel(price=Decimal("0.40"), size=Decimal("10"))],
+        asks=[OrderLevel(price=Decimal("0.60"), size=Decimal("10"))],
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+    pairs = [
+        TradablePair(
+            condition_id="cond-1",
+            token_a_id="token-up",
+            token_b_id="token-down",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+    ]
+    out_dir = tmp_path / "quotes"
+    record_paired_quotes(
+        pairs,
+        out_dir=out_dir,
+        interval_seconds=0,
+        max_iters=4,
+        client=_SequencedHashClient(book, ["h1", "h1", "h1", "h2"]),
+        heartbeat_interval_seconds=None,
+    )
+    with (out_dir / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    with (out_dir / "signals.csv").open(encoding="utf-8") as handle:
+        signals = list(csv.DictReader(handle))
+    assert [(row["ts_ms"], row["row_kind"]) for row in rows] == [
+        ("1001", "quote"),
+        ("1004", "quote"),
+    ]
+    assert len(signals) == 2
+
+    heartbeat_dir = tmp_path / "heartbeat"
+    record_paired_quotes(
+        pairs,
+        out_dir=heartbeat_dir,
+        interval_seconds=0,
+        max_iters=2,
+        client=_SequencedHashClient(book, ["h1"]),
+        heartbeat_interval_seconds=1e-9,
+    )
+    with (heartbeat_dir / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    with (heartbeat_dir / "signals.csv").open(encoding="utf-8") as handle:
+        signals = list(csv.DictReader(handle))
+    assert [(row["ts_ms"], row["row_kind"]) for row in rows] == [
+        ("1001", "quote"),
+        ("1002", "heartbeat"),
+    ]
+    assert rows[0]["mid_sum"] == rows[1]["mid_sum"]
+    assert len(signals) == 1
+
+
+def test_recorder_fills_shared_book_cache_and_forgets_evicted_hashes(tmp_path: Path) -> None:
+    client = _FakeClient(
+        OrderBook(
+            token_id="token-up",
+            market="cond-1",
+            timestamp_ms=1000,
+            bids=[OrderLevel(price=Decimal("0.40"), size=Decimal("10"))],
+            asks=[OrderLevel(price=Decimal("0.60"), size=Decimal("10"))],
+            tick_size=Decimal("0.01"),
+            min_order_size=Decimal("1"),
+            hash="h1",
+        )
+    )
+    pair = TradablePair(
+        condition_id="cond-1",
+        token_a_id="token-up",
+        token_b_id="token-down",
+        outcome_a="Up",
+        outcome_b="Down",
+    )
+    cache = BookCache(max_entries=2)
+    recorder = paired_recorder._SweepRecorder(
+        tmp_path,
+        market_index={},
+        mid_sum_threshold=Decimal("0.02"),
+        spread_sum_threshold=Decimal("0.06"),
+        heartbeat_interval_seconds=None,
+        book_cache=cache,
+    )
+
+    recorder.record_sweep([pair], client.get_order_books(["token-up", "token-down"]))
+    book = cache.get("token-up")
+    cache.put("token-other", client.get_order_book("token-other"))
+
+    assert book is not None and book.token_id == "token-up"
+    assert "token-down" not in cache
+    assert recorder.book_hashes == {"token-up": "h1"}
+
+
+def test_cache_and_writer_stats_are_logged_while_recording(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    client = _FakeClient(
+        OrderBook(
+            token_id="token-up",
+            market="cond-1",
+            timestamp_ms=1000,
+            bids=[OrderLevel(price=Decimal("0.40"), size=Decimal("10"))],
+            asks=[OrderLevel(price=Decimal("0.60"), size=Decimal("10"))],
+            tick_size=Decimal("0.01"),
+            min_order_size=Decimal("1"),
+            hash=None,
+        )
+    )
+    pair = TradablePair(
+        condition_id="cond-1",
+        token_a_id="token-up",
+        token_b_id="token-down",
+        outcome_a="Up",
+        outcome_b="Down",
+    )
+    recorder = paired_recorder._SweepRecorder(
+        tmp_path,
+        market_index={},
+        mid_sum_threshold=Decimal("0.02"),
+        spread_sum_threshold=Decimal("0.06"),
+        heartbeat_interval_seconds=None,
+        sink=ThreadedSink(CsvSink(tmp_path)),
+        stats_interval_seconds=1e-9,
+    )
+
+    with caplog.at_level(logging.INFO):
+        for _ in range(2):
+            recorder.record_sweep([pair], client.get_order_books(["token-up", "token-down"]))
+        logged = list(caplog.messages)
+        recorder.close()
+
+    writer = [message for message in logged if message.startswith("sink writer")]
+    cache = [message for message in logged if message.startswith("book cache")]
+    assert len(writer) == len(cache) == 2
+    assert "depth=" in writer[0] and "write_ms_avg=" in writer[0]
+    assert "hit_rate=" in cache[0] and "bytes=" in cache[0] and "evictions=" in cache[0]
+
+
+class _PerPairHashClient(_FakeClient):
+    def __init__(self, book: OrderBook, busy_prefix: str) -> None:
+        super().__init__(book)
+        self._busy_prefix = busy_prefix
+        self.requested: list[list[str]] = []
+
+    def get_order_books(
+        self, token_ids: list[str], known_hashes: dict[str, str] | None = None
+    ) -> BookBatch:
+        self.requested.append(list(token_ids))
+        batch = BookBatch()
+        for token_id in token_ids:
+            book = self.get_order_book(token_id)
+            busy = token_id.startswith(self._busy_prefix)
+            book.hash = f"h{len(self.requested)}" if busy else "static"
+            batch.books[token_id] = book
+        return batch
+
+
+def test_adaptive_scheduler_polls_busy_pairs_more_often(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = [0.0]
+
+    def fake_sleep(seconds: float) -> None:
+        clock[0] += seconds
+
+    monkeypatch.setattr(paired_recorder.time, "sleep", fake_sleep)
+    book = OrderBook(
+        token_id="token-up",
+        market="cond-1",
+        timestamp_ms=1000,
+        bids=[OrderLevel(price=Decimal("0.40"), size=Decimal("10"))],
+        asks=[OrderLevel(price=Decimal("0.70"), size=Decimal("10"))],
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{name}",
+            token_a_id=f"{name}-up",
+            token_b_id=f"{name}-down",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for name in ("busy", "dead")
+    ]
+    scheduler = AdaptivePollScheduler(
+        initial_interval_s=1.0,
+        min_interval_s=0.5,
+        max_interval_s=8.0,
+        far_distance=Decimal("1"),
+        clock=lambda: clock[0],
+    )
+    client = _PerPairHashClient(book, busy_prefix="busy")
+    record_paired_quotes(
+        pairs,
+        out_dir=tmp_path / "quotes",
+        max_iters=8,
+        client=client,
+        scheduler=scheduler,
+    )
+
+    polls = Counter(token for tokens in client.requested for token in tokens)
+    assert polls["busy-up"] == 8
+    assert polls["dead-up"] == 4
+    assert scheduler.schedule(("busy-up", "busy-down")).interval_s == 0.5
+    assert scheduler.schedule(("dead-up", "dead-down")).interval_s == 4.0
+
+
+class _SkewedLegClient(_FakeClient):
+    def __init__(self, book: OrderBook, timestamps: dict[str, int]) -> None:
+        super().__init__(book)
+        self._timestamps = timestamps
+        self._barrier = threading.Barrier(2, timeout=5)
+
+    def get_order_book(self, token_id: str) -> OrderBook:
+        # Both legs must be in flight at once or the barrier times out.
+        self._barrier.wait()
+        book = super().get_order_book(token_id)
+        book.timestamp_ms = self._timestamps[token_id]
+        return book
+
+
+def test_legs_fetched_together_and_skew_suppresses_signals(tmp_path: Path) -> None:
+    book = OrderBook(
+        token_id="token-up",
+        market="cond-1",
+        timestamp_ms=1000,
+        bids=[OrderLevel(price=Decimal("0.55"), size=Decimal("10"))],
+        asks=[OrderLevel(price=Decimal("0.45"), size=Decimal("10"))],
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{idx}",
+            token_a_id=f"up-{idx}",
+            token_b_id=f"down-{idx}",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for idx in range(2)
+    ]
+    timestamps = {"up-0": 1000, "down-0": 1040, "up-1": 1000, "down-1": 1900}
+    out_dir = tmp_path / "quotes"
+    record_paired_quotes(
+        pairs,
+        out_dir=out_dir,
+        interval_seconds=0,
+        max_iters=1,
+        client=_SkewedLegClient(book, timestamps),
+        batch_books=False,
+        max_leg_skew_ms=250,
+    )
+
+    with (out_dir / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    with (out_dir / "signals.csv").open(encoding="utf-8") as handle:
+        signals = list(csv.DictReader(handle))
+    assert [row["leg_skew_ms"] for row in rows] == ["40", "900"]
+    assert all(float(row["fetch_latency_ms"]) >= 0 for row in rows)
+    assert {signal["condition_id"] for signal in signals} == {"cond-0"}
+
+
+class _QuoteClient(_FakeClient):
+    def __init__(self, quotes: dict[str, tuple[str, str, int]]) -> None:
+        self._quotes = quotes
+
+    def get_order_book(self, token_id: str) -> OrderBook:
+        bid, ask, timestamp_ms = self._quotes[token_id]
+        return OrderBook(
+            token_id=token_id,
+            market="",
+            timestamp_ms=timestamp_ms,
+            bids=[OrderLevel(price=Decimal(bid), size=Decimal("10"))] if bid else [],
+            asks=[OrderLevel(price=Decimal(ask), size=Decimal("2.5"))],
+            tick_size=Decimal("0.001"),
+            min_order_size=Decimal("1"),
+            hash=f"{token_id}-{bid}-{ask}",
+        )
+
+
+def test_batch_snapshots_write_the_same_rows_and_signals(tmp_path: Path) -> None:
+    quotes = {
+        "up-0": ("0.49", "0.51", 1000),
+        "down-0": ("0.49", "0.51", 1000),
+        "up-1": ("0.55", "0.45", 1000),
+        "down-1": ("0.45", "0.505", 1030),
+        "up-2": ("0.3", "0.4", 1000),
+        "down-2": ("0.5", "0.6", 1900),
+        "up-3": ("0.2", "0.9", 1000),
+        "down-3": ("", "0.9", 1000),
+    }
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{idx}",
+            token_a_id=f"up-{idx}",
+            token_b_id=f"down-{idx}",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for idx in range(4)
+    ]
+    outputs = []
+    for batch_snapshots in (False, True):
+        out_dir = tmp_path / f"batch-{batch_snapshots}"
+        record_paired_quotes(
+            pairs,
+            out_dir=out_dir,
+            interval_seconds=0,
+            max_iters=2,
+            client=_QuoteClient(quotes),
+            heartbeat_interval_seconds=0.000001,
+            max_leg_skew_ms=250,
+            batch_snapshots=batch_snapshots,
+            depth_ladder=[1, 3],
+            quantities=[Decimal("2"), Decimal("20")],
+        )
+        outputs.append(
+            [
+                (out_dir / name).read_text(encoding="utf-8")
+                for name in ("paired_quotes.csv", "signals.csv")
+            ]
+        )
+
+    assert outputs[0] == outputs[1]
+    rows = list(csv.DictReader(outputs[1][0].splitlines()))
+    signals = list(csv.DictReader(outputs[1][1].splitlines()))
+    assert [row["row_kind"] for row in rows] == ["quote"] * 3 + ["heartbeat"] * 3
+    assert rows[0]["depth_ask_3_down"] == "2.5"
+    assert rows[0]["buy_both_cost_2"] == "2.04"
+    assert rows[0]["sell_both_proceeds_20"] == ""
+    assert {(signal["condition_id"], signal["signal_type"]) for signal in signals} == {
+        ("cond-1", "MID_SUM_DRIFT"),
+        ("cond-1", "SELL_BOTH_OVER_1"),
+        ("cond-1", "BUY_BOTH_UNDER_1"),
+    }
+
+
+def test_adaptive_batch_snapshots_do_not_build_rows(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    quotes = {
+        "up-0": ("0.49", "0.51", 1000),
+        "down-0": ("0.49", "0.505", 1000),
+        "up-1": ("0.3", "0.6", 1000),
+        "down-1": ("0.3", "0.6", 1000),
+    }
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{idx}",
+            token_a_id=f"up-{idx}",
+            token_b_id=f"down-{idx}",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for idx in range(2)
+    ]
+    built: list[int] = []
+    snapshot = PairedSnapshotBatch.snapshot
+
+    def counting_snapshot(self: PairedSnapshotBatch, index: int) -> object:
+        built.append(index)
+        return snapshot(self, index)
+
+    monkeypatch.setattr(PairedSnapshotBatch, "snapshot", counting_snapshot)
+    states = []
+    for batch_snapshots in (False, True):
+        scheduler = AdaptivePollScheduler(
+            initial_interval_s=0.01, min_interval_s=0.001, max_interval_s=0.04
+        )
+        record_paired_quotes(
+            pairs,
+            out_dir=tmp_path / f"batch-{batch_snapshots}",
+            interval_seconds=0,
+            max_iters=3,
+            client=_QuoteClient(quotes),
+            heartbeat_interval_seconds=None,
+            scheduler=scheduler,
+            batch_snapshots=batch_snapshots,
+        )
+        states.append(scheduler.export_state())
+
+    assert built == []
+    assert states[0] == states[1]
+
+
+def test_batch_snapshots_without_ladder_columns(tmp_path: Path) -> None:
+    quotes = {"up-0": ("0.49", "0.51", 1000), "down-0": ("0.48", "0.505", 1010)}
+    pair = TradablePair(
+        condition_id="cond-0",
+        token_a_id="up-0",
+        token_b_id="down-0",
+        outcome_a="Up",
+        outcome_b="Down",
+    )
+    outputs = []
+    for batch_snapshots in (False, True):
+        out_dir = tmp_path / f"batch-{batch_snapshots}"
+        record_paired_quotes(
+            [pair],
+            out_dir=out_dir,
+            interval_seconds=0,
+            max_iters=1,
+            client=_QuoteClient(quotes),
+            batch_snapshots=batch_snapshots,
+        )
+        outputs.append((out_dir / "paired_quotes.csv").read_text(encoding="utf-8"))
+
+    assert outputs[0] == outputs[1]
+    assert len(outputs[1].splitlines()) == 2
+
+
+class _FailingTokenClient(_FakeClient):
+    def __init__(self, book: OrderBook, failing: set[str]) -> None:
+        super().__init__(book)
+        self._failing = failing
+        self.requested: Counter[str] = Counter()
+
+    def get_order_books(
+        self, token_ids: list[str], known_hashes: dict[str, str] | None = None
+    ) -> BookBatch:
+        batch = BookBatch()
+        for token_id in token_ids:
+            self.requested[token_id] += 1
+            if token_id in self._failing:
+                batch.errors[token_id] = RuntimeError("boom")
+            else:
+                batch.books[token_id] = self.get_order_book(token_id)
+        return batch
+
+
+def test_circuit_breaker_stops_polling_failing_tokens(tmp_path: Path) -> None:
+    book = OrderBook(
+        token_id="token-up",
+        market="cond-1",
+        timestamp_ms=1000,
+        bids=[OrderLevel(price=Decimal("0.40"), size=Decimal("10"))],
+        asks=[OrderLevel(price=Decimal("0.60"), size=Decimal("10"))],
+        tick_size=Decimal("0.01"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+    pairs = [
+        TradablePair(
+            condition_id=f"cond-{name}",
+            token_a_id=f"{name}-up",
+            token_b_id=f"{name}-down",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+        for name in ("good", "bad")
+    ]
+    client = _FailingTokenClient(book, failing={"bad-up"})
+    record_paired_quotes(
+        pairs,
+        out_dir=tmp_path / "quotes",
+        interval_seconds=0,
+        max_iters=6,
+        client=client,
+        breaker=CircuitBreaker(failure_threshold=2, base_backoff_s=60),
+    )
+
+    assert client.requested["good-up"] == 6
+    assert client.requested["bad-up"] == 2
+    assert client.requested["bad-down"] == 2
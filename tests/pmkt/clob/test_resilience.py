@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+
+import httpx
+from tests.pmkt.conftest import book_payload
+
+from pmkt.clob.client import AsyncClobClient, ClobClient
+from pmkt.clob.resilience import CircuitBreaker, HedgePolicy, LatencyTracker
+from pmkt.ratelimit import TokenBucket
+
+
+def _warm_policy() -> HedgePolicy:
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record(0.02)
+    return HedgePolicy(tracker)
+
+
+def test_async_hedge_returns_first_reply() -> None:
+    calls: Counter[str] = Counter()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        token_id = request.url.params["token_id"]
+        calls[token_id] += 1
+        if calls[token_id] == 1:
+            await asyncio.sleep(1.0)
+        return httpx.Response(200, content=json.dumps(book_payload(token_id)))
+
+    async def run() -> float:
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client = AsyncClobClient(
+            book_url="https://clob.test/book",
+            client=http_client,
+            limiter=TokenBucket(0, 1),
+            hedge=policy,
+        )
+        started = time.perf_counter()
+        try:
+            book = await client.get_order_book("token-1")
+        finally:
+            await client.aclose()
+        assert book.token_id == "token-1"
+        return time.perf_counter() - started
+
+    policy = _warm_policy()
+    elapsed = asyncio.run(run())
+
+    assert elapsed < 0.5
+    assert calls["token-1"] == 2
+    assert (policy.hedged, policy.hedge_wins) == (1, 1)
+
+
+def test_sync_hedge_skips_fast_replies_and_hedges_slow_ones() -> None:
+    calls: Counter[str] = Counter()
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        token_id = request.url.params["token_id"]
+        with lock:
+            calls[token_id] += 1
+            first = calls[token_id] == 1
+        if token_id == "slow" and first:
+            time.sleep(1.0)
+        return httpx.Response(200, content=json.dumps(book_payload(token_id)))
+
+    policy = _warm_policy()
+    client = ClobClient(
+        book_url="https://clob.test/book",
+        client=httpx.Client(transport=httpx.MockTransport(handler)),
+        limiter=TokenBucket(0, 1),
+        hedge=policy,
+    )
+    try:
+        client.get_order_book("fast")
+        started = time.perf_counter()
+        client.get_order_book("slow")
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+
+    assert elapsed < 0.5
+    assert calls == {"fast": 1, "slow": 2}
+    assert policy.requests == 2
+    assert policy.hedged == 1
+
+
+def test_circuit_breaker_backs_off_and_recovers() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff_s=10, clock=lambda: now[0])
+
+    breaker.record_failure("t")
+    assert breaker.allow("t")
+    breaker.record_failure("t")
+    assert not breaker.allow("t")
+    assert breaker.open_tokens() == ["t"]
+
+    now[0] = 10.0
+    assert breaker.allow("t")
+    breaker.record_failure("t")
+    now[0] = 29.0
+    assert not breaker.allow("t")
+    now[0] = 30.0
+    assert breaker.allow("t")
+
+    breaker.record_success("t")
+    breaker.record_failure("t")
+    assert breaker.allow("t")
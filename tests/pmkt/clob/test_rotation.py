@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+from pathlib import Path
+
+from pmkt.clob.rotation import (
+    RotationPolicy,
+    SegmentTracker,
+    read_manifest,
+    segments_between,
+)
+from pmkt.clob.sinks import CsvSink
+
+
+class _Clock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _quote(ts_ms: int) -> dict[str, object]:
+    return {"ts_ms": ts_ms, "condition_id": "c", "mid_sum": "1.0"}
+
+
+def _gzip_rows(path: Path) -> list[dict[str, str]]:
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(io.StringIO(handle.read())))
+
+
+def test_segments_roll_over_by_size_and_are_compressed_with_manifest(tmp_path: Path) -> None:
+    sink = CsvSink(tmp_path, rotation=RotationPolicy(max_bytes=1, compression="gzip"))
+    for sweep in range(3):
+        sink.write_quote(_quote(1000 * sweep))
+        sink.write_quote(_quote(1000 * sweep + 500))
+        sink.end_sweep()
+    sink.close()
+
+    entries = read_manifest(tmp_path)
+    assert [entry["rows"] for entry in entries] == [2, 2, 2]
+    assert [(entry["ts_min_ms"], entry["ts_max_ms"]) for entry in entries] == [
+        (0, 500),
+        (1000, 1500),
+        (2000, 2500),
+    ]
+    assert all(entry["stream"] == "paired_quotes" for entry in entries)
+    assert all(entry["file"].endswith(".csv.gz") for entry in entries)
+    assert not list(tmp_path.glob("*.csv"))
+    rows = _gzip_rows(tmp_path / entries[1]["file"])
+    assert [row["ts_ms"] for row in rows] == ["1000", "1500"]
+
+    paths = list(segments_between(tmp_path, "paired_quotes", start_ms=1200, end_ms=2100))
+    assert [path.name for path in paths] == [entries[1]["file"], entries[2]["file"]]
+
+
+def test_interval_segments_close_on_the_boundary(tmp_path: Path) -> None:
+    clock = _Clock(3590.0)
+    policy = RotationPolicy(every_s=3600, compression="none")
+    tracker = SegmentTracker(
+        tmp_path, "paired_quotes", ".csv", policy, lambda row: None, wall_clock=clock
+    )
+    tracker.open_path().write_text("ts_ms\n", encoding="utf-8")
+
+    clock.now = 3599.0
+    assert not tracker.due(0)
+    clock.now = 3600.0
+    assert tracker.due(0)
+    entry = tracker.finish()
+    assert entry is not None and entry["file"] == "paired_quotes.19700101T005950Z.csv"
+    assert entry["compression"] == "none"
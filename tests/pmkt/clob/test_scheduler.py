@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+from decimal import Decimal
+
+import pytest
+
+from pmkt.clob.scheduler import AdaptivePollScheduler
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _scheduler(clock: _Clock, **kwargs: object) -> AdaptivePollScheduler:
+    options: dict[str, object] = {
+        "initial_interval_s": 2.0,
+        "min_interval_s": 0.5,
+        "max_interval_s": 16.0,
+        "clock": clock,
+    }
+    options.update(kwargs)
+    return AdaptivePollScheduler(**options)  # type: ignore[arg-type]
+
+
+def test_intervals_follow_activity_and_threshold_distance() -> None:
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+    for key in ("dead", "busy", "near"):
+        scheduler.add(key, key)
+    assert sorted(scheduler.due()) == ["busy", "dead", "near"]
+
+    for _ in range(5):
+        scheduler.observe("dead", changed=False, distance=Decimal("0.02"))
+        scheduler.observe("busy", changed=True, distance=Decimal("0.02"))
+        scheduler.observe("near", changed=False, distance=Decimal("0.005"))
+
+    assert scheduler.schedule("dead").interval_s == 16.0
+    assert scheduler.schedule("busy").interval_s == 0.5
+    assert scheduler.schedule("near").interval_s == 0.5
+
+    scheduler.observe("busy", changed=True, distance=Decimal("0.30"))
+    assert scheduler.schedule("busy").interval_s == 1.0
+
+    clock.now += 0.5
+    assert scheduler.due() == ["near"]
+    assert scheduler.seconds_until_due() == 0.0
+
+
+def test_budget_stretches_every_interval() -> None:
+    clock = _Clock()
+    scheduler = _scheduler(clock, budget_rps=4.0, request_cost=2.0)
+    for idx in range(8):
+        scheduler.add(idx, f"pair-{idx}")
+        scheduler.observe(idx, changed=True, distance=Decimal("0"))
+    scheduler.end_sweep()
+
+    # Eight pairs at 0.5s and two requests each want 32 req/s.
+    assert scheduler.demand_rps() == pytest.approx(32.0)
+    assert scheduler.stretch == pytest.approx(8.0)
+    assert scheduler.effective_interval_s(0) == pytest.approx(4.0)
+
+    scheduler.observe(0, changed=True, distance=Decimal("0"))
+    assert scheduler.schedule(0).next_due == pytest.approx(clock.now + 4.0)
+
+
+def test_logs_effective_frequency_per_pair(caplog: pytest.LogCaptureFixture) -> None:
+    clock = _Clock()
+    scheduler = _scheduler(clock, log_interval_s=60.0)
+    scheduler.add("a", "cond-a")
+    for _ in range(3):
+        scheduler.observe("a", changed=True, distance=Decimal("0.02"))
+
+    clock.now += 60.0
+    with caplog.at_level(logging.INFO, logger="pmkt.clob.scheduler"):
+        scheduler.end_sweep()
+
+    assert any(
+        "Pair cond-a" in message and "polls_per_min=3.00" in message for message in caplog.messages
+    )
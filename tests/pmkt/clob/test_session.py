@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import csv
+from decimal import Decimal
+from pathlib import Path
+
+from pmkt.clob.models import BookBatch, OrderBook, OrderLevel
+from pmkt.clob.paired_recorder import TradablePair, record_paired_quotes
+from pmkt.clob.rotation import RotationPolicy, read_manifest
+from pmkt.clob.scheduler import AdaptivePollScheduler
+from pmkt.clob.session import (
+    SESSION_FILENAME,
+    SessionCheckpoint,
+    SessionCheckpointer,
+    load_checkpoint,
+    save_checkpoint,
+)
+from pmkt.clob.sinks import CsvSink, ThreadedSink
+
+
+class _HashClient:
+    # Serves the same two-level book every sweep under the next hash in line.
+    def __init__(self, hashes: list[str]) -> None:
+        self._hashes = hashes
+        self.sweeps = 0
+
+    def get_order_books(
+        self, token_ids: list[str], known_hashes: dict[str, str] | None = None
+    ) -> BookBatch:
+        book_hash = self._hashes[min(self.sweeps, len(self._hashes) - 1)]
+        self.sweeps += 1
+        batch = BookBatch()
+        for token_id in token_ids:
+            if known_hashes and known_hashes.get(token_id) == book_hash:
+                batch.unchanged[token_id] = 1000 + self.sweeps
+                continue
+            batch.books[token_id] = OrderBook(
+                token_id=token_id,
+                market="cond-1",
+                timestamp_ms=1000 + self.sweeps,
+                bids=[OrderLevel(price=Decimal("0.40"), size=Decimal("10"))],
+                asks=[OrderLevel(price=Decimal("0.60"), size=Decimal("10"))],
+                tick_size=Decimal("0.01"),
+                min_order_size=Decimal("1"),
+                hash=book_hash,
+            )
+        return batch
+
+    def close(self) -> None:
+        pass
+
+
+def _quote(ts_ms: int) -> dict[str, object]:
+    return {"ts_ms": ts_ms, "condition_id": "c", "mid_sum": "1.0"}
+
+
+def _rows(path: Path) -> list[dict[str, str]]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_checkpoint_is_replaced_whole(tmp_path: Path) -> None:
+    save_checkpoint(tmp_path, SessionCheckpoint(pairs=[], sweeps=1))
+    save_checkpoint(tmp_path, SessionCheckpoint(pairs=[{"condition_id": "c"}], sweeps=2))
+
+    assert [path.name for path in tmp_path.iterdir()] == [SESSION_FILENAME]
+    checkpoint = load_checkpoint(tmp_path)
+    assert checkpoint.sweeps == 2
+    assert checkpoint.pairs == [{"condition_id": "c"}]
+
+
+def test_csv_sink_resumes_after_a_torn_row(tmp_path: Path) -> None:
+    sink = CsvSink(tmp_path)
+    sink.write_quote(_quote(1000))
+    sink.end_sweep()
+    state = sink.checkpoint()
+    sink.write_quote(_quote(2000))
+    sink.end_sweep()
+    # The process dies halfway through a row with a quoted newline in it.
+    with (tmp_path / "paired_quotes.csv").open("a", encoding="utf-8") as handle:
+        handle.write('3000,"half\nof a row')
+
+    resumed = CsvSink(tmp_path)
+    resumed.restore(state)
+    resumed.write_quote(_quote(4000))
+    resumed.close()
+
+    rows = _rows(tmp_path / "paired_quotes.csv")
+    assert [row["ts_ms"] for row in rows] == ["1000", "2000", "4000"]
+
+
+def test_rotated_segment_is_reopened_with_its_manifest_fields(tmp_path: Path) -> None:
+    policy = RotationPolicy(max_bytes=1 << 20, compression="none")
+    sink = CsvSink(tmp_path, rotation=policy)
+    sink.write_quote(_quote(1000))
+    sink.end_sweep()
+    state = sink.checkpoint()
+    sink.write_quote(_quote(2000))
+    sink.end_sweep()
+
+    resumed = CsvSink(tmp_path, rotation=policy)
+    resumed.restore(state)
+    resumed.write_quote(_quote(3000))
+    resumed.close()
+
+    entries = [entry for entry in read_manifest(tmp_path) if entry["stream"] == "paired_quotes"]
+    assert [(entry["rows"], entry["ts_min_ms"], entry["ts_max_ms"]) for entry in entries] == [
+        (3, 1000, 3000)
+    ]
+    rows = _rows(tmp_path / entries[0]["file"])
+    assert [row["ts_ms"] for row in rows] == ["1000", "2000", "3000"]
+
+
+def test_resumed_recorder_writes_no_duplicate_rows(tmp_path: Path) -> None:
+    pairs = [
+        TradablePair(
+            condition_id="cond-1",
+            token_a_id="token-up",
+            token_b_id="token-down",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+    ]
+
+    def scheduler() -> AdaptivePollScheduler:
+        return AdaptivePollScheduler(
+            initial_interval_s=0.01, min_interval_s=0.01, max_interval_s=0.04
+        )
+
+    first = scheduler()
+    record_paired_quotes(
+        pairs,
+        out_dir=tmp_path,
+        max_iters=1,
+        client=_HashClient(["h1"]),  # type: ignore[arg-type]
+        heartbeat_interval_seconds=None,
+        scheduler=first,
+        session=SessionCheckpointer(tmp_path, None),
+    )
+    checkpoint = load_checkpoint(tmp_path)
+    assert checkpoint.book_hashes == {"token-up": "h1", "token-down": "h1"}
+    assert checkpoint.scheduler == first.export_state()
+    assert checkpoint.outputs is not None
+
+    # The restarted run sees the h1 books again, then h2.
+    second = scheduler()
+    record_paired_quotes(
+        [TradablePair(**pair) for pair in checkpoint.pairs],
+        out_dir=tmp_path,
+        max_iters=2,
+        client=_HashClient(["h1", "h2"]),  # type: ignore[arg-type]
+        heartbeat_interval_seconds=None,
+        scheduler=second,
+        sink=ThreadedSink(CsvSink(tmp_path)),
+        session=SessionCheckpointer(tmp_path, None, restored=checkpoint),
+    )
+    rows = _rows(tmp_path / "paired_quotes.csv")
+    assert [(row["ts_ms"], row["row_kind"]) for row in rows] == [
+        ("1001", "quote"),
+        ("1002", "quote"),
+    ]
+    assert second.schedule(("token-up", "token-down")).polls == 3
+    assert load_checkpoint(tmp_path).sweeps == 3
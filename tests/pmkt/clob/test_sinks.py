@@ -0,0 +1,207 @@
+import csv
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from pmkt.clob.sinks import (
+    CsvRowWriter,
+    CsvSink,
+    FlushPolicy,
+    ParquetSink,
+    SqliteSink,
+    ThreadedSink,
+    quote_columns,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _lines(path: Path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_row_writer_keeps_file_open_and_writes_header_once(tmp_path: Path) -> None:
+    path = tmp_path / "out.csv"
+    writer = CsvRowWriter(path)
+    writer.write({"a": 1, "b": 2})
+    writer.write({"a": 3, "b": 4})
+    writer.close()
+
+    assert _lines(path) == ["a,b", "1,2", "3,4"]
+
+    # A second run appends below the existing header.
+    writer = CsvRowWriter(path)
+    writer.write({"a": 5, "b": 6})
+    writer.close()
+    assert _lines(path) == ["a,b", "1,2", "3,4", "5,6"]
+
+
+def test_row_writer_flushes_on_row_count_time_and_sweep(tmp_path: Path) -> None:
+    path = tmp_path / "out.csv"
+    clock = _Clock()
+    writer = CsvRowWriter(
+        path, FlushPolicy(every_rows=3, every_s=10.0, on_sweep=False), clock=clock
+    )
+
+    writer.write({"a": 1})
+    writer.write({"a": 2})
+    writer.end_sweep()
+    assert _lines(path) == []
+    writer.write({"a": 3})
+    assert _lines(path) == ["a", "1", "2", "3"]
+
+    writer.write({"a": 4})
+    clock.now = 10.0
+    writer.write({"a": 5})
+    assert _lines(path)[-1] == "5"
+    assert writer.flushes == 2
+
+    writer.policy.on_sweep = True
+    writer.write({"a": 6})
+    writer.end_sweep()
+    assert _lines(path)[-1] == "6"
+    writer.close()
+
+
+def test_sink_writes_fixed_columns_and_flushes_on_close(tmp_path: Path) -> None:
+    sink = CsvSink(tmp_path, FlushPolicy(on_sweep=False), quantities=[Decimal("5")])
+    sink.write_quote({"ts_ms": 1, "mid_sum": "1.0", "buy_both_cost_5": "0.99"})
+    sink.write_signal({"ts_iso": "t", "signal_type": "MID_SUM_DRIFT"})
+    sink.end_sweep()
+    sink.close()
+    sink.close()
+
+    with (tmp_path / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        quotes = list(csv.DictReader(handle))
+    assert list(quotes[0]) == [name for name, _ in quote_columns(quantities=[Decimal("5")])]
+    assert quotes[0]["mid_sum"] == "1.0" and quotes[0]["buy_both_cost_5"] == "0.99"
+    assert quotes[0]["a_bid"] == ""
+    with (tmp_path / "signals.csv").open(encoding="utf-8") as handle:
+        signals = list(csv.DictReader(handle))
+    assert [signals[0]["ts_iso"], signals[0]["signal_type"]] == ["t", "MID_SUM_DRIFT"]
+
+
+def test_parquet_sink_writes_typed_row_groups(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = ParquetSink(tmp_path, row_group_size=2, depth_ladder=[3])
+    row = {
+        name: "0.5"
+        for name, kind in quote_columns(depth_ladder=[3])
+        if kind in {"decimal", "price"}
+    }
+    for ts_ms in range(3):
+        sink.write_quote(
+            {**row, "ts_ms": ts_ms, "condition_id": "c", "leg_skew_ms": 0, "fetch_latency_ms": ""}
+        )
+    sink.write_signal({"ts_iso": "2024-01-01T00:00:00+00:00", "active": "true", "liquidity": "x"})
+    sink.close()
+
+    quotes = pq.ParquetFile(tmp_path / "paired_quotes.parquet")
+    assert quotes.metadata.num_row_groups == 2
+    table = quotes.read()
+    assert table.column("ts_ms").to_pylist() == [0, 1, 2]
+    assert table.column("depth_bid_3_up").to_pylist()[0] == Decimal("0.5")
+    assert table.column("fetch_latency_ms").to_pylist() == [None, None, None]
+    signal = pq.read_table(tmp_path / "signals.parquet").to_pylist()[0]
+    assert signal["active"] is True and signal["liquidity"] is None
+
+
+def test_sqlite_sink_commits_typed_rows_once_per_sweep(tmp_path: Path) -> None:
+    sink = SqliteSink(tmp_path, quantities=[Decimal("0.5")])
+    reader = sqlite3.connect(tmp_path / "paired_quotes.sqlite")
+    for ts_ms in (1000, 2000):
+        sink.write_quote(
+            {"ts_ms": ts_ms, "condition_id": "c", "mid_sum": "1.025", "buy_both_cost_0.5": ""}
+        )
+    sink.write_signal({"ts_iso": "2024-01-01T00:00:01+00:00", "condition_id": "c", "active": True})
+    assert reader.execute("SELECT count(*) FROM paired_quotes").fetchone() == (0,)
+
+    sink.end_sweep()
+    assert sink.commits == 1
+    rows = reader.execute(
+        'SELECT ts_ms, typeof(ts_ms), mid_sum, typeof(mid_sum), "buy_both_cost_0.5" '
+        "FROM paired_quotes WHERE condition_id = 'c' AND ts_ms >= 1500"
+    ).fetchall()
+    assert rows == [(2000, "integer", 1.025, "real", None)]
+    assert reader.execute("SELECT ts_ms, active FROM signals").fetchall() == [(1704067201000, 1)]
+    plan = reader.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM paired_quotes WHERE condition_id = 'c' AND ts_ms > 0"
+    ).fetchall()
+    assert "paired_quotes_condition_ts" in plan[0][-1]
+    reader.close()
+    sink.close()
+
+
+class _GatedSink:
+    # Records calls; writes wait until the gate is opened.
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, object]] = []
+        self.gate = threading.Event()
+        self.closed = False
+
+    def write_quote(self, row: dict[str, object]) -> None:
+        self.gate.wait()
+        if row.get("fail"):
+            raise OSError("disk full")
+        self.calls.append(("quote", row["ts_ms"]))
+
+    def write_signal(self, row: dict[str, object]) -> None:
+        self.calls.append(("signal", row["ts_ms"]))
+
+    def end_sweep(self) -> None:
+        self.calls.append(("sweep", None))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_threaded_sink_writes_in_order_on_its_own_thread() -> None:
+    inner = _GatedSink()
+    inner.gate.set()
+    sink = ThreadedSink(inner, max_queue=2)
+    sink.write_quote({"ts_ms": 1})
+    sink.write_signal({"ts_ms": 1})
+    sink.end_sweep()
+    sink.write_quote({"ts_ms": 2})
+    sink.close()
+
+    assert inner.calls == [("quote", 1), ("signal", 1), ("sweep", None), ("quote", 2)]
+    assert inner.closed
+    assert sink.stats()["rows"] == 3 and sink.stats()["max_depth"] <= 2
+
+
+def test_threaded_sink_drops_heartbeats_when_full() -> None:
+    inner = _GatedSink()
+    sink = ThreadedSink(inner, max_queue=2, backpressure="drop-heartbeats")
+    sink.write_quote({"ts_ms": 0})
+    while sink.depth():  # the writer holds row 0 until the gate opens
+        time.sleep(0.001)
+    sink.write_quote({"ts_ms": 1, "row_kind": "heartbeat"})
+    sink.write_quote({"ts_ms": 2})
+    sink.write_quote({"ts_ms": 3, "row_kind": "heartbeat"})
+    sink.write_quote({"ts_ms": 4})
+    inner.gate.set()
+    sink.close()
+
+    assert [ts for _, ts in inner.calls] == [0, 2, 4]
+    assert sink.dropped == 2
+
+
+def test_threaded_sink_raises_writer_errors_to_the_recorder() -> None:
+    inner = _GatedSink()
+    inner.gate.set()
+    sink = ThreadedSink(inner)
+    sink.write_quote({"ts_ms": 1, "fail": True})
+    with pytest.raises(RuntimeError, match="writer failed"):
+        sink.close()
+    assert inner.closed
@@ -0,0 +1,104 @@
+import asyncio
+import csv
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from pmkt.clob.fake_stream import FakeMarketServer, book_event, price_change_event
+from pmkt.clob.paired_recorder import TradablePair, record_paired_quotes_stream
+from pmkt.clob.stream import MarketStream
+
+pytest.importorskip("websockets")
+
+
+def test_handle_message_applies_snapshot_and_deltas() -> None:
+    stream = MarketStream(["token-up"])
+    stream.handle_message(
+        '[{"event_type": "book", "asset_id": "token-up", "market": "cond-1", "timestamp": "5",'
+        ' "hash": "h1", "bids": [{"price": "0.48", "size": "10"}],'
+        ' "asks": [{"price": "0.52", "size": "10"}]}]'
+    )
+    updates = stream.handle_message(
+        '{"event_type": "price_change", "market": "cond-1", "timestamp": "6", "price_changes": ['
+        '{"asset_id": "token-up", "price": "0.49", "size": "7", "side": "BUY", "hash": "h2"},'
+        '{"asset_id": "token-up", "price": "0.52", "size": "0", "side": "SELL", "hash": "h2"},'
+        '{"asset_id": "token-up", "price": "0.53", "size": "4", "side": "SELL", "hash": "h2"}]}'
+    )
+
+    book = updates["token-up"]
+    assert book.best_bid() == (Decimal("0.49"), Decimal("7"))
+    assert book.best_ask() == (Decimal("0.53"), Decimal("4"))
+    assert book.timestamp_ms == 6
+    assert book.hash == "h2"
+
+
+def test_crossed_book_waits_for_the_next_snapshot() -> None:
+    stream = MarketStream(["token-up"])
+    stream.handle_message(json.dumps(book_event("token-up", timestamp_ms=1000)))
+    # A bid through the best ask means a delta was missed.
+    crossed = price_change_event("token-up", "0.60", "5", "BUY", timestamp_ms=1001)
+    assert stream.handle_message(json.dumps(crossed)) == {}
+    later = price_change_event("token-up", "0.48", "5", "BUY", timestamp_ms=1002)
+    assert stream.handle_message(json.dumps(later)) == {}
+    assert stream.engine.gaps == 1
+
+    stream.handle_message(json.dumps(book_event("token-up", timestamp_ms=1003)))
+    updates = stream.handle_message(
+        json.dumps(price_change_event("token-up", "0.50", "5", "BUY", timestamp_ms=1004))
+    )
+    assert updates["token-up"].best_bid() == (Decimal("0.50"), Decimal("5"))
+
+
+def test_updates_do_not_share_levels_with_the_live_book() -> None:
+    stream = MarketStream(["token-up"])
+    first = stream.handle_message(json.dumps(book_event("token-up")))["token-up"]
+    stream.handle_message(
+        json.dumps(price_change_event("token-up", "0.49", "0", "BUY", timestamp_ms=2000))
+    )
+    assert first.best_bid() == (Decimal("0.49"), Decimal("687"))
+
+
+def test_stream_recorder_resubscribes_after_disconnect(tmp_path: Path) -> None:
+    pairs = [
+        TradablePair(
+            condition_id="cond-1",
+            token_a_id="token-up",
+            token_b_id="token-down",
+            outcome_a="Up",
+            outcome_b="Down",
+        )
+    ]
+    out_dir = tmp_path / "stream"
+
+    async def run() -> FakeMarketServer:
+        server = FakeMarketServer(
+            books={
+                "token-up": book_event("token-up", book_hash="up-1"),
+                "token-down": book_event("token-down", book_hash="down-1"),
+            }
+        )
+        await server.start()
+        stream = MarketStream(["token-up", "token-down"], url=server.url, reconnect_delay_s=0.01)
+        task = asyncio.create_task(
+            record_paired_quotes_stream(pairs, out_dir=out_dir, max_messages=3, stream=stream)
+        )
+        try:
+            await server.wait_subscribed(1)
+            await server.drop_connections()
+            await server.wait_subscribed(2)
+            await server.publish([price_change_event("token-up", "0.50", "25", "BUY")])
+            await asyncio.wait_for(task, timeout=5)
+        finally:
+            await server.stop()
+        return server
+
+    server = asyncio.run(run())
+
+    assert server.subscriptions == [["token-up", "token-down"]] * 2
+    with (out_dir / "paired_quotes.csv").open(encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    # The replayed snapshot after reconnecting has unchanged hashes and is not re-written.
+    assert [row["a_bid"] for row in rows] == ["0.49", "0.50"]
+    assert rows[1]["a_bid_sz"] == "25"
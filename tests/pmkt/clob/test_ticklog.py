@@ -0,0 +1,132 @@
+from decimal import ROUND_HALF_EVEN, Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pmkt.clob.models import OrderBook, OrderLevel
+from pmkt.clob.paired import make_paired_snapshot
+from pmkt.clob.paired_recorder import _snapshot_row
+from pmkt.clob.sinks import TickLogSink, make_sink, quote_columns
+from pmkt.clob.ticklog import TickLogReader, TickLogWriter, symbols_path
+
+
+def _book(token_id: str, ts_ms: int, bid: str, ask: str) -> OrderBook:
+    return OrderBook(
+        token_id=token_id,
+        market="cond-1",
+        timestamp_ms=ts_ms,
+        bids=[OrderLevel(price=Decimal(bid), size=Decimal("687.5"))],
+        asks=[OrderLevel(price=Decimal(ask), size=Decimal("12"))],
+        tick_size=Decimal("0.001"),
+        min_order_size=Decimal("1"),
+        hash=None,
+    )
+
+
+def _row(ts_ms: int, condition_id: str = "cond-1", **extra: object) -> dict[str, object]:
+    snapshot = make_paired_snapshot(
+        _book("token-up", ts_ms, "0.491", "0.51"),
+        _book("token-down", ts_ms - 3, "0.48", "0.505"),
+        outcome_a="Up",
+        outcome_b="Down",
+        quantities=[Decimal("100")],
+    )
+    return {**_snapshot_row(snapshot), "condition_id": condition_id, **extra}
+
+
+def test_tick_log_round_trips_through_zero_copy_columns(tmp_path: Path) -> None:
+    sink = TickLogSink(tmp_path, quantities=[Decimal("100")])
+    sink.write_quote(_row(1000))
+    sink.write_quote(_row(2000, condition_id="cond-2", row_kind="heartbeat"))
+    sink.end_sweep()
+    sink.close()
+
+    reader = TickLogReader(tmp_path / "paired_quotes.ticks")
+    assert len(reader) == 2
+    ts_ms = reader.column("ts_ms")
+    assert np.shares_memory(ts_ms, reader.records)
+    assert ts_ms.tolist() == [1000, 2000]
+    assert reader.column("a_bid").dtype == np.int32
+    assert reader.column("leg_skew_ms").tolist() == [3, 3]
+    assert reader.values("a_mid").tolist() == [0.5005, 0.5005]
+    assert reader.values("a_bid_sz").tolist() == [687.5, 687.5]
+    # 100 shares cannot be filled at the touch, so the cost is blank.
+    assert np.isnan(reader.values("buy_both_cost_100")).all()
+    assert np.isnan(reader.column("fetch_latency_ms")).all()
+    assert reader.strings("row_kind").tolist() == ["quote", "heartbeat"]
+    assert reader.where("condition_id", "cond-2").tolist() == [False, True]
+    assert [name for name, _ in reader.columns] == [
+        name for name, _ in quote_columns(quantities=[Decimal("100")])
+    ]
+
+
+def test_reopened_log_drops_torn_tail_and_keeps_symbols(tmp_path: Path) -> None:
+    path = tmp_path / "quotes.ticks"
+    columns = quote_columns()
+    writer = TickLogWriter(path, columns)
+    writer.write(_row(1000, condition_id="cond-a"))
+    writer.close()
+    # A crash mid-write leaves half a record and half a symbol line.
+    with path.open("ab") as handle:
+        handle.write(b"\x01" * 17)
+    with symbols_path(path).open("ab") as handle:
+        handle.write(b'"cond-')
+
+    writer = TickLogWriter(path, columns)
+    writer.write(_row(2000, condition_id="cond-b"))
+    writer.write(_row(3000, condition_id="cond-a"))
+    writer.close()
+
+    reader = TickLogReader(path)
+    assert reader.column("ts_ms").tolist() == [1000, 2000, 3000]
+    assert reader.strings("condition_id").tolist() == ["cond-a", "cond-b", "cond-a"]
+
+    with pytest.raises(ValueError, match="different columns"):
+        TickLogWriter(path, quote_columns(depth_ladder=[3]))
+
+
+def test_values_finer_than_the_scale_are_rejected(tmp_path: Path) -> None:
+    writer = TickLogWriter(tmp_path / "q.ticks", [("price", "decimal")], scale=2)
+    writer.write({"price": "0.50"})
+    with pytest.raises(ValueError, match="decimal places"):
+        writer.write({"price": "0.505"})
+
+
+def test_cost_columns_are_rounded_to_the_scale(tmp_path: Path) -> None:
+    up = _book("token-up", 1000, "0.49", "0.513")
+    up.asks = [
+        OrderLevel(price=Decimal("0.513"), size=Decimal("55.186666")),
+        OrderLevel(price=Decimal("0.52"), size=Decimal("100")),
+    ]
+    down = _book("token-down", 1000, "0.47", "0.48")
+    down.asks = [OrderLevel(price=Decimal("0.48"), size=Decimal("200"))]
+    snapshot = make_paired_snapshot(
+        up, down, outcome_a="Up", outcome_b="Down", quantities=[Decimal("100")]
+    )
+    row = {**_snapshot_row(snapshot), "condition_id": "cond-1"}
+    cost = Decimal(row["buy_both_cost_100"])
+    assert cost.as_tuple().exponent < -6
+
+    sink = make_sink("ticklog", tmp_path, quantities=[Decimal("100")])
+    sink.write_quote(row)
+    sink.end_sweep()
+    sink.close()
+
+    units = TickLogReader(tmp_path / "paired_quotes.ticks").column("buy_both_cost_100")
+    expected = cost.quantize(Decimal("0.000001"), rounding=ROUND_HALF_EVEN)
+    assert units.tolist() == [int(expected * 10**6)]
+
+
+def test_rounded_columns_round_half_even_and_count(tmp_path: Path) -> None:
+    writer = TickLogWriter(
+        tmp_path / "q.ticks", [("cost", "decimal"), ("size", "decimal")], scale=2, rounded=["cost"]
+    )
+    for cost in ("0.125", "0.135", "-0.125", "0.126", "0.12"):
+        writer.write({"cost": cost, "size": "1.5"})
+    writer.close()
+    assert writer.rounded_values == 4
+    reader = TickLogReader(tmp_path / "q.ticks")
+    assert reader.column("cost").tolist() == [12, 14, -12, 13, 12]
+    with pytest.raises(ValueError, match="decimal places"):
+        writer.write({"cost": "0.12", "size": "0.505"})
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+def book_payload(token_id: str, **overrides: Any) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "market": "cond-1",
+        "asset_id": token_id,
+        "timestamp": "1000",
+        "hash": f"hash-{token_id}",
+        "bids": [{"price": "0.01", "size": "1000"}, {"price": "0.49", "size": "687"}],
+        "asks": [{"price": "0.99", "size": "1000"}, {"price": "0.51", "size": "687"}],
+        "tick_size": "0.01",
+        "min_order_size": "5",
+    }
+    payload.update(overrides)
+    return payload
+
+
+class FakeClobServer:
+    def __init__(self) -> None:
+        self.books_enabled = True
+        self.failing_tokens: set[str] = set()
+        self.books: dict[str, dict[str, Any]] = {}
+        self.requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def payload_for(self, token_id: str) -> dict[str, Any]:
+        return self.books.get(token_id) or book_payload(token_id)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] += 1
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+            def do_GET(self) -> None:  # noqa: N802
+                url = urlparse(self.path)
+                server._count(url.path)
+                token_id = parse_qs(url.query).get("token_id", [""])[0]
+                if url.path != "/book" or token_id in server.failing_tokens:
+                    self._send(404, {"error": "not found"})
+                    return
+                self._send(200, server.payload_for(token_id))
+
+            def do_HEAD(self) -> None:  # noqa: N802
+                server._count("HEAD " + urlparse(self.path).path)
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self) -> None:  # noqa: N802
+                url = urlparse(self.path)
+                server._count(url.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"[]")
+                if url.path != "/books" or not server.books_enabled:
+                    self._send(404, {"error": "not found"})
+                    return
+                token_ids = [item["token_id"] for item in body]
+                self._send(
+                    200,
+                    [
+                        server.payload_for(token_id)
+                        for token_id in token_ids
+                        if token_id not in server.failing_tokens
+                    ],
+                )
+
+            def _send(self, status: int, payload: Any) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+@pytest.fixture
+def clob_server() -> Iterator[FakeClobServer]:
+    server = FakeClobServer()
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
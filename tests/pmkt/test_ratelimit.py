@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+from pmkt.ratelimit import TokenBucket
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_paces() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(rate_per_s=10.0, burst=3.0, name="test", clock=clock)
+
+    waits = [bucket.reserve() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == [0.1, 0.2]
+    clock.now = 1.0
+    assert bucket.reserve() == 0.0
+    stats = bucket.stats()
+    assert stats["acquired"] == 6
+    assert stats["delayed"] == 2
+    assert abs(stats["wait_time_s"] - 0.3) < 1e-9
+
+
+def test_token_bucket_is_shared_by_threads_and_coroutines() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(rate_per_s=100.0, burst=1.0, clock=clock)
+    waits: list[float] = []
+    lock = threading.Lock()
+
+    def reserve_many() -> None:
+        for _ in range(25):
+            wait_s = bucket.reserve()
+            with lock:
+                waits.append(wait_s)
+
+    threads = [threading.Thread(target=reserve_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    async def acquire_many() -> list[float]:
+        return list(await asyncio.gather(*(bucket.acquire_async() for _ in range(3))))
+
+    bucket.configure(rate_per_s=1000.0, burst=1.0)
+    async_waits = asyncio.run(acquire_many())
+
+    # Every reservation gets its own slot: no two callers share a wait time.
+    assert sorted(round(wait_s, 6) for wait_s in waits) == [idx / 100 for idx in range(100)]
+    assert sorted(round(wait_s, 6) for wait_s in async_waits) == [0.0, 0.001, 0.002]
+
+
+def test_unlimited_bucket_never_waits() -> None:
+    bucket = TokenBucket(rate_per_s=0.0, burst=1.0)
+    assert [bucket.acquire() for _ in range(10)] == [0.0] * 10
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pmkt.transport import (
+    ConnectionStats,
+    TransportConfig,
+    accepted_encodings,
+    build_client,
+    warmup,
+)
+
+if TYPE_CHECKING:
+    from tests.pmkt.conftest import FakeClobServer
+
+
+def test_build_client_reuses_warm_connection(clob_server: FakeClobServer) -> None:
+    stats = ConnectionStats(log_interval_s=0)
+    client = build_client(TransportConfig(http2=False), stats)
+    try:
+        warmup(client, [f"{clob_server.base_url}/book"], connections=1)
+        for idx in range(3):
+            response = client.get(f"{clob_server.base_url}/book", params={"token_id": f"t-{idx}"})
+            assert response.status_code == 200
+    finally:
+        client.close()
+
+    summary = stats.summary()
+    assert clob_server.requests["HEAD /"] == 1
+    assert summary["requests"] == 4
+    assert summary["tcp_connects"] == 1
+    assert summary["tls_handshakes"] == 0
+    assert summary["reused"] == 3
+    assert list(summary["per_connection"].values()) == [4]
+
+
+def test_transport_config_limits_and_compression() -> None:
+    config = TransportConfig(max_connections=7, max_keepalive_connections=3, http2=False)
+    limits = config.limits()
+    client = build_client(config)
+    try:
+        assert client.headers["Accept-Encoding"] == accepted_encodings()
+    finally:
+        client.close()
+
+    assert "gzip" in accepted_encodings()
+    assert limits.max_connections == 7
+    assert limits.max_keepalive_connections == 3